@@ -0,0 +1,34 @@
+"""movie prompt fragments
+
+Revision ID: 002_prompt_fragments
+Revises: 001_initial
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "002_prompt_fragments"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "movies",
+        sa.Column("prompt_fragments", postgresql.JSONB(), nullable=True),
+    )
+    op.add_column(
+        "movies",
+        sa.Column("prompt_fingerprint", sa.String(16), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("movies", "prompt_fingerprint")
+    op.drop_column("movies", "prompt_fragments")
@@ -0,0 +1,233 @@
+"""Response compression middleware.
+
+Negotiates zstd, brotli or gzip (zstd and brotli when installed) and
+compresses text and JSON bodies of at least ``compression_min_bytes``,
+streamed bodies chunk by chunk.
+"""
+
+import gzip
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import HTTP_COMPRESSION_BYTES
+from app.core.responses import parse_accept_encoding
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+MAX_VARIANT_BYTES = 1 << 20
+
+_COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+
+class _GzipStream:
+    def __init__(self) -> None:
+        self._z = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def write(self, data: bytes) -> bytes:
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._z.flush()
+
+
+class _BrotliStream:
+    def __init__(self) -> None:
+        self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def write(self, data: bytes) -> bytes:
+        return self._c.process(data) + self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+class _ZstdStream:
+    def __init__(self) -> None:
+        self._c = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def write(self, data: bytes) -> bytes:
+        return self._c.compress(data) + self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+# Coding -> (one-shot compressor, streaming compressor), in server preference order
+ENCODERS: dict[str, tuple[Callable[[bytes], bytes], type]] = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = (zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress, _ZstdStream)
+if brotli is not None:
+    ENCODERS["br"] = (lambda data: brotli.compress(data, quality=BROTLI_QUALITY), _BrotliStream)
+ENCODERS["gzip"] = (lambda data: gzip.compress(data, GZIP_LEVEL, mtime=0), _GzipStream)
+
+
+def negotiate(accept_encoding: str | None) -> str | None:
+    """The best supported coding the client accepts, or None for identity."""
+    weights = parse_accept_encoding(accept_encoding)
+    best, best_q = None, 0.0
+    for coding in ENCODERS:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int | None = None,
+        variant_cache_entries: int | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = (
+            minimum_size if minimum_size is not None else settings.compression_min_bytes
+        )
+        self.variant_cache_entries = (
+            variant_cache_entries
+            if variant_cache_entries is not None
+            else settings.compression_variant_cache_entries
+        )
+        self._variants: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        await self.app(scope, receive, _CompressingSend(self, send, coding))
+
+    def variant(self, etag: str, coding: str, body: bytes) -> bytes:
+        """``body`` compressed with ``coding``, reused for a repeated ETag."""
+        key = (etag, coding)
+        compressed = self._variants.get(key)
+        if compressed is not None:
+            self._variants.move_to_end(key)
+            return compressed
+        compressed = ENCODERS[coding][0](body)
+        if self.variant_cache_entries and len(body) <= MAX_VARIANT_BYTES:
+            self._variants[key] = compressed
+            if len(self._variants) > self.variant_cache_entries:
+                self._variants.popitem(last=False)
+        return compressed
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    if "accept-encoding" not in headers.get("vary", "").lower():
+        headers.add_vary_header("Accept-Encoding")
+
+
+class _CompressingSend:
+    """Holds the response start until the first body chunk decides the path."""
+
+    def __init__(
+        self, middleware: CompressionMiddleware, send: Send, coding: str | None
+    ) -> None:
+        self.middleware = middleware
+        self.send = send
+        self.coding = coding
+        self.start: Message | None = None
+        self.stream = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.stream is not None:
+            chunk = self.stream.write(body) if body else b""
+            if not more_body:
+                chunk += self.stream.finish()
+            HTTP_COMPRESSION_BYTES.labels(coding=self.coding, form="raw").inc(len(body))
+            HTTP_COMPRESSION_BYTES.labels(coding=self.coding, form="compressed").inc(len(chunk))
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            return
+
+        headers = MutableHeaders(raw=self.start["headers"])
+        eligible = self._compressible(headers)
+        if eligible:
+            # Whether the body gets encoded depends on Accept-Encoding, so
+            # caches must key on it even when this one goes out as is
+            _add_vary(headers)
+        coding = self.coding
+        if (
+            not eligible
+            or coding is None
+            or (not more_body and len(body) < self.middleware.minimum_size)
+        ):
+            self.passthrough = True
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        if more_body:
+            # Streamed body of unknown length: compress as it goes
+            self.stream = ENCODERS[coding][1]()
+            self._mark_encoded(headers, coding)
+            del headers["content-length"]
+            await self._flush_start()
+            await self(message)
+            return
+
+        etag = headers.get("etag")
+        if etag:
+            compressed = self.middleware.variant(etag, coding, body)
+        else:
+            compressed = ENCODERS[coding][0](body)
+        if len(compressed) >= len(body):
+            self.passthrough = True
+            await self._flush_start()
+            await self.send(message)
+            return
+        HTTP_COMPRESSION_BYTES.labels(coding=coding, form="raw").inc(len(body))
+        HTTP_COMPRESSION_BYTES.labels(coding=coding, form="compressed").inc(len(compressed))
+        self._mark_encoded(headers, coding)
+        headers["content-length"] = str(len(compressed))
+        await self._flush_start()
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    def _compressible(self, headers: MutableHeaders) -> bool:
+        """Eligible by status and headers: not pre-encoded, SSE or no-transform."""
+        content_type = headers.get("content-type", "")
+        return (
+            self.start["status"] not in (204, 304)
+            and "content-encoding" not in headers
+            and not content_type.startswith("text/event-stream")
+            and content_type.startswith(_COMPRESSIBLE_TYPES)
+            and "no-transform" not in headers.get("cache-control", "")
+        )
+
+    def _mark_encoded(self, headers: MutableHeaders, coding: str) -> None:
+        headers["content-encoding"] = coding
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # The encoded bytes differ, so a strong validator no longer holds
+            headers["etag"] = f"W/{etag}"
+
+    async def _flush_start(self) -> None:
+        if self.start is not None:
+            await self.send(self.start)
+            self.start = None
@@ -1,82 +1,86 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_cache
+from app.core.config import settings
+from app.core.deps import get_byte_cache
+from app.core.exceptions import FilmMatchError
 from app.core.logging import get_logger
-from app.core.redis import RedisCache
-from app.services.tmdb_service import tmdb_service
+from app.core.redis import ByteCache
+from app.core.responses import accepts_encoding, cached_json_response, weak_etag
+from app.db.session import get_db
+from app.services.movie_cache import (
+    CachedBody,
+    load_body,
+    load_movie_batch,
+    movie_key,
+    refresh_movie,
+    refresh_trending,
+    trending_key,
+)
 
 logger = get_logger("movie_routes")
 
 router = APIRouter(prefix="/movies", tags=["movies"])
 
 
+def _respond(request: Request, entry: CachedBody, max_age: int) -> Response:
+    return cached_json_response(request, entry.body, entry.etag, max_age, entry.gzip)
+
+
+def _wants_gzip(request: Request) -> bool:
+    return accepts_encoding(request.headers.get("accept-encoding"), "gzip")
+
+
+def _parse_ids(ids: str) -> list[int]:
+    try:
+        # De-duplicated, first occurrence keeps its place
+        tmdb_ids = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        raise FilmMatchError("ids must be comma-separated TMDB ids", 422) from None
+    if not tmdb_ids:
+        raise FilmMatchError("ids must list at least one TMDB id", 422)
+    if len(tmdb_ids) > settings.movies_batch_max_ids:
+        raise FilmMatchError(f"At most {settings.movies_batch_max_ids} ids per request", 422)
+    return tmdb_ids
+
+
+@router.get("")
+async def get_movies(
+    request: Request,
+    ids: str,
+    movies: ByteCache = Depends(get_byte_cache),
+    db: AsyncSession = Depends(get_db),
+):
+    """Details for several movies (``?ids=550,13``), in request order.
+
+    Ids that can't be resolved are listed with an ``error`` instead.
+    """
+    body, failed = await load_movie_batch(movies, _parse_ids(ids), db)
+    # Partial results shouldn't be reused without revalidating
+    max_age = 0 if failed else settings.movies_details_max_age_seconds
+    return cached_json_response(request, body, weak_etag(body), max_age)
+
+
 @router.get("/trending")
 async def get_trending(
+    request: Request,
     time_window: str = "week",
-    cache: RedisCache = Depends(get_cache),
+    movies: ByteCache = Depends(get_byte_cache),
 ):
-    cache_key = f"trending:{time_window}"
-    cached = await cache.get_json(cache_key)
-    if cached:
-        return cached
-
-    trending = await tmdb_service.get_trending(time_window)
-    result = {
-        "results": [
-            {
-                "tmdb_id": m["id"],
-                "title": m.get("title", ""),
-                "overview": m.get("overview", "")[:200],
-                "release_date": m.get("release_date"),
-                "vote_average": m.get("vote_average", 0),
-                "poster_path": m.get("poster_path"),
-                "backdrop_path": m.get("backdrop_path"),
-            }
-            for m in trending[:20]
-        ]
-    }
-
-    await cache.set_json(cache_key, result, ttl_seconds=3600)
-    return result
+    entry = await load_body(movies, trending_key(time_window), with_gzip=_wants_gzip(request))
+    if entry is None:
+        entry = await refresh_trending(movies, time_window)
+    return _respond(request, entry, settings.movies_trending_max_age_seconds)
 
 
 @router.get("/{tmdb_id}")
 async def get_movie_details(
+    request: Request,
     tmdb_id: int,
-    cache: RedisCache = Depends(get_cache),
+    movies: ByteCache = Depends(get_byte_cache),
 ):
-    cache_key = f"movie:{tmdb_id}"
-    cached = await cache.get_json(cache_key)
-    if cached:
-        return cached
-
-    details = await tmdb_service.get_movie_details(tmdb_id)
-
-    credits = details.get("credits", {})
-    directors = [
-        c["name"] for c in credits.get("crew", []) if c.get("job") == "Director"
-    ]
-    cast = [
-        {"name": c["name"], "character": c.get("character", "")}
-        for c in credits.get("cast", [])[:10]
-    ]
-
-    result = {
-        "tmdb_id": details["id"],
-        "title": details.get("title", ""),
-        "original_title": details.get("original_title"),
-        "overview": details.get("overview", ""),
-        "release_date": details.get("release_date"),
-        "runtime": details.get("runtime"),
-        "vote_average": details.get("vote_average", 0),
-        "vote_count": details.get("vote_count", 0),
-        "genres": [g["name"] for g in details.get("genres", [])],
-        "poster_path": details.get("poster_path"),
-        "backdrop_path": details.get("backdrop_path"),
-        "original_language": details.get("original_language"),
-        "directors": directors,
-        "cast": cast,
-    }
-
-    await cache.set_json(cache_key, result, ttl_seconds=86400)
-    return result
+    entry = await load_body(movies, movie_key(tmdb_id), with_gzip=_wants_gzip(request))
+    if entry is None:
+        entry = await refresh_movie(movies, tmdb_id)
+    return _respond(request, entry, settings.movies_details_max_age_seconds)
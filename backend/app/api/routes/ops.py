@@ -4,21 +4,36 @@ Provides internal health/readiness checks and operational stats
 for monitoring dashboards and deployment tooling.
 """
 
+import asyncio
 import time
 
 from fastapi import APIRouter, Depends
 
+from app.core.circuit_breaker import BREAKERS
 from app.core.config import settings
-from app.core.deps import get_cache, get_session_store
+from app.core.deps import get_byte_cache, get_cache, get_session_store
 from app.core.logging import get_logger
-from app.core.redis import RedisCache, SessionStore, get_redis
+from app.core.redis import ByteCache, RedisCache, SessionStore, get_redis
+from app.services.admission import admission_controller
+from app.services.model_router import model_router
+from app.services.movie_cache import trending_key
+from app.services.pregeneration import (
+    PREGEN_REPORT_KEY,
+    coverage_report,
+    pregenerate_popular_patterns,
+)
 from app.services.tmdb_service import tmdb_service
+from app.services.usage_tracker import usage_tracker
+from app.services.warmup import WARMUP_STATUS_KEY, WarmupRun, run_warmup
 
 logger = get_logger("ops")
 
 router = APIRouter(prefix="/ops", tags=["operations"])
 
 _start_time = time.monotonic()
+_pregen_task: asyncio.Task | None = None
+_warmup_task: asyncio.Task | None = None
+_warmup_run: WarmupRun | None = None
 
 
 @router.get("/readiness")
@@ -49,6 +64,8 @@ async def readiness():
     return {
         "ready": all_ok,
         "checks": checks,
+        # Informational: an open breaker means degraded answers, not unready
+        "circuit_breakers": {name: b.snapshot() for name, b in BREAKERS.items()},
         "environment": settings.environment,
     }
 
@@ -75,42 +92,45 @@ async def stats(
         "version": "0.3.0",
         "environment": settings.environment,
         "active_sessions": active_sessions,
+        "ai_budget": usage_tracker.snapshot(),
+        "model_health": model_router.snapshot(),
+        "claude_admission": admission_controller.snapshot(),
     }
 
 
-@router.post("/warmup")
-async def warmup(cache: RedisCache = Depends(get_cache)):
-    """Pre-populate Redis cache with trending movies from TMDB.
+@router.post("/warmup", status_code=202)
+async def warmup(
+    cache: RedisCache = Depends(get_cache),
+    movies: ByteCache = Depends(get_byte_cache),
+):
+    """Start warming trending, discover, movie and pattern caches.
 
-    Call this after deployment to ensure the first users get fast responses.
+    Call this after deployment to ensure the first users get fast
+    responses. Runs in the background; poll ``GET /ops/warmup``.
     """
-    results = {"trending": 0, "errors": []}
-
-    try:
-        trending = await tmdb_service.get_trending()
-        results["trending"] = len(trending)
-
-        # Cache the trending list
-        await cache.set_json("trending:weekly", trending, ttl_seconds=3600)
-
-        # Pre-enrich top 20 movies (populates TMDB detail cache)
-        enriched = 0
-        for movie in trending[:20]:
-            try:
-                await tmdb_service.enrich_movie(movie)
-                enriched += 1
-            except Exception as e:
-                results["errors"].append(f"enrich {movie.get('id')}: {e}")
-
-        results["enriched"] = enriched
-    except Exception as e:
-        results["errors"].append(f"trending: {e}")
-
-    logger.info("warmup_complete", **results)
-    return {
-        "status": "ok" if not results["errors"] else "partial",
-        **results,
-    }
+    global _warmup_run, _warmup_task
+    run = _warmup_run
+    if run is not None and _warmup_task is not None and not _warmup_task.done():
+        return {"status": "running", **run.to_dict()}
+    run = _warmup_run = WarmupRun()
+    _warmup_task = asyncio.create_task(run_warmup(cache, run, movies))
+    return {"status": "started", **run.to_dict()}
+
+
+@router.get("/warmup")
+async def warmup_status(cache: RedisCache = Depends(get_cache)):
+    """Progress of the current or most recent warmup on any worker."""
+    runs = [
+        status
+        for status in (
+            _warmup_run.to_dict() if _warmup_run else None,
+            await cache.get_json(WARMUP_STATUS_KEY),
+        )
+        if status
+    ]
+    if not runs:
+        return {"state": "idle"}
+    return max(runs, key=lambda status: status["started_at"])
 
 
 @router.post("/flush-cache")
@@ -128,6 +148,36 @@ async def flush_cache():
         return {"status": "error", "error": str(e)}
 
 
+@router.post("/pregenerate")
+async def pregenerate(cache: RedisCache = Depends(get_cache)):
+    """Start pre-generating answers for the most requested patterns.
+
+    Runs in the background (a Message Batches job can take minutes); poll
+    ``GET /ops/pregen`` for the report.
+    """
+    global _pregen_task
+    if not settings.pregen_enabled:
+        return {"status": "disabled", "detail": "set PREGEN_ENABLED=true to run paid batches"}
+    if _pregen_task is not None and not _pregen_task.done():
+        return {"status": "running"}
+    _pregen_task = asyncio.create_task(pregenerate_popular_patterns(cache))
+    return {"status": "started"}
+
+
+@router.get("/pregen")
+async def pregen_status(cache: RedisCache = Depends(get_cache)):
+    """Last pre-generation report plus live pattern-cache coverage."""
+    try:
+        coverage = await coverage_report(cache)
+    except Exception as e:
+        coverage = {"error": str(e)}
+    return {
+        "running": _pregen_task is not None and not _pregen_task.done(),
+        "last_run": await cache.get_json(PREGEN_REPORT_KEY),
+        "coverage": coverage,
+    }
+
+
 @router.post("/sync-movies")
 async def sync_movies():
     """Manually trigger TMDB movie catalog sync."""
@@ -180,9 +230,10 @@ async def launch_check(cache: RedisCache = Depends(get_cache)):
 
     # 4. Cache status
     try:
-        cached_trending = await cache.get_json("trending:weekly")
+        cached_trending = await cache.get_json(trending_key("week"))
         if cached_trending:
-            report["checks"]["trending_cache"] = f"ok ({len(cached_trending)} movies)"
+            count = len(cached_trending.get("results", []))
+            report["checks"]["trending_cache"] = f"ok ({count} movies)"
         else:
             report["checks"]["trending_cache"] = "empty (run /ops/warmup)"
             report["warnings"].append("Trending cache is empty — run POST /ops/warmup")
@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.audit import log_event
 from app.core.deps import get_cache, get_optional_user, get_session_store
 from app.core.exceptions import FilmMatchError, NotFoundError
 from app.core.logging import get_logger
 from app.core.redis import RedisCache, SessionStore
+from app.core.responses import json_response
 from app.core.sanitize import sanitize_user_message
 from app.db.models import User
+from app.db.session import get_db
 from app.schemas.recommendation import (
     NarrowRequest,
     ReactionRequest,
@@ -28,6 +31,7 @@ async def create_recommendation(
     user: User | None = Depends(get_optional_user),
     cache: RedisCache = Depends(get_cache),
     session_store: SessionStore = Depends(get_session_store),
+    db: AsyncSession = Depends(get_db),
 ):
     # Sanitize user free-text input before it reaches Claude
     request.message = sanitize_user_message(request.message)
@@ -47,9 +51,13 @@ async def create_recommendation(
         detail=f"mode={request.mode} users={len(request.users)}",
     )
     result = await get_recommendation(
-        request, cache=cache, session_store=session_store
+        request,
+        cache=cache,
+        session_store=session_store,
+        user_id=str(user.id) if user else None,
+        db=db,
     )
-    return result
+    return json_response(result)
 
 
 @router.post("/{session_id}/refine", response_model=RecommendationResponse)
@@ -58,6 +66,7 @@ async def refine(
     request: NarrowRequest,
     session_store: SessionStore = Depends(get_session_store),
     cache: RedisCache = Depends(get_cache),
+    db: AsyncSession = Depends(get_db),
 ):
     result = await refine_recommendation(
         session_id=session_id,
@@ -66,8 +75,9 @@ async def refine(
         reject_ids=request.reject_tmdb_ids,
         session_store=session_store,
         cache=cache,
+        db=db,
     )
-    return result
+    return json_response(result)
 
 
 @router.post("/{session_id}/react")
@@ -0,0 +1,136 @@
+"""Circuit breakers for external dependencies.
+
+A breaker opens after ``failure_threshold`` consecutive failures and
+rejects calls with ``CircuitOpenError`` for ``recovery_timeout`` seconds,
+then lets probe calls through (half-open) to decide whether to close.
+"""
+
+import time
+from enum import Enum
+
+from app.core.config import settings
+from app.core.exceptions import ExternalServiceError
+from app.core.logging import get_logger
+from app.core.metrics import CIRCUIT_BREAKER_STATE
+
+logger = get_logger("circuit_breaker")
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+# Gauge encoding
+_STATE_VALUE = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class CircuitOpenError(ExternalServiceError):
+    def __init__(self, service: str):
+        super().__init__(service, "circuit open, failing fast")
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int | None = None,
+        recovery_timeout: float | None = None,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.breaker_failure_threshold
+        self.recovery_timeout = (
+            recovery_timeout if recovery_timeout is not None else settings.breaker_recovery_seconds
+        )
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_started_at = 0.0
+        CIRCUIT_BREAKER_STATE.labels(dependency=name).set(0)
+
+    def _transition(self, state: CircuitState) -> None:
+        if state == self._state:
+            return
+        logger.warning(
+            "circuit_breaker_transition",
+            dependency=self.name,
+            from_state=self._state.value,
+            to_state=state.value,
+        )
+        self._state = state
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        if state != CircuitState.HALF_OPEN:
+            self._probes_in_flight = 0
+        CIRCUIT_BREAKER_STATE.labels(dependency=self.name).set(_STATE_VALUE[state])
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call may proceed; counts half-open probes."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN:
+            now = time.monotonic()
+            if now - self._probe_started_at >= self.recovery_timeout:
+                # A probe that never reported back (e.g. cancelled) must not
+                # wedge the breaker half-open forever
+                self._probes_in_flight = 0
+            if self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                self._probe_started_at = now
+                return True
+        return False
+
+    def check(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call may proceed."""
+        if not self.allow_request():
+            raise CircuitOpenError(self.name)
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self._state != CircuitState.CLOSED:
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        if self._state == CircuitState.HALF_OPEN:
+            self._transition(CircuitState.OPEN)
+            return
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._transition(CircuitState.OPEN)
+
+    def reset(self) -> None:
+        """Force the breaker closed (ops tooling and tests)."""
+        self._failures = 0
+        self._transition(CircuitState.CLOSED)
+
+    def snapshot(self) -> dict:
+        state = self.state
+        return {
+            "state": state.value,
+            "consecutive_failures": self._failures,
+            "retry_in_seconds": (
+                round(max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at)), 1)
+                if state == CircuitState.OPEN
+                else None
+            ),
+        }
+
+
+tmdb_breaker = CircuitBreaker("TMDB")
+anthropic_breaker = CircuitBreaker("Anthropic")
+
+BREAKERS = {"tmdb": tmdb_breaker, "anthropic": anthropic_breaker}
@@ -45,11 +45,91 @@ class Settings(BaseSettings):
     sentry_dsn: str = ""
     sentry_traces_sample_rate: float = 0.1
 
+    # AI spend & adaptive model routing
+    ai_hourly_budget_usd: float = 5.0
+    router_enabled: bool = True
+    router_budget_soft_pct: float = 0.8  # start stepping down borderline requests
+    router_opus_p95_seconds: float = 12.0
+    router_sonnet_p95_seconds: float = 8.0
+    router_max_error_rate: float = 0.25
+    router_min_samples: int = 5  # calls in window before health signals count
+
+    # Claude admission control (per model)
+    claude_max_in_flight: int = 8
+    claude_max_queue: int = 32
+    claude_max_queue_wait_seconds: float = 10.0
+
+    # Claude call deadline & hedging
+    claude_deadline_seconds: float = 20.0  # total budget across retries
+    claude_hedge_after_seconds: float = 0.0  # 0 disables hedging to a cheaper tier
+
+    # Prompt encoding A/B: share of sessions (0-100) whose candidates are
+    # sent in the compact table encoding instead of labelled lines
+    prompt_compact_pct: int = 0
+
+    # Circuit breakers (TMDB, Anthropic)
+    breaker_failure_threshold: int = 5  # consecutive failures before opening
+    breaker_recovery_seconds: float = 30.0  # open time before a half-open probe
+
+    # Offline pre-generation of popular patterns (Message Batches API).
+    # Off by default: with the anthropic backend every run is a paid batch
+    pregen_enabled: bool = False
+    pregen_hour: int = 16  # UTC, ahead of the evening peak
+    pregen_top_patterns: int = 50
+    pregen_min_requests: int = 3  # decayed request count before a pattern qualifies
+    pregen_batch_backend: str = "anthropic"  # "anthropic" or "local" (no model call)
+    pregen_batch_timeout_seconds: float = 3600.0
+
+    # Ops warmup (POST /ops/warmup): trending, per-genre discover, movie
+    # details and popular pattern-cache entries
+    warmup_concurrency: int = 8
+    warmup_tmdb_rate_per_second: float = 20.0  # well under TMDB's ~40 req/s
+    warmup_discover_pages: int = 1  # discover pages per genre
+    warmup_movies_per_genre: int = 10  # top discover results whose details are warmed
+    warmup_top_patterns: int = 20  # 0 skips pattern pre-generation
+
+    # HTTP caching of /movies responses (browsers and CDNs); the Redis
+    # entries behind them live longer
+    movies_trending_max_age_seconds: int = 300
+    movies_details_max_age_seconds: int = 3600
+    movies_batch_max_ids: int = 50  # GET /movies?ids=...
+
+    # Response compression (zstd/brotli when installed, else gzip)
+    compression_enabled: bool = True
+    compression_min_bytes: int = 1024  # smaller bodies go out as-is
+    compression_variant_cache_entries: int = 256  # compressed bodies reused by ETag
+
     # TMDB
     tmdb_base_url: str = "https://api.themoviedb.org/3"
     tmdb_image_base_url: str = "https://image.tmdb.org/t/p"
     tmdb_sync_enabled: bool = True
     tmdb_sync_hour: int = 3  # UTC hour for nightly sync
+    tmdb_max_connections: int = 20  # also caps concurrent requests (streams over HTTP/2)
+    tmdb_max_keepalive_connections: int = 10
+    tmdb_keepalive_expiry_seconds: float = 30.0
+    tmdb_connect_timeout_seconds: float = 3.0
+    tmdb_read_timeout_seconds: float = 10.0
+    tmdb_pool_timeout_seconds: float = 5.0  # wait for a free connection slot
+    tmdb_http2: bool = True  # used only when the h2 package is installed
+    # Client-side rate budget (token bucket); background sync/warmup leave
+    # the reserve to interactive requests
+    tmdb_rate_per_second: float = 35.0
+    tmdb_rate_burst: int = 40
+    tmdb_rate_background_reserve: int = 10
+    tmdb_rate_max_wait_seconds: float = 5.0  # interactive only
+    tmdb_rate_shared: bool = False  # one bucket across workers, kept in Redis
+    tmdb_max_retry_after_seconds: float = 10.0  # longer 429 pauses fail the request
+    # Cached TMDB bodies are served as-is while fresh, then revalidated with
+    # ETag/Last-Modified; entries are kept for the retain window so stale
+    # ones still have validators
+    tmdb_details_cache_seconds: int = 21600
+    tmdb_discover_cache_seconds: int = 3600
+    tmdb_cache_retain_seconds: int = 604800
+    # Negative cache: 404s, and URLs failing upstream tmdb_failure_threshold
+    # times within tmdb_failure_cache_seconds, fail fast for a while
+    tmdb_not_found_cache_seconds: int = 21600
+    tmdb_failure_cache_seconds: int = 300
+    tmdb_failure_threshold: int = 3
 
     @property
     def is_production(self) -> bool:
@@ -8,7 +8,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.exceptions import AuthenticationError, credentials_exception
-from app.core.redis import RedisCache, RateLimiter, SessionStore, get_redis
+from app.core.redis import (
+    ByteCache,
+    RateLimiter,
+    RedisCache,
+    SessionStore,
+    get_binary_redis,
+    get_redis,
+)
 from app.db.models import User
 from app.db.session import get_db
 from app.services.auth_service import decode_token
@@ -55,6 +62,12 @@ async def get_cache(
     return RedisCache(r)
 
 
+async def get_byte_cache(
+    r: aioredis.Redis = Depends(get_binary_redis),
+) -> ByteCache:
+    return ByteCache(r)
+
+
 async def get_session_store(
     r: aioredis.Redis = Depends(get_redis),
 ) -> SessionStore:
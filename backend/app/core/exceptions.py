@@ -31,13 +31,24 @@ class RateLimitError(FilmMatchError):
 
 
 class ExternalServiceError(FilmMatchError):
-    def __init__(self, service: str, detail: str = ""):
+    def __init__(self, service: str, detail: str = "", upstream_status: int | None = None):
+        # Status the dependency answered with (None: no answer, e.g. connection error)
+        self.upstream_status = upstream_status
         super().__init__(
             message=f"External service error ({service}): {detail}",
             status_code=502,
         )
 
 
+class ServiceOverloadedError(FilmMatchError):
+    def __init__(self, service: str, retry_after: int = 5):
+        self.retry_after = retry_after
+        super().__init__(
+            message=f"{service} is at capacity. Retry after {retry_after} seconds.",
+            status_code=503,
+        )
+
+
 def credentials_exception() -> HTTPException:
     return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
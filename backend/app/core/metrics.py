@@ -1,6 +1,6 @@
 """Prometheus metrics for FilmMatch AI."""
 
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 # Recommendation metrics
 RECOMMENDATIONS_TOTAL = Counter(
@@ -11,9 +11,16 @@ RECOMMENDATIONS_TOTAL = Counter(
 
 RECOMMENDATION_LATENCY = Histogram(
     "filmmatch_recommendation_latency_seconds",
-    "Recommendation generation latency",
-    ["mode"],
-    buckets=[0.5, 1.0, 2.0, 5.0, 10.0, 30.0],
+    "End-to-end recommendation latency, including pattern cache hits",
+    ["mode", "cache"],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0],
+)
+
+RECOMMENDATION_STAGE_LATENCY = Histogram(
+    "filmmatch_recommendation_stage_latency_seconds",
+    "Recommendation pipeline latency per stage",
+    ["stage", "mode", "tier", "cache"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0],
 )
 
 # Claude API metrics
@@ -23,6 +30,62 @@ CLAUDE_REQUESTS_TOTAL = Counter(
     ["model", "status"],
 )
 
+CLAUDE_TOKENS_TOTAL = Counter(
+    "filmmatch_claude_tokens_total",
+    "Claude tokens consumed, by kind (input, output, cache_creation, cache_read)",
+    ["model", "tier", "kind"],
+)
+
+CLAUDE_COST_USD_TOTAL = Counter(
+    "filmmatch_claude_cost_usd_total",
+    "Estimated Claude spend in USD",
+    ["model", "tier"],
+)
+
+MODEL_ROUTING_DECISIONS_TOTAL = Counter(
+    "filmmatch_model_routing_decisions_total",
+    "Model routing decisions (requested by complexity vs. selected by router)",
+    ["requested", "selected"],
+)
+
+CLAUDE_QUEUE_DEPTH = Gauge(
+    "filmmatch_claude_queue_depth",
+    "Claude calls waiting for an admission slot",
+    ["model"],
+)
+
+CLAUDE_IN_FLIGHT = Gauge(
+    "filmmatch_claude_in_flight",
+    "Claude calls currently holding an admission slot",
+    ["model"],
+)
+
+CLAUDE_QUEUE_WAIT = Histogram(
+    "filmmatch_claude_queue_wait_seconds",
+    "Time spent waiting for a Claude admission slot",
+    ["model", "priority"],
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0],
+)
+
+CLAUDE_ADMISSION_REJECTED_TOTAL = Counter(
+    "filmmatch_claude_admission_rejected_total",
+    "Claude calls rejected because the wait queue was full or timed out",
+    ["model", "priority", "reason"],
+)
+
+CLAUDE_HEDGED_TOTAL = Counter(
+    "filmmatch_claude_hedged_total",
+    "Claude calls where a hedge request to a cheaper tier was raced",
+    ["model", "winner"],
+)
+
+CLAUDE_PROMPT_TOKENS = Histogram(
+    "filmmatch_claude_prompt_tokens",
+    "Prompt tokens per first-turn recommendation call, by candidate encoding",
+    ["encoding", "tier"],
+    buckets=[500, 1000, 1500, 2000, 3000, 4000, 6000, 8000, 12000],
+)
+
 CLAUDE_FALLBACK_TOTAL = Counter(
     "filmmatch_claude_fallback_total",
     "Times Claude API failed and fallback was used",
@@ -35,6 +98,22 @@ TMDB_REQUESTS_TOTAL = Counter(
     ["endpoint", "status"],
 )
 
+TMDB_POOL_WAIT = Histogram(
+    "filmmatch_tmdb_pool_wait_seconds",
+    "Time TMDB requests waited for a connection slot",
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0],
+)
+
+TMDB_POOL_IN_USE = Gauge(
+    "filmmatch_tmdb_pool_in_use",
+    "TMDB requests currently holding a connection slot",
+)
+
+TMDB_POOL_UTILIZATION = Gauge(
+    "filmmatch_tmdb_pool_utilization",
+    "Share of TMDB connection slots in use (0-1)",
+)
+
 TMDB_CACHE_HITS = Counter(
     "filmmatch_tmdb_cache_hits_total",
     "TMDB cache hits",
@@ -45,6 +124,44 @@ TMDB_CACHE_MISSES = Counter(
     "TMDB cache misses",
 )
 
+TMDB_REVALIDATIONS_TOTAL = Counter(
+    "filmmatch_tmdb_revalidations_total",
+    "Conditional TMDB requests for stale cached bodies (not_modified = 304)",
+    ["result"],
+)
+
+TMDB_RESPONSE_BYTES = Counter(
+    "filmmatch_tmdb_response_bytes_total",
+    "TMDB response bytes by kind, as received (raw) and after projection (slim)",
+    ["kind", "form"],
+)
+
+TMDB_NEGATIVE_CACHE_TOTAL = Counter(
+    "filmmatch_tmdb_negative_cache_total",
+    "Negative-cached TMDB lookups (event: stored/hit; reason: not_found/failing)",
+    ["event", "reason"],
+)
+
+TMDB_RATE_WAIT = Histogram(
+    "filmmatch_tmdb_rate_wait_seconds",
+    "Time TMDB requests waited for a rate-budget token",
+    ["priority"],
+    buckets=[0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0],
+)
+
+TMDB_THROTTLED_TOTAL = Counter(
+    "filmmatch_tmdb_throttled_total",
+    "TMDB throttling events (retry_after = 429 from TMDB, budget_exhausted = gave up waiting)",
+    ["reason"],
+)
+
+# Response compression metrics
+HTTP_COMPRESSION_BYTES = Counter(
+    "filmmatch_http_compression_bytes_total",
+    "Response body bytes compressed by the middleware, before (raw) and after (compressed)",
+    ["coding", "form"],
+)
+
 # Auth metrics
 AUTH_EVENTS = Counter(
     "filmmatch_auth_events_total",
@@ -58,3 +175,10 @@ RATE_LIMIT_HITS = Counter(
     "Requests rejected by rate limiting",
     ["route"],
 )
+
+# Circuit breaker metrics
+CIRCUIT_BREAKER_STATE = Gauge(
+    "filmmatch_circuit_breaker_state",
+    "Circuit breaker state per dependency (0=closed, 1=half-open, 2=open)",
+    ["dependency"],
+)
@@ -9,6 +9,7 @@ from app.core.logging import get_logger
 logger = get_logger("redis")
 
 _redis_client: redis.Redis | None = None
+_binary_client: redis.Redis | None = None
 
 
 async def get_redis() -> redis.Redis:
@@ -26,11 +27,22 @@ async def get_redis() -> redis.Redis:
     return _redis_client
 
 
+async def get_binary_redis() -> redis.Redis:
+    """A client returning raw bytes, for pre-serialized and compressed values."""
+    global _binary_client
+    if _binary_client is None:
+        _binary_client = redis.from_url(settings.redis_url)
+    return _binary_client
+
+
 async def close_redis() -> None:
-    global _redis_client
+    global _redis_client, _binary_client
     if _redis_client is not None:
         await _redis_client.close()
         _redis_client = None
+    if _binary_client is not None:
+        await _binary_client.close()
+        _binary_client = None
 
 
 class RedisCache:
@@ -47,6 +59,23 @@ class RedisCache:
             logger.warning("redis_get_failed", key=key)
             return None
 
+    async def get_many_json(self, keys: list[str]) -> list[Any | None]:
+        """Values for ``keys`` from one MGET; None where missing."""
+        try:
+            values = await self.client.mget(keys)
+            return [json.loads(v) if v is not None else None for v in values]
+        except Exception:
+            logger.warning("redis_get_failed", key=keys[0], keys=len(keys))
+            return [None] * len(keys)
+
+    async def get_raw(self, key: str) -> str | None:
+        """The stored JSON text, unparsed."""
+        try:
+            return await self.client.get(key)
+        except Exception:
+            logger.warning("redis_get_failed", key=key)
+            return None
+
     async def set_json(self, key: str, value: Any, ttl_seconds: int = 3600) -> None:
         try:
             await self.client.set(key, json.dumps(value), ex=ttl_seconds)
@@ -71,6 +100,34 @@ class RedisCache:
             return 1
 
 
+class ByteCache:
+    """Raw byte values: pre-serialized (and pre-compressed) responses.
+
+    Fails open like ``RedisCache``: errors read as misses and writes are
+    dropped.
+    """
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        try:
+            return await self.client.mget(keys)
+        except Exception:
+            logger.warning("redis_get_failed", key=keys[0], keys=len(keys))
+            return [None] * len(keys)
+
+    async def set_many(self, values: dict[str, bytes], ttl_seconds: int = 3600) -> None:
+        """Write all values atomically, with one TTL."""
+        try:
+            pipe = self.client.pipeline()
+            for key, value in values.items():
+                pipe.set(key, value, ex=ttl_seconds)
+            await pipe.execute()
+        except Exception:
+            logger.warning("redis_set_failed", key=next(iter(values)), keys=len(values))
+
+
 class SessionStore:
     """Redis-backed session store for active recommendation sessions.
 
@@ -0,0 +1,92 @@
+"""JSON responses without FastAPI's re-validation round trip.
+
+Hot routes return a ``Response`` built from a trusted model (or stored
+bytes) and keep ``response_model`` only for the OpenAPI schema.
+"""
+
+import hashlib
+
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+class PreserializedJSONResponse(Response):
+    """A response whose body is already-encoded JSON."""
+
+    media_type = "application/json"
+
+
+def json_response(content: BaseModel | bytes, status_code: int = 200) -> Response:
+    """Serialize a trusted model (or pass through JSON bytes) as the response."""
+    if isinstance(content, BaseModel):
+        content = content.__pydantic_serializer__.to_json(content)
+    return PreserializedJSONResponse(content, status_code=status_code)
+
+
+def weak_etag(body: bytes) -> str:
+    """A weak ETag for ``body``, shared by all of its content encodings."""
+    return f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def parse_accept_encoding(accept_encoding: str | None) -> dict[str, float]:
+    """Content-coding -> q-value from an Accept-Encoding header."""
+    weights: dict[str, float] = {}
+    for item in (accept_encoding or "").split(","):
+        name, *params = item.split(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    pass
+        weights[name] = q
+    return weights
+
+
+def accepts_encoding(accept_encoding: str | None, coding: str) -> bool:
+    """Whether an Accept-Encoding header allows ``coding`` (q > 0)."""
+    weights = parse_accept_encoding(accept_encoding)
+    return weights.get(coding, weights.get("*", 0.0)) > 0
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against ``etag``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def cached_json_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    max_age: int,
+    gzip_body: bytes | None = None,
+) -> Response:
+    """Serve a stored JSON body, or a 304 if the client's copy is current.
+
+    The weak ``etag`` covers every encoding of the body; ``gzip_body`` is
+    sent as is to clients that accept gzip.
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if gzip_body is not None and accepts_encoding(request.headers.get("accept-encoding"), "gzip"):
+        headers["Content-Encoding"] = "gzip"
+        return PreserializedJSONResponse(gzip_body, headers=headers)
+    return PreserializedJSONResponse(body, headers=headers)
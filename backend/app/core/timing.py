@@ -0,0 +1,51 @@
+"""Per-stage timing for request pipelines.
+
+Records when each named stage started (relative to the pipeline start)
+and how long it took. Stages may overlap when they run concurrently, so
+both offsets and durations are kept — the stage that ends last is the
+critical path.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from prometheus_client import Histogram
+
+
+class StageTimer:
+    def __init__(self) -> None:
+        self._origin = time.monotonic()
+        # stage name -> (start offset, duration), both in seconds
+        self.stages: dict[str, tuple[float, float]] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stages[name] = (start - self._origin, time.monotonic() - start)
+
+    def elapsed(self) -> float:
+        """Seconds since the timer was created."""
+        return time.monotonic() - self._origin
+
+    def critical_path(self) -> list[str]:
+        """Stage names ordered by when they finished."""
+        return sorted(self.stages, key=lambda n: sum(self.stages[n]))
+
+    def observe(self, histogram: Histogram, **labels: str) -> None:
+        """Export every recorded stage to a histogram with a ``stage`` label."""
+        for name, (_, duration) in self.stages.items():
+            histogram.labels(stage=name, **labels).observe(duration)
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        """Stage timings in milliseconds, suitable for logs and session data."""
+        return {
+            name: {
+                "start_ms": round(start * 1000, 1),
+                "duration_ms": round(duration * 1000, 1),
+            }
+            for name, (start, duration) in self.stages.items()
+        }
@@ -86,6 +86,9 @@ class Movie(Base):
     cast_names: Mapped[list[str] | None] = mapped_column(ARRAY(Text))
     content_rating: Mapped[str | None] = mapped_column(String(10))
     keywords: Mapped[list[str] | None] = mapped_column(ARRAY(Text))
+    # Ready-made candidate lines for prompts, rebuilt when the fingerprint changes
+    prompt_fragments: Mapped[dict | None] = mapped_column(JSONB)
+    prompt_fingerprint: Mapped[str | None] = mapped_column(String(16))
     last_synced_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
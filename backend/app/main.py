@@ -3,9 +3,10 @@ from contextlib import asynccontextmanager
 import sentry_sdk
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
 
+from app.api.middleware.compression import CompressionMiddleware
 from app.api.middleware.rate_limit import RateLimitMiddleware
 from app.api.middleware.request_id import RequestIDMiddleware
 from app.api.routes import auth, groups, movies, ops, recommend, users
@@ -34,23 +35,39 @@ async def lifespan(app: FastAPI):
     _init_sentry()
     logger.info("starting", environment=settings.environment)
 
-    # Start background scheduler for nightly TMDB sync
+    # Start background scheduler for nightly TMDB sync and pre-peak
+    # pattern pre-generation
     scheduler = None
-    if settings.tmdb_sync_enabled:
+    if settings.tmdb_sync_enabled or settings.pregen_enabled:
         from apscheduler.schedulers.asyncio import AsyncIOScheduler
+        from app.services.pregeneration import run_scheduled_pregeneration
         from app.services.sync_service import sync_tmdb_catalog
 
         scheduler = AsyncIOScheduler()
-        scheduler.add_job(
-            sync_tmdb_catalog,
-            "cron",
-            hour=settings.tmdb_sync_hour,
-            minute=0,
-            id="tmdb_nightly_sync",
-            replace_existing=True,
-        )
+        if settings.tmdb_sync_enabled:
+            scheduler.add_job(
+                sync_tmdb_catalog,
+                "cron",
+                hour=settings.tmdb_sync_hour,
+                minute=0,
+                id="tmdb_nightly_sync",
+                replace_existing=True,
+            )
+        if settings.pregen_enabled:
+            scheduler.add_job(
+                run_scheduled_pregeneration,
+                "cron",
+                hour=settings.pregen_hour,
+                minute=0,
+                id="pattern_pregeneration",
+                replace_existing=True,
+            )
         scheduler.start()
-        logger.info("scheduler_started", sync_hour=settings.tmdb_sync_hour)
+        logger.info(
+            "scheduler_started",
+            sync_hour=settings.tmdb_sync_hour if settings.tmdb_sync_enabled else None,
+            pregen_hour=settings.pregen_hour if settings.pregen_enabled else None,
+        )
 
     yield
 
@@ -66,9 +83,12 @@ app = FastAPI(
     description="AI-powered movie recommendation engine — solo or with friends",
     version="0.3.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Middleware (order matters — outermost first)
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
 app.add_middleware(RateLimitMiddleware)
 app.add_middleware(RequestIDMiddleware)
 app.add_middleware(
@@ -83,9 +103,11 @@ app.add_middleware(
 # Global error handler
 @app.exception_handler(FilmMatchError)
 async def filmmatch_error_handler(request: Request, exc: FilmMatchError):
+    retry_after = getattr(exc, "retry_after", None)
     return JSONResponse(
         status_code=exc.status_code,
         content={"error": exc.message},
+        headers={"Retry-After": str(retry_after)} if retry_after else None,
     )
 
 
@@ -0,0 +1,136 @@
+"""Admission control for Claude calls.
+
+Caps concurrent requests per model and queues the overflow by priority;
+a full queue or an overlong wait raises ``ServiceOverloadedError`` so the
+caller can fall back.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from app.core.config import settings
+from app.core.exceptions import ServiceOverloadedError
+from app.core.logging import get_logger
+from app.core.metrics import (
+    CLAUDE_ADMISSION_REJECTED_TOTAL,
+    CLAUDE_IN_FLIGHT,
+    CLAUDE_QUEUE_DEPTH,
+    CLAUDE_QUEUE_WAIT,
+)
+
+logger = get_logger("admission")
+
+
+class Priority(IntEnum):
+    """Queue order, lowest served first."""
+
+    REFINE = 0  # follow-up turn in an active session
+    USER = 1  # first request from a logged-in user
+    ANONYMOUS = 2
+
+
+@dataclass
+class _ModelGate:
+    in_flight: int = 0
+    # heap of (priority, sequence, future) — sequence keeps FIFO within a priority
+    waiters: list[tuple[int, int, asyncio.Future]] = field(default_factory=list)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_in_flight: int | None = None,
+        max_queue: int | None = None,
+        max_wait_seconds: float | None = None,
+    ):
+        self.max_in_flight = max_in_flight or settings.claude_max_in_flight
+        self.max_queue = max_queue if max_queue is not None else settings.claude_max_queue
+        self.max_wait_seconds = max_wait_seconds or settings.claude_max_queue_wait_seconds
+        self._gates: dict[str, _ModelGate] = {}
+        self._seq = itertools.count()
+
+    def _gate(self, model: str) -> _ModelGate:
+        if model not in self._gates:
+            self._gates[model] = _ModelGate()
+        return self._gates[model]
+
+    def _update_gauges(self, model: str, gate: _ModelGate) -> None:
+        CLAUDE_IN_FLIGHT.labels(model=model).set(gate.in_flight)
+        CLAUDE_QUEUE_DEPTH.labels(model=model).set(len(gate.waiters))
+
+    def _reject(self, model: str, priority: Priority, reason: str) -> ServiceOverloadedError:
+        CLAUDE_ADMISSION_REJECTED_TOTAL.labels(
+            model=model, priority=priority.name.lower(), reason=reason
+        ).inc()
+        logger.warning("claude_admission_rejected", model=model, priority=priority.name, reason=reason)
+        return ServiceOverloadedError("AI service")
+
+    async def _acquire(self, model: str, priority: Priority) -> None:
+        gate = self._gate(model)
+        start = time.monotonic()
+
+        if gate.in_flight < self.max_in_flight and not gate.waiters:
+            gate.in_flight += 1
+        else:
+            if len(gate.waiters) >= self.max_queue:
+                raise self._reject(model, priority, "queue_full")
+
+            future: asyncio.Future = asyncio.get_running_loop().create_future()
+            entry = (int(priority), next(self._seq), future)
+            heapq.heappush(gate.waiters, entry)
+            self._update_gauges(model, gate)
+            try:
+                await asyncio.wait_for(future, timeout=self.max_wait_seconds)
+            except BaseException as e:
+                if future.done() and not future.cancelled():
+                    # The slot was handed over just as we gave up — pass it on
+                    self._release(model)
+                if entry in gate.waiters:
+                    gate.waiters.remove(entry)
+                    heapq.heapify(gate.waiters)
+                self._update_gauges(model, gate)
+                if isinstance(e, asyncio.TimeoutError):
+                    raise self._reject(model, priority, "wait_timeout") from None
+                raise
+
+        CLAUDE_QUEUE_WAIT.labels(model=model, priority=priority.name.lower()).observe(
+            time.monotonic() - start
+        )
+        self._update_gauges(model, gate)
+
+    def _release(self, model: str) -> None:
+        gate = self._gate(model)
+        # Hand the slot straight to the highest-priority live waiter
+        while gate.waiters:
+            _, _, future = heapq.heappop(gate.waiters)
+            if not future.done():
+                future.set_result(None)
+                self._update_gauges(model, gate)
+                return
+        gate.in_flight -= 1
+        self._update_gauges(model, gate)
+
+    @asynccontextmanager
+    async def slot(self, model: str, priority: Priority) -> AsyncIterator[None]:
+        """Hold one in-flight slot for ``model`` for the duration of the block."""
+        await self._acquire(model, priority)
+        try:
+            yield
+        finally:
+            self._release(model)
+
+    def snapshot(self) -> dict:
+        return {
+            model: {"in_flight": gate.in_flight, "queued": len(gate.waiters)}
+            for model, gate in self._gates.items()
+        }
+
+
+# Singleton
+admission_controller = AdmissionController()
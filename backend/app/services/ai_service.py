@@ -1,26 +1,64 @@
+import asyncio
+import contextlib
 import hashlib
 import json
+import random
+import time
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
 
 import anthropic
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.circuit_breaker import CircuitOpenError, anthropic_breaker
 from app.core.config import settings
+from app.core.exceptions import (
+    ExternalServiceError,
+    FilmMatchError,
+    ServiceOverloadedError,
+)
 from app.core.logging import get_logger
 from app.core.metrics import (
     CLAUDE_FALLBACK_TOTAL,
+    CLAUDE_HEDGED_TOTAL,
+    CLAUDE_PROMPT_TOKENS,
     CLAUDE_REQUESTS_TOTAL,
     RECOMMENDATION_LATENCY,
+    RECOMMENDATION_STAGE_LATENCY,
     RECOMMENDATIONS_TOTAL,
 )
 from app.core.redis import RedisCache, SessionStore
+from app.core.timing import StageTimer
 from app.schemas.recommendation import (
     MovieSummary,
     RecommendationRequest,
     RecommendationResponse,
 )
-from app.services.tmdb_service import MovieCandidate, tmdb_service
+from app.services.admission import Priority, admission_controller
+from app.services.catalog import load_catalog_candidates
+from app.services.model_router import (
+    MODEL_LADDER,
+    TIER_MIN_SCORE,
+    TIER_MODELS,
+    cheaper_model,
+    model_router,
+)
+from app.services.prompt_fragments import (
+    COMPACT_PLOT_CHARS,
+    candidate_fragment,
+    compact_variant,
+)
+from app.services.taste_profile import TasteProfile, compute_taste_profile
+from app.services.tmdb_service import (
+    COMPACT_ROW_HEADER,
+    GENRE_CODES,
+    GENRE_MAP,
+    MovieCandidate,
+    tmdb_service,
+)
+from app.services.usage_tracker import TokenUsage, usage_tracker
 
 logger = get_logger("ai_service")
 
@@ -33,7 +71,11 @@ _client: anthropic.AsyncAnthropic | None = None
 def _get_client() -> anthropic.AsyncAnthropic:
     global _client
     if _client is None:
-        _client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+        # Retries are owned by _call_model (deadline + jittered backoff);
+        # SDK-level retries would multiply them
+        _client = anthropic.AsyncAnthropic(
+            api_key=settings.anthropic_api_key, max_retries=0
+        )
     return _client
 
 
@@ -66,6 +108,206 @@ def _get_system_prompt_with_cache_control() -> list[dict]:
     ]
 
 
+# ---------------------------------------------------------------------------
+# Model calls: admission, deadline-aware retries, hedging
+# ---------------------------------------------------------------------------
+
+# Provider errors that will fail the same way on retry
+NON_RETRYABLE_STATUS = {400, 401, 403, 404, 413, 422}
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 4.0
+
+
+@dataclass
+class ModelCallResult:
+    text: str
+    model: str  # model that produced the answer (a hedge may win)
+    usage: TokenUsage
+    cost_usd: float
+    attempts: int
+
+
+def _retry_after_seconds(error: Exception) -> float | None:
+    """Seconds the provider asked us to wait, if it said so."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    return status not in NON_RETRYABLE_STATUS
+
+
+def _is_provider_failure(error: Exception) -> bool:
+    """Whether an error says Anthropic is unhealthy (vs. a bad request)."""
+    status = getattr(error, "status_code", None)
+    return status is None or status == 429 or status >= 500
+
+
+async def _single_call(
+    model: str,
+    tier: str,
+    messages: list[dict],
+    priority: Priority,
+) -> tuple[str, TokenUsage, float]:
+    """One admitted model call, with outcome fed back to router and metrics."""
+    anthropic_breaker.check()
+    async with admission_controller.slot(model, priority):
+        start = time.monotonic()
+        try:
+            response = await _get_client().messages.create(
+                model=model,
+                max_tokens=1500,
+                system=_get_system_prompt_with_cache_control(),
+                messages=messages,
+            )
+        except Exception as e:
+            model_router.record_call(model, time.monotonic() - start, ok=False)
+            CLAUDE_REQUESTS_TOTAL.labels(model=model, status="error").inc()
+            if _is_provider_failure(e):
+                anthropic_breaker.record_failure()
+            else:
+                anthropic_breaker.record_success()
+            raise
+    model_router.record_call(model, time.monotonic() - start, ok=True)
+    anthropic_breaker.record_success()
+    CLAUDE_REQUESTS_TOTAL.labels(model=model, status="success").inc()
+
+    usage = TokenUsage.from_response(response.usage)
+    cost_usd = usage_tracker.record(model, tier, usage)
+    if usage.cache_creation_tokens or usage.cache_read_tokens:
+        logger.info(
+            "prompt_cache_stats",
+            model=model,
+            cache_creation_tokens=usage.cache_creation_tokens,
+            cache_read_tokens=usage.cache_read_tokens,
+            savings_pct=round(usage.cache_read_tokens / max(usage.input_tokens, 1) * 100, 1),
+        )
+    return response.content[0].text, usage, cost_usd
+
+
+async def _hedged_call(
+    model: str,
+    tier: str,
+    messages: list[dict],
+    priority: Priority,
+    hedge_after: float,
+) -> tuple[str, TokenUsage, float, str]:
+    """Call ``model``; if it is slow, race a request to the next cheaper tier.
+
+    Whichever answers first wins and the other is cancelled. A failed
+    call only loses the race — the other one can still succeed.
+    """
+    hedge_model = cheaper_model(model) if hedge_after > 0 else None
+    tasks: dict[asyncio.Task, str] = {
+        asyncio.create_task(_single_call(model, tier, messages, priority)): model
+    }
+    hedged = False
+    try:
+        if hedge_model is not None:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                logger.info("claude_hedge_launched", model=model, hedge_model=hedge_model)
+                hedge = _single_call(hedge_model, tier, messages, priority)
+                tasks[asyncio.create_task(hedge)] = hedge_model
+                hedged = True
+
+        last_error: BaseException | None = None
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                used_model = tasks.pop(task)
+                if task.exception() is None:
+                    if hedged:
+                        CLAUDE_HEDGED_TOTAL.labels(
+                            model=model,
+                            winner="hedge" if used_model != model else "primary",
+                        ).inc()
+                    text, usage, cost_usd = task.result()
+                    return text, usage, cost_usd, used_model
+                last_error = task.exception()
+        assert last_error is not None
+        raise last_error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _call_model(
+    model: str,
+    tier: str,
+    messages: list[dict],
+    priority: Priority,
+    max_attempts: int = 3,
+) -> ModelCallResult:
+    """Shared model call wrapper used by every recommendation path.
+
+    Retries retryable errors (Retry-After or jittered backoff) and may hedge
+    to a cheaper tier, all within ``claude_deadline_seconds``; admission
+    rejections and an open Anthropic breaker fail fast. Raises
+    ``ServiceOverloadedError`` or ``ExternalServiceError``; callers fall
+    back to the local ranker on either.
+    """
+    deadline = time.monotonic() + settings.claude_deadline_seconds
+    last_error: Exception | None = None
+
+    for attempt in range(1, max_attempts + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        attempt_started = time.monotonic()
+        try:
+            text, usage, cost_usd, used_model = await asyncio.wait_for(
+                _hedged_call(
+                    model, tier, messages, priority, settings.claude_hedge_after_seconds
+                ),
+                timeout=remaining,
+            )
+            return ModelCallResult(
+                text=text,
+                model=used_model,
+                usage=usage,
+                cost_usd=cost_usd,
+                attempts=attempt,
+            )
+        except (ServiceOverloadedError, CircuitOpenError):
+            raise
+        except TimeoutError as e:
+            # The deadline cancelled a call that never answered, so
+            # _single_call recorded nothing: a hanging Anthropic is a failure
+            model_router.record_call(model, time.monotonic() - attempt_started, ok=False)
+            CLAUDE_REQUESTS_TOTAL.labels(model=model, status="error").inc()
+            anthropic_breaker.record_failure()
+            logger.error("claude_api_timeout", model=model, attempt=attempt)
+            last_error = e
+            break
+        except Exception as e:
+            last_error = e
+            logger.error(
+                "claude_api_error",
+                model=model,
+                attempt=attempt,
+                error=str(e) or type(e).__name__,
+            )
+            if not _is_retryable(e) or attempt == max_attempts:
+                break
+            delay = _retry_after_seconds(e)
+            if delay is None:
+                delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+            if time.monotonic() + delay >= deadline:
+                logger.warning("claude_retry_skipped_deadline", model=model, delay=round(delay, 2))
+                break
+            await asyncio.sleep(delay)
+
+    raise ExternalServiceError("Anthropic", str(last_error) or "deadline exceeded")
+
+
 # ---------------------------------------------------------------------------
 # Complexity scoring & model routing
 # ---------------------------------------------------------------------------
@@ -155,15 +397,13 @@ def compute_complexity(request: RecommendationRequest) -> ComplexityScore:
             reasons.append(f"{ctx_count} context fields (+{ctx_count})")
 
     # Determine tier and model
-    if score >= 6:
+    if score >= TIER_MIN_SCORE["complex"]:
         tier = "complex"
-        model = "claude-opus-4-6"
-    elif score >= 3:
+    elif score >= TIER_MIN_SCORE["moderate"]:
         tier = "moderate"
-        model = "claude-sonnet-4-5-20250929"
     else:
         tier = "simple"
-        model = "claude-haiku-4-5-20250514"
+    model = TIER_MODELS[tier]
 
     return ComplexityScore(score=score, tier=tier, model=model, reasons=reasons)
 
@@ -216,22 +456,205 @@ def _normalize_cache_key(request: RecommendationRequest) -> str:
     return f"rec:pattern:{digest}"
 
 
+# Request frequency per pattern key, and a canonical request for each key,
+# mined by the offline pre-generation job (services/pregeneration.py)
+PATTERN_FREQ_KEY = "rec:pattern_freq"
+PATTERN_REQUESTS_KEY = "rec:pattern_requests"
+
+
+def _pattern_request(request: RecommendationRequest) -> dict:
+    """The request reduced to the fields that make up its cache key.
+
+    Names, free text and other per-user details are dropped so the stored
+    pattern carries no personal data and regenerates the same key.
+    """
+    users = [
+        {
+            "name": f"User {i + 1}",
+            "likes_genres": user.likes_genres,
+            "dislikes_genres": user.dislikes_genres,
+            "mood": user.mood,
+            "favorite_actors": user.favorite_actors,
+            "favorite_directors": user.favorite_directors,
+            "year_range": user.year_range.model_dump() if user.year_range else None,
+        }
+        for i, user in enumerate(request.users)
+    ]
+    pattern: dict = {"mode": request.mode, "users": users}
+    if request.context:
+        pattern["context"] = {
+            "occasion": request.context.occasion,
+            "energy": request.context.energy,
+            "want_something_new": request.context.want_something_new,
+        }
+    return pattern
+
+
+async def _record_pattern(
+    cache: RedisCache, cache_key: str, request: RecommendationRequest
+) -> None:
+    """Count one request against its pattern; never fails the request."""
+    try:
+        await asyncio.gather(
+            cache.client.zincrby(PATTERN_FREQ_KEY, 1, cache_key),
+            cache.client.hsetnx(
+                PATTERN_REQUESTS_KEY, cache_key, json.dumps(_pattern_request(request))
+            ),
+        )
+    except Exception:
+        logger.warning("pattern_record_failed", cache_key=cache_key)
+
+
+# ---------------------------------------------------------------------------
+# Taste profile personalization
+# ---------------------------------------------------------------------------
+
+# Max tokens the implicit taste profile may add to the prompt, per tier.
+# Cheap tiers get a tighter budget so personalization never dominates cost.
+PROFILE_TOKEN_BUDGET: dict[str, int] = {
+    "simple": 60,
+    "moderate": 120,
+    "complex": 200,
+}
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def _budget_profile_context(profile: TasteProfile | None, tier: str) -> str:
+    """Render the profile for the prompt, trimmed to the tier's token budget.
+
+    ``to_prompt_context`` emits lines from most to least informative
+    (genres first), so whole lines are dropped from the end until it fits.
+    """
+    if profile is None:
+        return ""
+    budget = PROFILE_TOKEN_BUDGET.get(tier, PROFILE_TOKEN_BUDGET["simple"])
+    lines = [line for line in profile.to_prompt_context().split("\n") if line]
+    while lines and _estimate_tokens("\n".join(lines)) > budget:
+        lines.pop()
+    return "\n".join(lines)
+
+
+async def _load_taste_profile(
+    user_id: str | None,
+    db: AsyncSession | None,
+    cache: RedisCache | None,
+) -> TasteProfile | None:
+    """Load the user's taste profile; personalization is best-effort."""
+    if not user_id or db is None:
+        return None
+    try:
+        return await compute_taste_profile(user_id=user_id, db=db, cache=cache)
+    except Exception as e:
+        logger.warning("taste_profile_load_failed", user_id=user_id, error=str(e))
+        return None
+
+
+def _filter_seen(
+    candidates: list[MovieCandidate], profile: TasteProfile | None
+) -> list[MovieCandidate]:
+    """Drop movies the user already watched or dismissed.
+
+    Keeps the original list if filtering would leave nothing to recommend.
+    """
+    if profile is None or not profile.excluded_tmdb_ids:
+        return candidates
+    excluded = set(profile.excluded_tmdb_ids)
+    filtered = [c for c in candidates if c.tmdb_id not in excluded]
+    if len(filtered) < len(candidates):
+        logger.info(
+            "seen_candidates_filtered",
+            removed=len(candidates) - len(filtered),
+            remaining=len(filtered),
+        )
+    return filtered or candidates
+
+
 # ---------------------------------------------------------------------------
 # Prompt building
 # ---------------------------------------------------------------------------
 
+RESPONSE_FORMAT = """Respond in this exact JSON format:
+{
+  "best_pick": {
+    "tmdb_id": <int>,
+    "rationale": "<2-3 bullet reasons>",
+    "match_score": <1-10>
+  },
+  "additional_picks": [
+    {
+      "tmdb_id": <int>,
+      "rationale": "<one-line reason>",
+      "match_score": <1-10>
+    }
+  ],
+  "narrow_question": "<one question to help narrow down further>",
+  "overlap_summary": "<only for group mode: describe what the group shares>"
+}
+
+Return 5 additional picks. Be concise. No spoilers."""
+
+
+def _choose_encoding(session_id: str) -> str:
+    """A/B bucket for candidate encoding, stable per session."""
+    pct = settings.prompt_compact_pct
+    if pct <= 0:
+        return "full"
+    bucket = int(hashlib.sha256(session_id.encode()).hexdigest()[:8], 16) % 100
+    return "compact" if bucket < pct else "full"
+
+
+def _format_candidates(
+    candidates: list[MovieCandidate],
+    encoding: str = "full",
+    tier: str = "moderate",
+    numbered: bool = True,
+) -> str:
+    """Candidate list in the requested encoding.
+
+    ``full`` is one labelled line per movie. ``compact`` is a header row
+    followed by positional pipe-separated rows with genre codes (legend
+    limited to codes that appear) and a per-tier plot length. Lines come
+    from precomputed prompt fragments.
+    """
+    if encoding == "compact":
+        plot_chars = COMPACT_PLOT_CHARS.get(tier, COMPACT_PLOT_CHARS["moderate"])
+        variant = compact_variant(plot_chars)
+        rows = [candidate_fragment(c, variant) for c in candidates]
+        used = sorted({g for c in candidates for g in c.genre_ids if g in GENRE_CODES})
+        legend = ", ".join(f"{GENRE_CODES[g]}={GENRE_MAP[g]}" for g in used)
+        header = f"Columns: {COMPACT_ROW_HEADER}\nGenres: {legend}"
+    else:
+        rows = [candidate_fragment(c, "full") for c in candidates]
+        header = ""
+
+    lines = [f"  {i + 1}. {row}" for i, row in enumerate(rows)] if numbered else rows
+    return "\n".join(([header] if header else []) + lines)
+
+
 def _build_candidate_prompt(
     candidates: list[MovieCandidate],
     request: RecommendationRequest,
+    profile_context: str = "",
+    encoding: str = "full",
+    tier: str = "moderate",
 ) -> str:
     """Build the user message with verified movie candidates."""
-    movies_block = "\n".join(
-        f"  {i + 1}. {c.to_prompt_string()}" for i, c in enumerate(candidates)
-    )
+    movies_block = _format_candidates(candidates, encoding, tier)
 
-    user_prefs = json.dumps(
-        request.model_dump(exclude_none=True), indent=2, default=str
-    )
+    if encoding == "compact":
+        user_prefs = json.dumps(
+            {"mode": request.mode, **request.model_dump(exclude_none=True, exclude_defaults=True)},
+            separators=(",", ":"),
+            default=str,
+        )
+    else:
+        user_prefs = json.dumps(
+            request.model_dump(exclude_none=True), indent=2, default=str
+        )
 
     # Collect all dealbreakers across users
     all_dealbreakers = []
@@ -243,69 +666,58 @@ def _build_candidate_prompt(
         items = ", ".join(f'"{d}"' for d in all_dealbreakers)
         dealbreaker_block = f"\n\nDEALBREAKERS (Save me from...): [{items}]\nAVOID any movie that matches these dealbreakers.\n"
 
+    profile_block = ""
+    if profile_context:
+        profile_block = f"\n\nLONG-TERM TASTE (from this user's history):\n{profile_context}"
+
     return f"""Here are {len(candidates)} verified movies to consider:
 
 {movies_block}
 
 User request:
-{user_prefs}{dealbreaker_block}
+{user_prefs}{profile_block}{dealbreaker_block}
 
 IMPORTANT RULES:
 - You MUST ONLY recommend movies from the numbered list above.
 - Reference movies by their TMDB ID.
 - Do NOT recommend any movie not in this list.
 
-Respond in this exact JSON format:
-{{
-  "best_pick": {{
-    "tmdb_id": <int>,
-    "rationale": "<2-3 bullet reasons>",
-    "match_score": <1-10>
-  }},
-  "additional_picks": [
-    {{
-      "tmdb_id": <int>,
-      "rationale": "<one-line reason>",
-      "match_score": <1-10>
-    }}
-  ],
-  "narrow_question": "<one question to help narrow down further>",
-  "overlap_summary": "<only for group mode: describe what the group shares>"
-}}
-
-Return 5 additional picks. Be concise. No spoilers."""
+{RESPONSE_FORMAT}"""
 
 
 def _candidate_to_summary(
     candidate: MovieCandidate, match_score: float | None = None, rationale: str = ""
 ) -> MovieSummary:
-    poster_url = (
-        f"{settings.tmdb_image_base_url}/w500{candidate.poster_path}"
-        if candidate.poster_path
-        else None
-    )
-    backdrop_url = (
-        f"{settings.tmdb_image_base_url}/w1280{candidate.backdrop_path}"
-        if candidate.backdrop_path
-        else None
-    )
-    year = candidate.release_date[:4] if candidate.release_date else None
-
-    return MovieSummary(
-        tmdb_id=candidate.tmdb_id,
-        title=candidate.title,
-        year=year,
-        genres=candidate.genres,
-        vote_average=candidate.vote_average,
-        runtime=candidate.runtime,
-        poster_url=poster_url,
-        backdrop_url=backdrop_url,
-        overview=candidate.overview,
-        directors=candidate.director_names,
-        cast=candidate.cast_names[:5],
-        match_score=match_score,
-        rationale=rationale,
-    )
+    # Validating a plain dict runs entirely in pydantic-core, which is
+    # cheaper than keyword construction (and than model_construct)
+    return MovieSummary.model_validate({
+        "tmdb_id": candidate.tmdb_id,
+        "title": candidate.title,
+        "year": candidate.year,
+        "genres": candidate.genres,
+        "vote_average": candidate.vote_average,
+        "runtime": candidate.runtime,
+        "poster_url": candidate.poster_url,
+        "backdrop_url": candidate.backdrop_url,
+        "overview": candidate.overview,
+        "directors": candidate.director_names,
+        "cast": candidate.cast_names[:5],
+        "match_score": match_score,
+        "rationale": rationale,
+    })
+
+
+def _load_response_json(raw_text: str) -> dict | None:
+    """JSON object from a model reply, unwrapping markdown code fences."""
+    text = raw_text.strip()
+    if text.startswith("```"):
+        lines = text.split("\n")
+        text = "\n".join(lines[1:-1]) if len(lines) > 2 else text
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
 
 
 def _parse_ai_response(
@@ -317,15 +729,8 @@ def _parse_ai_response(
     """Parse Claude's JSON response and validate against candidate set."""
     candidate_map = {c.tmdb_id: c for c in candidates}
 
-    # Extract JSON from potential markdown code blocks
-    text = raw_text.strip()
-    if text.startswith("```"):
-        lines = text.split("\n")
-        text = "\n".join(lines[1:-1]) if len(lines) > 2 else text
-
-    try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
+    data = _load_response_json(raw_text)
+    if data is None:
         logger.warning("ai_response_parse_failed", raw=raw_text[:200])
         # Fallback: use top candidates by vote_average
         sorted_candidates = sorted(candidates, key=lambda c: c.vote_average, reverse=True)
@@ -388,166 +793,334 @@ def _parse_ai_response(
     )
 
 
+def _fallback_response(
+    candidates: list[MovieCandidate], session_id: str, model: str
+) -> RecommendationResponse:
+    """Rank by vote average when the model is unavailable."""
+    CLAUDE_FALLBACK_TOTAL.inc()
+    logger.warning("claude_fallback_activated", candidates=len(candidates))
+    sorted_candidates = sorted(candidates, key=lambda c: c.vote_average, reverse=True)
+    return RecommendationResponse(
+        session_id=session_id,
+        best_pick=_candidate_to_summary(sorted_candidates[0], match_score=8.0, rationale="Top rated match (AI temporarily unavailable)"),
+        additional_picks=[
+            _candidate_to_summary(c, match_score=round(7.0 - i * 0.5, 1), rationale="Highly rated match")
+            for i, c in enumerate(sorted_candidates[1:6])
+        ],
+        narrow_question="Would you prefer something more action-packed or more character-driven?",
+        model_used=f"{model} (fallback)",
+    )
+
+
+# ---------------------------------------------------------------------------
+# Conversation state for refine turns
+# ---------------------------------------------------------------------------
+
+# Refine turns continue the first turn's conversation so the candidate block
+# is served from the provider prompt cache. Past this many turns the
+# conversation is restarted to keep the replayed history bounded.
+MAX_CONVERSATION_TURNS = 6
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def _cacheable_user_turn(*texts: str) -> dict:
+    """User message with a prompt-cache breakpoint on its last block."""
+    blocks: list[dict] = [{"type": "text", "text": t} for t in texts]
+    blocks[-1]["cache_control"] = CACHE_CONTROL
+    return {"role": "user", "content": blocks}
+
+
+def _history_for_session(messages: list[dict]) -> list[dict]:
+    """Copy of ``messages`` that keeps only the candidate-block breakpoint.
+
+    The provider allows four breakpoints per request: the system prompt,
+    the opening candidate block and the newest turn stay within that limit
+    however long the conversation gets.
+    """
+    history = []
+    for i, message in enumerate(messages):
+        content = message["content"]
+        if isinstance(content, list):
+            content = [
+                block if (i, j) == (0, 0)
+                else {k: v for k, v in block.items() if k != "cache_control"}
+                for j, block in enumerate(content)
+            ]
+        history.append({"role": message["role"], "content": content})
+    return history
+
+
+def _build_refine_candidate_block(
+    candidates: list[MovieCandidate],
+    preferences: dict,
+    encoding: str = "full",
+    tier: str = "moderate",
+) -> str:
+    """Opening block when a refine turn starts a new conversation."""
+    candidates_text = _format_candidates(candidates, encoding, tier, numbered=False)
+    return f"""Here are the verified movie candidates to choose from:
+{candidates_text}
+
+User preferences: {json.dumps(preferences)}
+
+{RESPONSE_FORMAT}"""
+
+
+def _build_refine_turn(
+    feedback: str,
+    keep_ids: list[int],
+    reject_ids: list[int],
+    available_ids: list[int],
+    new_candidates: list[MovieCandidate],
+    encoding: str = "full",
+    tier: str = "moderate",
+) -> str:
+    """Refine instructions; only candidates new to the conversation are described."""
+    kept_text = f"Movies the user liked: {keep_ids}" if keep_ids else "The user rejected all previous suggestions."
+    new_block = ""
+    if new_candidates:
+        new_text = _format_candidates(new_candidates, encoding, tier, numbered=False)
+        new_block = f"\n\nNew verified candidates:\n{new_text}"
+    return f"""REFINEMENT REQUEST — the user has swiped through previous picks.
+
+{kept_text}
+Rejected movie IDs: {reject_ids}
+Feedback: {feedback}
+
+Candidates still available (TMDB IDs): {available_ids}{new_block}
+
+Pick the best match and 5 alternatives from the available candidates ONLY.
+{"Prioritize movies similar to the kept ones." if keep_ids else "Try a different angle — the user didn't connect with the previous batch."}
+Respond in the same JSON format."""
+
+
 # ---------------------------------------------------------------------------
 # Main recommendation flow
 # ---------------------------------------------------------------------------
 
+def _candidate_filters(request: RecommendationRequest) -> dict:
+    """Discover filters: genres merged across users, years and mood from the first."""
+    all_likes = []
+    all_dislikes = []
+    for user in request.users:
+        all_likes.extend(user.likes_genres)
+        all_dislikes.extend(user.dislikes_genres)
+
+    primary_user = request.users[0]
+    return {
+        "genre_names": all_likes or None,
+        "exclude_genre_names": all_dislikes or None,
+        "year_min": primary_user.year_range.min if primary_user.year_range else None,
+        "year_max": primary_user.year_range.max if primary_user.year_range else None,
+        "mood": primary_user.mood or None,
+    }
+
+
+def _observe_pipeline(
+    timer: StageTimer, mode: str, tier: str, cache_outcome: str
+) -> float:
+    """Export per-stage and end-to-end latency; returns total seconds."""
+    elapsed = timer.elapsed()
+    timer.observe(
+        RECOMMENDATION_STAGE_LATENCY, mode=mode, tier=tier, cache=cache_outcome
+    )
+    RECOMMENDATION_LATENCY.labels(mode=mode, cache=cache_outcome).observe(elapsed)
+    return elapsed
+
+
+async def _cancel_and_wait(task: asyncio.Task) -> None:
+    # The profile load shares the request's db session: let it unwind before
+    # get_db commits or rolls back
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+def _read_cached_response(cached: str) -> dict | None:
+    """The picks of a pattern-cache entry, or None if it is unreadable."""
+    try:
+        hit = orjson.loads(cached)
+        hit["best_pick"]["tmdb_id"]
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        logger.warning("pattern_cache_unreadable")
+        return None
+    return hit
+
+
+def _cached_response_bytes(cached: str, session_id: str) -> bytes:
+    """Response body for a pattern-cache hit.
+
+    Entries are the response JSON without ``session_id`` (cached responses
+    were validated before they were stored), so the body is the stored text
+    with this request's session id spliced in rather than a parse, validate
+    and re-serialize round trip.
+    """
+    return b'{"session_id":' + orjson.dumps(session_id) + b"," + cached[1:].encode()
+
+
 async def get_recommendation(
     request: RecommendationRequest,
     cache: RedisCache | None = None,
     session_store: SessionStore | None = None,
-) -> RecommendationResponse:
-    """Get movie recommendations using the hybrid TMDB + Claude approach."""
+    user_id: str | None = None,
+    db: AsyncSession | None = None,
+) -> RecommendationResponse | bytes:
+    """Get movie recommendations using the hybrid TMDB + Claude approach.
+
+    Anonymous requests may be served from the pattern cache, as
+    pre-serialized JSON bytes; otherwise the taste profile loads while
+    candidates are fetched. The local catalog and ranker stand in when TMDB
+    or Claude are unavailable.
+    """
     session_id = str(uuid.uuid4())
+    timer = StageTimer()
+
+    async def _timed_profile() -> TasteProfile | None:
+        with timer.stage("profile_load"):
+            return await _load_taste_profile(user_id, db, cache)
+
+    async def _timed_cache_lookup() -> str | None:
+        # Shared entries are neither personalized nor filtered for titles the
+        # user has seen, so only requests without a profile are served them
+        if not cache or personalizable:
+            return None
+        with timer.stage("cache_lookup"):
+            if not settings.pregen_enabled:
+                return await cache.get_raw(cache_key)
+            # Only pre-generation reads the counts, and its runs trim them
+            cached, _ = await asyncio.gather(
+                cache.get_raw(cache_key),
+                _record_pattern(cache, cache_key, request),
+            )
+            return cached
 
-    # Check pattern cache first
+    # Stage 1: pattern cache; hits never touch the db session or TMDB
+    personalizable = bool(user_id) and db is not None
     cache_key = _normalize_cache_key(request)
-    if cache:
-        cached = await cache.get_json(cache_key)
-        if cached:
-            logger.info("pattern_cache_hit", cache_key=cache_key)
-            cached["session_id"] = session_id
-            result = RecommendationResponse(**cached)
-            # Still store session for multi-turn even on cache hit
-            if session_store:
+    cached = await _timed_cache_lookup()
+
+    # Complexity is pure CPU — needed for routing and for metric labels
+    complexity = compute_complexity(request)
+    model = complexity.model
+
+    hit = _read_cached_response(cached) if cached else None
+    if hit is not None:
+        logger.info("pattern_cache_hit", cache_key=cache_key)
+        best_id = hit["best_pick"]["tmdb_id"]
+        additional_ids = [p["tmdb_id"] for p in hit.get("additional_picks", [])]
+        # Still store session for multi-turn even on cache hit
+        if session_store:
+            with timer.stage("session_write"):
                 await session_store.set(session_id, {
                     "session_id": session_id,
                     "preferences": request.model_dump(exclude_none=True),
-                    "candidate_tmdb_ids": [p.tmdb_id for p in result.additional_picks]
-                    + [result.best_pick.tmdb_id],
-                    "presented_tmdb_ids": [result.best_pick.tmdb_id]
-                    + [p.tmdb_id for p in result.additional_picks],
+                    "candidate_tmdb_ids": additional_ids + [best_id],
+                    "presented_tmdb_ids": [best_id] + additional_ids,
                     "reactions": [],
                     "turn_count": 1,
-                    "model_used": result.model_used,
+                    "model_used": hit.get("model_used", ""),
                     "total_tokens": 0,
                     "from_cache": True,
                 })
-            return result
-
-    # Extract preferences from first user (solo) or merge (group)
-    all_likes = []
-    all_dislikes = []
-    for user in request.users:
-        all_likes.extend(user.likes_genres)
-        all_dislikes.extend(user.dislikes_genres)
+        _observe_pipeline(timer, request.mode, complexity.tier, cache_outcome="hit")
+        return _cached_response_bytes(cached, session_id)
 
-    primary_user = request.users[0]
-    year_min = primary_user.year_range.min if primary_user.year_range else None
-    year_max = primary_user.year_range.max if primary_user.year_range else None
-    mood = primary_user.mood if hasattr(primary_user, "mood") and primary_user.mood else None
-
-    # Step 1: Fetch verified candidates from TMDB
+    # Stage 2: fetch verified candidates from TMDB while the profile loads
+    filters = _candidate_filters(request)
     logger.info(
         "fetching_candidates",
-        genres=all_likes,
-        exclude=all_dislikes,
-        year_range=(year_min, year_max),
-        mood=mood,
-    )
-    candidates = await tmdb_service.fetch_candidates(
-        genre_names=all_likes if all_likes else None,
-        exclude_genre_names=all_dislikes if all_dislikes else None,
-        year_min=year_min,
-        year_max=year_max,
-        mood=mood,
-        max_candidates=30,
+        genres=filters["genre_names"],
+        exclude=filters["exclude_genre_names"],
+        year_range=(filters["year_min"], filters["year_max"]),
+        mood=filters["mood"],
     )
-
-    if not candidates:
-        # Fallback to trending if no candidates match
-        logger.warning("no_candidates_from_discover, falling_back_to_trending")
-        trending = await tmdb_service.get_trending()
-        for movie in trending[:20]:
+    from_catalog = False
+    profile_task = asyncio.create_task(_timed_profile())
+    try:
+        with timer.stage("candidates"):
             try:
-                candidates.append(await tmdb_service.enrich_movie(movie))
-            except Exception:
-                continue
+                candidates = await tmdb_service.fetch_candidates(
+                    **filters, max_candidates=30, timer=timer
+                )
+
+                if not candidates:
+                    # Fallback to trending if no candidates match
+                    logger.warning("no_candidates_from_discover, falling_back_to_trending")
+                    trending = await tmdb_service.get_trending()
+                    candidates = await tmdb_service.enrich_many(trending[:20])
+            except ExternalServiceError as e:
+                # TMDB is down (or its breaker is open): serve from the local catalog
+                if db is None:
+                    raise
+                logger.warning("tmdb_unavailable_using_catalog", error=e.message)
+                # The db session is shared with the profile load — let it finish first
+                await asyncio.wait({profile_task})
+                candidates = await load_catalog_candidates(db, **filters, max_candidates=30)
+                from_catalog = True
+    except BaseException:
+        await _cancel_and_wait(profile_task)
+        raise
+
+    profile = await profile_task
 
     if not candidates:
-        from app.core.exceptions import ExternalServiceError
         raise ExternalServiceError("TMDB", "No movie candidates found")
 
-    # Step 2: Compute complexity and select model
-    complexity = compute_complexity(request)
-    model = complexity.model
-    prompt = _build_candidate_prompt(candidates, request)
+    candidates = _filter_seen(candidates, profile)
+
+    # Complexity picks the tier; the router adjusts it for live latency,
+    # error rate and spend
+    routing = model_router.route(complexity.model, complexity.tier, complexity.score)
+    model = routing.model
+
+    with timer.stage("prompt_build"):
+        profile_context = _budget_profile_context(profile, complexity.tier)
+        encoding = _choose_encoding(session_id)
+        prompt = _build_candidate_prompt(
+            candidates, request, profile_context, encoding, complexity.tier
+        )
 
     logger.info(
         "calling_claude",
         model=model,
         candidate_count=len(candidates),
+        profile_tokens=_estimate_tokens(profile_context),
         complexity_score=complexity.score,
         complexity_tier=complexity.tier,
         complexity_reasons=complexity.reasons,
     )
 
-    # Step 3: Call Claude with prompt caching on system prompt (with retry)
-    import time as _time
-    _start = _time.monotonic()
-
-    client = _get_client()
-    raw_text = None
-    total_tokens = 0
-    ai_failed = False
-
-    for attempt in range(3):
+    # Step 3: Call Claude; system prompt and candidate block are cacheable so
+    # refine turns continuing this conversation hit the prompt cache
+    priority = Priority.USER if user_id else Priority.ANONYMOUS
+    messages = [_cacheable_user_turn(prompt)]
+    call: ModelCallResult | None = None
+    with timer.stage("model_call"):
         try:
-            response = await client.messages.create(
-                model=model,
-                max_tokens=1500,
-                system=_get_system_prompt_with_cache_control(),
-                messages=[{"role": "user", "content": prompt}],
-            )
-            raw_text = response.content[0].text
-            total_tokens = response.usage.input_tokens + response.usage.output_tokens
-            CLAUDE_REQUESTS_TOTAL.labels(model=model, status="success").inc()
-
-            # Log cache savings if available
-            cache_creation = getattr(response.usage, "cache_creation_input_tokens", 0) or 0
-            cache_read = getattr(response.usage, "cache_read_input_tokens", 0) or 0
-            if cache_creation or cache_read:
-                logger.info(
-                    "prompt_cache_stats",
-                    cache_creation_tokens=cache_creation,
-                    cache_read_tokens=cache_read,
-                    savings_pct=round(cache_read / max(response.usage.input_tokens, 1) * 100, 1),
-                )
-            break
-        except Exception as e:
-            CLAUDE_REQUESTS_TOTAL.labels(model=model, status="error").inc()
-            logger.error(
-                "claude_api_error",
-                model=model,
-                attempt=attempt + 1,
-                error=str(e),
-            )
-            if attempt < 2:
-                import asyncio
-                await asyncio.sleep(1.0 * (attempt + 1))
-            else:
-                ai_failed = True
+            call = await _call_model(model, complexity.tier, messages, priority)
+            model = call.model
+        except FilmMatchError:
+            call = None
+    if call is not None:
+        u = call.usage
+        CLAUDE_PROMPT_TOKENS.labels(encoding=encoding, tier=complexity.tier).observe(
+            u.input_tokens + u.cache_creation_tokens + u.cache_read_tokens
+        )
+    total_tokens = call.usage.total if call else 0
+    cost_usd = call.cost_usd if call else 0.0
 
     # Step 4: Parse and validate response (or fallback)
-    if ai_failed or raw_text is None:
-        CLAUDE_FALLBACK_TOTAL.inc()
-        logger.warning("claude_fallback_activated", candidates=len(candidates))
-        sorted_candidates = sorted(candidates, key=lambda c: c.vote_average, reverse=True)
-        result = RecommendationResponse(
-            session_id=session_id,
-            best_pick=_candidate_to_summary(sorted_candidates[0], match_score=8.0, rationale="Top rated match (AI temporarily unavailable)"),
-            additional_picks=[
-                _candidate_to_summary(c, match_score=round(7.0 - i * 0.5, 1), rationale="Highly rated match")
-                for i, c in enumerate(sorted_candidates[1:6])
-            ],
-            narrow_question="Would you prefer something more action-packed or more character-driven?",
-            model_used=f"{model} (fallback)",
-        )
-    else:
-        result = _parse_ai_response(raw_text, candidates, session_id, model)
+    with timer.stage("parse"):
+        if call is None:
+            result = _fallback_response(candidates, session_id, model)
+        else:
+            result = _parse_ai_response(call.text, candidates, session_id, model)
 
-    # Store in pattern cache for future identical requests
-    if cache:
+    # Store in pattern cache for future identical requests — results built
+    # with a profile (personalized or seen-filtered) are specific to one
+    # user; fallbacks and catalog-sourced (degraded) results are not worth
+    # keeping
+    if cache and profile is None and call is not None and not from_catalog:
         cache_data = result.model_dump()
         cache_data.pop("session_id", None)
         await cache.set_json(cache_key, cache_data, ttl_seconds=PATTERN_CACHE_TTL)
@@ -558,22 +1131,35 @@ async def get_recommendation(
             "session_id": session_id,
             "preferences": request.model_dump(exclude_none=True),
             "candidate_tmdb_ids": [c.tmdb_id for c in candidates],
+            "candidate_details": _compact_candidates(candidates),
             "presented_tmdb_ids": [result.best_pick.tmdb_id]
             + [p.tmdb_id for p in result.additional_picks],
             "reactions": [],
             "turn_count": 1,
             "model_used": model,
             "total_tokens": total_tokens,
+            "estimated_cost_usd": round(cost_usd, 6),
+            "personalized": bool(profile_context),
+            "seen_tmdb_ids": profile.excluded_tmdb_ids if profile else [],
             "complexity": {
                 "score": complexity.score,
                 "tier": complexity.tier,
                 "reasons": complexity.reasons,
             },
+            "routing": routing.to_dict(),
+            "prompt_encoding": encoding,
+            "stage_timings_ms": timer.as_dict(),
         }
-        await session_store.set(session_id, session_data)
+        if call is not None:
+            session_data["messages"] = _history_for_session(
+                messages + [{"role": "assistant", "content": call.text}]
+            )
+            session_data["conversation_tmdb_ids"] = [c.tmdb_id for c in candidates]
+            session_data["cache_read_ratios"] = [round(call.usage.cache_read_ratio, 3)]
+        with timer.stage("session_write"):
+            await session_store.set(session_id, session_data)
 
-    _elapsed = _time.monotonic() - _start
-    RECOMMENDATION_LATENCY.labels(mode=request.mode).observe(_elapsed)
+    _elapsed = _observe_pipeline(timer, request.mode, complexity.tier, cache_outcome="miss")
     RECOMMENDATIONS_TOTAL.labels(
         mode=request.mode, model=model, complexity_tier=complexity.tier
     ).inc()
@@ -583,15 +1169,54 @@ async def get_recommendation(
         session_id=session_id,
         model=model,
         tokens=total_tokens,
+        cost_usd=round(cost_usd, 6),
         candidates=len(candidates),
         picks=1 + len(result.additional_picks),
         complexity_tier=complexity.tier,
+        prompt_encoding=encoding,
         latency_seconds=round(_elapsed, 2),
+        stages=timer.as_dict(),
+        critical_path=timer.critical_path(),
     )
 
     return result
 
 
+def _compact_candidates(candidates: list[MovieCandidate]) -> dict[str, list]:
+    """Candidate details keyed by TMDB id, compact enough to keep in the session."""
+    return {str(c.tmdb_id): c.to_compact() for c in candidates}
+
+
+async def _rebuild_candidates(
+    tmdb_ids: list[int], details: dict[str, list]
+) -> list[MovieCandidate]:
+    """Rebuild candidates from session details; fetch only the misses.
+
+    Misses (sessions started from a cache hit, or stored before details
+    were kept) are enriched concurrently. Order follows ``tmdb_ids``.
+    """
+    rebuilt: dict[int, MovieCandidate] = {}
+    missing: list[int] = []
+    for tmdb_id in tmdb_ids:
+        compact = details.get(str(tmdb_id))
+        candidate = MovieCandidate.from_compact(compact) if compact else None
+        if candidate is None:
+            missing.append(tmdb_id)
+        else:
+            rebuilt[tmdb_id] = candidate
+
+    if missing:
+        for candidate in await tmdb_service.enrich_many([{"id": i} for i in missing]):
+            rebuilt[candidate.tmdb_id] = candidate
+
+    logger.info(
+        "refine_candidates_rebuilt",
+        from_session=len(tmdb_ids) - len(missing),
+        fetched=len(missing),
+    )
+    return [rebuilt[i] for i in tmdb_ids if i in rebuilt]
+
+
 async def refine_recommendation(
     session_id: str,
     feedback: str,
@@ -599,27 +1224,33 @@ async def refine_recommendation(
     reject_ids: list[int],
     session_store: SessionStore,
     cache: RedisCache | None = None,
+    db: AsyncSession | None = None,
 ) -> RecommendationResponse:
-    """Refine recommendations based on user feedback."""
+    """Refine recommendations based on user feedback.
+
+    Fresh candidates come from the local catalog when TMDB is unavailable
+    and a ``db`` session is given.
+    """
     session_data = await session_store.get(session_id)
     if session_data is None:
         from app.core.exceptions import NotFoundError
         raise NotFoundError("Session", session_id)
 
     # Re-fetch remaining candidates with full details
-    all_rejected = set(reject_ids) | set(session_data.get("presented_tmdb_ids", []))
-    remaining_ids = set(session_data["candidate_tmdb_ids"]) - all_rejected
-    # Also keep any that were explicitly kept
-    remaining_ids.update(keep_ids)
+    all_rejected = (
+        set(reject_ids)
+        | set(session_data.get("presented_tmdb_ids", []))
+        | set(session_data.get("seen_tmdb_ids", []))
+    )
+    # Pool order is preserved; explicitly kept movies stay in the pool
+    remaining_ids = [
+        i for i in session_data["candidate_tmdb_ids"] if i not in all_rejected
+    ]
+    remaining_ids += [i for i in keep_ids if i not in remaining_ids]
 
-    remaining_candidates = []
-    for tmdb_id in remaining_ids:
-        try:
-            details = await tmdb_service.get_movie_details(tmdb_id)
-            candidate = await tmdb_service.enrich_movie({"id": tmdb_id, **details})
-            remaining_candidates.append(candidate)
-        except Exception:
-            continue
+    remaining_candidates = await _rebuild_candidates(
+        remaining_ids, session_data.get("candidate_details", {})
+    )
 
     # If we've exhausted the original pool, fetch fresh candidates
     if len(remaining_candidates) < 6:
@@ -634,14 +1265,21 @@ async def refine_recommendation(
         year_min = year_range.get("min") if year_range else None
         year_max = year_range.get("max") if year_range else None
 
-        fresh = await tmdb_service.fetch_candidates(
-            genre_names=likes or None,
-            exclude_genre_names=dislikes or None,
-            year_min=year_min,
-            year_max=year_max,
-            mood=mood,
-            max_candidates=30,
-        )
+        filters = {
+            "genre_names": likes or None,
+            "exclude_genre_names": dislikes or None,
+            "year_min": year_min,
+            "year_max": year_max,
+            "mood": mood,
+        }
+        try:
+            fresh = await tmdb_service.fetch_candidates(**filters, max_candidates=30)
+        except ExternalServiceError as e:
+            # TMDB is down (or its breaker is open): serve from the local catalog
+            if db is None:
+                raise
+            logger.warning("tmdb_unavailable_using_catalog", error=e.message)
+            fresh = await load_catalog_candidates(db, **filters, max_candidates=30)
         # Filter out anything already shown
         for c in fresh:
             if c.tmdb_id not in all_rejected and c.tmdb_id not in {rc.tmdb_id for rc in remaining_candidates}:
@@ -650,47 +1288,79 @@ async def refine_recommendation(
                     break
 
     if not remaining_candidates:
-        from app.core.exceptions import FilmMatchError
         raise FilmMatchError("No more candidates available. Try starting a new session.", 422)
 
-    # Build prompt with actual candidate descriptions
-    candidates_text = "\n".join(c.to_prompt_string() for c in remaining_candidates)
-    kept_text = f"Movies the user liked: {keep_ids}" if keep_ids else "The user rejected all previous suggestions."
-    context = f"""REFINEMENT REQUEST — the user has swiped through previous picks.
-
-{kept_text}
-Rejected movie IDs: {reject_ids}
-Feedback: {feedback}
-User preferences: {json.dumps(session_data['preferences'])}
-
-Here are the remaining verified movie candidates to choose from:
-{candidates_text}
-
-Pick the best match and 5 alternatives from these candidates ONLY.
-{"Prioritize movies similar to the kept ones." if keep_ids else "Try a different angle — the user didn't connect with the previous batch."}
-Respond in the same JSON format."""
-
-    model = session_data.get("model_used", "claude-haiku-4-5-20250514")
-    client = _get_client()
-
-    response = await client.messages.create(
-        model=model,
-        max_tokens=1500,
-        system=_get_system_prompt_with_cache_control(),
-        messages=[{"role": "user", "content": context}],
-    )
+    model = session_data.get("model_used", TIER_MODELS["simple"])
+    if model not in MODEL_LADDER:
+        # Sessions started from a cache hit or fallback carry a display label
+        model = TIER_MODELS["simple"]
+    tier = session_data.get("complexity", {}).get("tier", "simple")
+
+    # Keep the encoding the session started with
+    encoding = session_data.get("prompt_encoding", "full")
+
+    # Continue the stored conversation when there is one: the opening
+    # candidate block is then a prompt-cache read and only candidates the
+    # model has not seen yet are described in the new turn
+    history = session_data.get("messages") or []
+    in_conversation = set(session_data.get("conversation_tmdb_ids", []))
+    if len(history) // 2 > MAX_CONVERSATION_TURNS:
+        history, in_conversation = [], set()
+    available_ids = [c.tmdb_id for c in remaining_candidates]
+    if history:
+        new_candidates = [c for c in remaining_candidates if c.tmdb_id not in in_conversation]
+        turn = _cacheable_user_turn(
+            _build_refine_turn(
+                feedback, keep_ids, reject_ids, available_ids, new_candidates, encoding, tier
+            )
+        )
+    else:
+        turn = _cacheable_user_turn(
+            _build_refine_candidate_block(
+                remaining_candidates, session_data["preferences"], encoding, tier
+            ),
+            _build_refine_turn(feedback, keep_ids, reject_ids, available_ids, [], encoding, tier),
+        )
+    messages = history + [turn]
 
-    raw_text = response.content[0].text
-    result = _parse_ai_response(raw_text, remaining_candidates, session_id, model)
+    try:
+        call = await _call_model(model, tier, messages, Priority.REFINE)
+        result = _parse_ai_response(call.text, remaining_candidates, session_id, call.model)
+    except FilmMatchError:
+        call = None
+        result = _fallback_response(remaining_candidates, session_id, model)
 
     # Update session
     session_data["turn_count"] = session_data.get("turn_count", 1) + 1
+    if call is not None:
+        session_data["model_used"] = call.model
+        session_data["total_tokens"] = session_data.get("total_tokens", 0) + call.usage.total
+        session_data["estimated_cost_usd"] = round(
+            session_data.get("estimated_cost_usd", 0.0) + call.cost_usd, 6
+        )
+        session_data["messages"] = _history_for_session(
+            messages + [{"role": "assistant", "content": call.text}]
+        )
+        session_data["conversation_tmdb_ids"] = sorted(in_conversation | set(available_ids))
+        session_data.setdefault("cache_read_ratios", []).append(
+            round(call.usage.cache_read_ratio, 3)
+        )
+        logger.info(
+            "refine_turn_cache",
+            session_id=session_id,
+            turn=session_data["turn_count"],
+            cache_read_ratio=session_data["cache_read_ratios"][-1],
+            continued=bool(history),
+        )
     session_data["presented_tmdb_ids"].extend(
         [result.best_pick.tmdb_id] + [p.tmdb_id for p in result.additional_picks]
     )
-    # Add fresh candidates to the pool
-    session_data["candidate_tmdb_ids"] = list(
-        set(session_data["candidate_tmdb_ids"]) | {c.tmdb_id for c in remaining_candidates}
+    # Add fresh candidates to the pool, details included so the next turn
+    # can rebuild them without TMDB
+    pool = session_data["candidate_tmdb_ids"]
+    pool += [c.tmdb_id for c in remaining_candidates if c.tmdb_id not in pool]
+    session_data.setdefault("candidate_details", {}).update(
+        _compact_candidates(remaining_candidates)
     )
     await session_store.set(session_id, session_data)
 
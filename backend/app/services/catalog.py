@@ -0,0 +1,85 @@
+"""Local movie catalog — candidates from the nightly-synced Movie table.
+
+Used as a degraded-mode source when TMDB is unavailable (breaker open or
+retries exhausted). The catalog is only as fresh as the last sync and has
+no trending signal, but it keeps recommendations working.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.db.models import Movie
+from app.services.tmdb_service import (
+    MOOD_TO_GENRES,
+    MovieCandidate,
+    intern_labels,
+    tmdb_service,
+)
+
+logger = get_logger("catalog")
+
+
+def movie_to_candidate(movie: Movie) -> MovieCandidate:
+    """Convert a Movie row back into a MovieCandidate."""
+    genres, language = intern_labels(list(movie.genre_names or []), movie.original_language)
+    return MovieCandidate(
+        tmdb_id=movie.tmdb_id,
+        title=movie.title,
+        overview=movie.overview or "",
+        release_date=movie.release_date,
+        genres=genres,
+        genre_ids=list(movie.genres or []),
+        vote_average=float(movie.vote_average or 0),
+        vote_count=movie.vote_count or 0,
+        popularity=float(movie.popularity or 0),
+        runtime=movie.runtime,
+        poster_path=movie.poster_path,
+        backdrop_path=movie.backdrop_path,
+        original_language=language,
+        director_names=list(movie.director_names or []),
+        cast_names=list(movie.cast_names or []),
+        # Stored at sync time; candidate_fragment rebuilds if the version is stale
+        fragments=movie.prompt_fragments,
+    )
+
+
+async def load_catalog_candidates(
+    db: AsyncSession,
+    genre_names: list[str] | None = None,
+    exclude_genre_names: list[str] | None = None,
+    year_min: int | None = None,
+    year_max: int | None = None,
+    mood: list[str] | None = None,
+    max_candidates: int = 30,
+) -> list[MovieCandidate]:
+    """Best-rated catalog movies matching the same filters as TMDB discover."""
+    genre_ids = set(tmdb_service._resolve_genre_ids(genre_names or []))
+    for m in mood or []:
+        genre_ids.update(MOOD_TO_GENRES.get(m.lower().strip(), []))
+    exclude_ids = tmdb_service._resolve_genre_ids(exclude_genre_names or [])
+
+    query = select(Movie).where(Movie.vote_count >= 50)
+    if genre_ids:
+        query = query.where(Movie.genres.overlap(sorted(genre_ids)))
+    if exclude_ids:
+        query = query.where(~Movie.genres.overlap(exclude_ids))
+    if year_min:
+        query = query.where(Movie.release_date >= f"{year_min}-01-01")
+    if year_max:
+        query = query.where(Movie.release_date <= f"{year_max}-12-31")
+    query = query.order_by(
+        Movie.vote_average.desc().nulls_last(),
+        Movie.popularity.desc().nulls_last(),
+    ).limit(max_candidates)
+
+    result = await db.execute(query)
+    candidates = [movie_to_candidate(m) for m in result.scalars().all()]
+    logger.info("catalog_candidates_loaded", count=len(candidates))
+    return candidates
+
+
+async def load_catalog_movies(db: AsyncSession, tmdb_ids: list[int]) -> list[Movie]:
+    """Catalog rows for the given ids; ids not in the catalog are skipped."""
+    result = await db.execute(select(Movie).where(Movie.tmdb_id.in_(tmdb_ids)))
+    return list(result.scalars().all())
@@ -0,0 +1,208 @@
+"""Adaptive model routing.
+
+Adjusts the complexity-based model pick with live signals (hourly spend,
+p95 latency and error rate per model), only ever stepping down the ladder.
+"""
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import MODEL_ROUTING_DECISIONS_TOTAL
+from app.services.usage_tracker import UsageTracker, usage_tracker
+
+logger = get_logger("model_router")
+
+# Cheapest first
+MODEL_LADDER = [
+    "claude-haiku-4-5-20250514",
+    "claude-sonnet-4-5-20250929",
+    "claude-opus-4-6",
+]
+
+TIER_MODELS: dict[str, str] = {
+    "simple": MODEL_LADDER[0],
+    "moderate": MODEL_LADDER[1],
+    "complex": MODEL_LADDER[2],
+}
+
+# Minimum complexity score for each tier
+TIER_MIN_SCORE: dict[str, int] = {
+    "simple": 0,
+    "moderate": 3,
+    "complex": 6,
+}
+
+# Under soft budget pressure, requests scoring within this many points of
+# their tier's floor are treated as borderline and stepped down first
+BORDERLINE_MARGIN = 1
+
+
+def cheaper_model(model: str) -> str | None:
+    """Next model down the ladder, or None if already the cheapest."""
+    try:
+        idx = MODEL_LADDER.index(model)
+    except ValueError:
+        return None
+    return MODEL_LADDER[idx - 1] if idx > 0 else None
+
+
+@dataclass
+class RoutingDecision:
+    model: str
+    requested_model: str
+    tier: str
+    score: int
+    reasons: list[str] = field(default_factory=list)
+
+    @property
+    def downgraded(self) -> bool:
+        return self.model != self.requested_model
+
+    def to_dict(self) -> dict:
+        return {
+            "model": self.model,
+            "requested_model": self.requested_model,
+            "reasons": self.reasons,
+        }
+
+
+class ModelHealth:
+    """Rolling window of call outcomes for one model."""
+
+    def __init__(self, window_seconds: int):
+        self.window_seconds = window_seconds
+        # (timestamp, latency_seconds, ok)
+        self._calls: deque[tuple[float, float, bool]] = deque()
+
+    def record(self, latency: float, ok: bool) -> None:
+        now = time.monotonic()
+        self._calls.append((now, latency, ok))
+        self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    @property
+    def samples(self) -> int:
+        self._prune(time.monotonic())
+        return len(self._calls)
+
+    def p95(self) -> float | None:
+        self._prune(time.monotonic())
+        latencies = sorted(c[1] for c in self._calls if c[2])
+        if not latencies:
+            return None
+        return latencies[math.ceil(0.95 * len(latencies)) - 1]
+
+    def error_rate(self) -> float:
+        self._prune(time.monotonic())
+        if not self._calls:
+            return 0.0
+        return sum(1 for c in self._calls if not c[2]) / len(self._calls)
+
+
+class ModelRouter:
+    """Steps a request down ``MODEL_LADDER`` when spend or health call for it.
+
+    Never up, so the worst case is a cheaper, faster model.
+    """
+
+    def __init__(self, tracker: UsageTracker = usage_tracker, window_seconds: int = 300):
+        self.tracker = tracker
+        self.window_seconds = window_seconds
+        self._health: dict[str, ModelHealth] = {}
+
+    def health(self, model: str) -> ModelHealth:
+        if model not in self._health:
+            self._health[model] = ModelHealth(self.window_seconds)
+        return self._health[model]
+
+    def record_call(self, model: str, latency: float, ok: bool) -> None:
+        """Feed back the outcome of a model call."""
+        self.health(model).record(latency, ok)
+
+    def _latency_threshold(self, model: str) -> float | None:
+        if model == TIER_MODELS["complex"]:
+            return settings.router_opus_p95_seconds
+        if model == TIER_MODELS["moderate"]:
+            return settings.router_sonnet_p95_seconds
+        return None
+
+    def _unhealthy_reason(self, model: str) -> str | None:
+        health = self.health(model)
+        if health.samples < settings.router_min_samples:
+            return None
+        error_rate = health.error_rate()
+        if error_rate > settings.router_max_error_rate:
+            return f"{model} error rate {error_rate:.0%}"
+        threshold = self._latency_threshold(model)
+        p95 = health.p95()
+        if threshold is not None and p95 is not None and p95 > threshold:
+            return f"{model} p95 {p95:.1f}s > {threshold:.1f}s"
+        return None
+
+    def route(self, model: str, tier: str, score: int) -> RoutingDecision:
+        """Adjust the complexity-based model choice using live signals."""
+        decision = RoutingDecision(
+            model=model, requested_model=model, tier=tier, score=score
+        )
+
+        if settings.router_enabled:
+            # Budget: hard cap → cheapest; soft cap → borderline requests step down
+            budget = settings.ai_hourly_budget_usd
+            spend_ratio = self.tracker.spend() / budget if budget > 0 else 0.0
+            if spend_ratio >= 1.0 and decision.model != MODEL_LADDER[0]:
+                decision.model = MODEL_LADDER[0]
+                decision.reasons.append(f"hourly budget exhausted ({spend_ratio:.0%})")
+            elif spend_ratio >= settings.router_budget_soft_pct:
+                borderline = score <= TIER_MIN_SCORE.get(tier, 0) + BORDERLINE_MARGIN
+                cheaper = cheaper_model(decision.model)
+                if borderline and cheaper:
+                    decision.model = cheaper
+                    decision.reasons.append(
+                        f"near hourly budget ({spend_ratio:.0%}), borderline score {score}"
+                    )
+
+            # Live health: walk down while the current model is degraded
+            while (cheaper := cheaper_model(decision.model)) is not None:
+                reason = self._unhealthy_reason(decision.model)
+                if reason is None:
+                    break
+                decision.model = cheaper
+                decision.reasons.append(reason)
+
+        MODEL_ROUTING_DECISIONS_TOTAL.labels(
+            requested=decision.requested_model,
+            selected=decision.model,
+        ).inc()
+        logger.info(
+            "routing_decision",
+            tier=tier,
+            score=score,
+            requested_model=decision.requested_model,
+            model=decision.model,
+            downgraded=decision.downgraded,
+            reasons=decision.reasons,
+        )
+        return decision
+
+    def snapshot(self) -> dict:
+        """Per-model health for the ops dashboard."""
+        return {
+            model: {
+                "samples": health.samples,
+                "p95_seconds": health.p95(),
+                "error_rate": round(health.error_rate(), 3),
+            }
+            for model, health in self._health.items()
+        }
+
+
+# Singleton
+model_router = ModelRouter()
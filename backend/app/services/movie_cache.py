@@ -0,0 +1,203 @@
+"""Cached movie payloads served by the /movies routes.
+
+Entries hold the exact response bytes (plus a gzip variant under
+``<key>:gz``); the ops warmup writes them with the same builders.
+"""
+
+import asyncio
+import gzip
+from dataclasses import dataclass
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import NotFoundError
+from app.core.logging import get_logger
+from app.core.redis import ByteCache
+from app.core.responses import weak_etag
+from app.db.models import Movie
+from app.services.catalog import load_catalog_movies
+from app.services.tmdb_service import ENRICH_CONCURRENCY, tmdb_service
+
+logger = get_logger("movie_cache")
+
+TRENDING_CACHE_TTL = 3600
+MOVIE_CACHE_TTL = 86400
+GZIP_MIN_BYTES = 512
+
+
+def trending_key(time_window: str) -> str:
+    return f"trending:{time_window}"
+
+
+def movie_key(tmdb_id: int) -> str:
+    return f"movie:{tmdb_id}"
+
+
+def gzip_key(key: str) -> str:
+    return f"{key}:gz"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedBody:
+    body: bytes
+    gzip: bytes | None = None
+
+    @property
+    def etag(self) -> str:
+        return weak_etag(self.body)
+
+
+def encode_payload(payload: dict) -> CachedBody:
+    body = orjson.dumps(payload)
+    if len(body) < GZIP_MIN_BYTES:
+        return CachedBody(body)
+    return CachedBody(body, gzip.compress(body, compresslevel=9, mtime=0))
+
+
+async def load_body(movies: ByteCache, key: str, with_gzip: bool = False) -> CachedBody | None:
+    """The cached entry for ``key``, with its gzip variant if asked for."""
+    if not with_gzip:
+        [body] = await movies.get_many([key])
+        return CachedBody(body) if body is not None else None
+    body, compressed = await movies.get_many([key, gzip_key(key)])
+    return CachedBody(body, compressed or None) if body is not None else None
+
+
+async def store_body(movies: ByteCache, key: str, entry: CachedBody, ttl_seconds: int) -> None:
+    # The variant is always written so a stale one never outlives its body
+    await movies.set_many(
+        {key: entry.body, gzip_key(key): entry.gzip or b""}, ttl_seconds=ttl_seconds
+    )
+
+
+def trending_payload(trending: list[dict]) -> dict:
+    return {
+        "results": [
+            {
+                "tmdb_id": m["id"],
+                "title": m.get("title", ""),
+                "overview": m.get("overview", "")[:200],
+                "release_date": m.get("release_date"),
+                "vote_average": m.get("vote_average", 0),
+                "poster_path": m.get("poster_path"),
+                "backdrop_path": m.get("backdrop_path"),
+            }
+            for m in trending[:20]
+        ]
+    }
+
+
+def movie_details_payload(details: dict) -> dict:
+    credits = details.get("credits", {})
+    directors = [
+        c["name"] for c in credits.get("crew", []) if c.get("job") == "Director"
+    ]
+    cast = [
+        {"name": c["name"], "character": c.get("character", "")}
+        for c in credits.get("cast", [])[:10]
+    ]
+
+    return {
+        "tmdb_id": details["id"],
+        "title": details.get("title", ""),
+        "original_title": details.get("original_title"),
+        "overview": details.get("overview", ""),
+        "release_date": details.get("release_date"),
+        "runtime": details.get("runtime"),
+        "vote_average": details.get("vote_average", 0),
+        "vote_count": details.get("vote_count", 0),
+        "genres": [g["name"] for g in details.get("genres", [])],
+        "poster_path": details.get("poster_path"),
+        "backdrop_path": details.get("backdrop_path"),
+        "original_language": details.get("original_language"),
+        "directors": directors,
+        "cast": cast,
+    }
+
+
+def catalog_movie_payload(movie: Movie) -> dict:
+    """The details payload from a catalog row (TMDB unavailable)."""
+    return {
+        "tmdb_id": movie.tmdb_id,
+        "title": movie.title,
+        "original_title": movie.original_title,
+        "overview": movie.overview or "",
+        "release_date": movie.release_date,
+        "runtime": movie.runtime,
+        "vote_average": float(movie.vote_average or 0),
+        "vote_count": movie.vote_count or 0,
+        "genres": list(movie.genre_names or []),
+        "poster_path": movie.poster_path,
+        "backdrop_path": movie.backdrop_path,
+        "original_language": movie.original_language,
+        "directors": list(movie.director_names or []),
+        "cast": [{"name": name, "character": ""} for name in (movie.cast_names or [])[:10]],
+    }
+
+
+async def refresh_trending(movies: ByteCache, time_window: str = "week") -> CachedBody:
+    """Fetch trending from TMDB and cache the payload; returns the entry."""
+    trending = await tmdb_service.get_trending(time_window)
+    entry = encode_payload(trending_payload(trending))
+    await store_body(movies, trending_key(time_window), entry, TRENDING_CACHE_TTL)
+    return entry
+
+
+async def refresh_movie(movies: ByteCache, tmdb_id: int) -> CachedBody:
+    """Fetch one movie from TMDB and cache the payload; returns the entry."""
+    details = await tmdb_service.get_movie_details(tmdb_id)
+    entry = encode_payload(movie_details_payload(details))
+    await store_body(movies, movie_key(tmdb_id), entry, MOVIE_CACHE_TTL)
+    return entry
+
+
+async def load_movie_batch(
+    movies: ByteCache, tmdb_ids: list[int], db: AsyncSession | None = None
+) -> tuple[bytes, int]:
+    """``{"results": [...]}`` for ``tmdb_ids`` in order, and the error count.
+
+    Cached payloads come from one MGET; misses are fetched from TMDB with
+    bounded concurrency and cached. Ids TMDB can't serve right now fall back to
+    the catalog when a ``db`` session is given (uncached, as catalog rows
+    may be stale). Unresolved ids get ``{"tmdb_id": ..., "error": ...}``
+    with error ``not_found`` or ``unavailable``.
+    """
+    bodies = dict(zip(tmdb_ids, await movies.get_many([movie_key(i) for i in tmdb_ids])))
+    missing = [i for i, body in bodies.items() if body is None]
+    errors: dict[int, str] = {}
+
+    semaphore = asyncio.Semaphore(ENRICH_CONCURRENCY)
+
+    async def _refresh(tmdb_id: int) -> CachedBody:
+        async with semaphore:
+            return await refresh_movie(movies, tmdb_id)
+
+    results = await asyncio.gather(
+        *(_refresh(tmdb_id) for tmdb_id in missing), return_exceptions=True
+    )
+    unavailable = []
+    for tmdb_id, result in zip(missing, results):
+        if isinstance(result, CachedBody):
+            bodies[tmdb_id] = result.body
+        elif isinstance(result, NotFoundError):
+            errors[tmdb_id] = "not_found"
+        else:
+            logger.warning("movie_batch_fetch_failed", tmdb_id=tmdb_id, error=str(result))
+            unavailable.append(tmdb_id)
+
+    if unavailable and db is not None:
+        try:
+            for movie in await load_catalog_movies(db, unavailable):
+                bodies[movie.tmdb_id] = orjson.dumps(catalog_movie_payload(movie))
+        except Exception as e:
+            logger.warning("movie_batch_catalog_failed", error=str(e))
+    for tmdb_id in unavailable:
+        if bodies[tmdb_id] is None:
+            errors[tmdb_id] = "unavailable"
+
+    parts = [
+        bodies[tmdb_id] or orjson.dumps({"tmdb_id": tmdb_id, "error": errors[tmdb_id]})
+        for tmdb_id in tmdb_ids
+    ]
+    return b'{"results":[' + b",".join(parts) + b"]}", len(errors)
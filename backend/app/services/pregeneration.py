@@ -0,0 +1,290 @@
+"""Offline pre-generation of recommendations for popular patterns.
+
+Before peak hours, answers for the most requested pattern keys are
+generated through the Message Batches API and written to the
+``rec:pattern:*`` cache. ``LocalBatchBackend`` skips the model call.
+"""
+
+import asyncio
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from app.core.config import settings
+from app.core.exceptions import ExternalServiceError
+from app.core.logging import get_logger
+from app.core.redis import RedisCache, get_redis
+from app.schemas.recommendation import RecommendationRequest
+from app.services.ai_service import (
+    PATTERN_CACHE_TTL,
+    PATTERN_FREQ_KEY,
+    PATTERN_REQUESTS_KEY,
+    _build_candidate_prompt,
+    _candidate_filters,
+    _get_client,
+    _get_system_prompt_with_cache_control,
+    _load_response_json,
+    _parse_ai_response,
+    compute_complexity,
+)
+from app.services.tmdb_rate import background_tmdb_traffic
+from app.services.tmdb_service import MovieCandidate, tmdb_service
+from app.services.usage_tracker import TokenUsage, usage_tracker
+
+logger = get_logger("pregeneration")
+
+PREGEN_REPORT_KEY = "rec:pregen:report"
+MAX_TRACKED_PATTERNS = 5000
+SCORE_DECAY = 0.5
+# Cached entries younger than this are left alone
+REFRESH_AFTER_SECONDS = PATTERN_CACHE_TTL // 2
+FETCH_CONCURRENCY = 4
+BATCH_POLL_SECONDS = 30
+
+
+@dataclass
+class BatchJob:
+    custom_id: str  # batch-safe id: the digest part of the cache key
+    cache_key: str
+    model: str
+    tier: str
+    prompt: str
+    candidates: list[MovieCandidate] = field(repr=False)
+
+
+class BatchBackend(Protocol):
+    name: str
+
+    async def run(self, jobs: list[BatchJob]) -> dict[str, str]:
+        """Return response text per ``custom_id``; failed jobs are omitted."""
+        ...
+
+
+class AnthropicBatchBackend:
+    """Message Batches API: submit, poll until ended, collect results."""
+
+    name = "anthropic"
+
+    def __init__(self, poll_seconds: float = BATCH_POLL_SECONDS, timeout_seconds: float | None = None):
+        self.poll_seconds = poll_seconds
+        self.timeout_seconds = timeout_seconds or settings.pregen_batch_timeout_seconds
+
+    async def run(self, jobs: list[BatchJob]) -> dict[str, str]:
+        client = _get_client()
+        batch = await client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": job.custom_id,
+                    "params": {
+                        "model": job.model,
+                        "max_tokens": 1500,
+                        "system": _get_system_prompt_with_cache_control(),
+                        "messages": [{"role": "user", "content": job.prompt}],
+                    },
+                }
+                for job in jobs
+            ]
+        )
+        logger.info("pregen_batch_submitted", batch_id=batch.id, jobs=len(jobs))
+
+        deadline = time.monotonic() + self.timeout_seconds
+        while batch.processing_status != "ended":
+            if time.monotonic() >= deadline:
+                await client.messages.batches.cancel(batch.id)
+                raise ExternalServiceError("Anthropic", f"batch {batch.id} timed out")
+            await asyncio.sleep(self.poll_seconds)
+            batch = await client.messages.batches.retrieve(batch.id)
+
+        by_id = {job.custom_id: job for job in jobs}
+        texts: dict[str, str] = {}
+        async for entry in await client.messages.batches.results(batch.id):
+            job = by_id.get(entry.custom_id)
+            if job is None:
+                continue
+            if entry.result.type != "succeeded":
+                logger.warning(
+                    "pregen_batch_item_failed",
+                    cache_key=job.cache_key,
+                    result=entry.result.type,
+                )
+                continue
+            message = entry.result.message
+            usage_tracker.record(
+                job.model, job.tier, TokenUsage.from_response(message.usage), batch=True
+            )
+            texts[entry.custom_id] = message.content[0].text
+        return texts
+
+
+class LocalBatchBackend:
+    """Offline stand-in: answers with the top-rated candidates, no model call."""
+
+    name = "local"
+
+    async def run(self, jobs: list[BatchJob]) -> dict[str, str]:
+        texts = {}
+        for job in jobs:
+            ranked = sorted(job.candidates, key=lambda c: c.vote_average, reverse=True)
+            picks = [
+                {"tmdb_id": c.tmdb_id, "rationale": "Highly rated match", "match_score": 7}
+                for c in ranked[:6]
+            ]
+            texts[job.custom_id] = json.dumps(
+                {"best_pick": picks[0], "additional_picks": picks[1:]}
+            )
+        return texts
+
+
+def get_batch_backend() -> BatchBackend:
+    if settings.pregen_batch_backend == "local":
+        return LocalBatchBackend()
+    return AnthropicBatchBackend()
+
+
+async def _ttls(cache: RedisCache, keys: list[str]) -> dict[str, int]:
+    """Remaining TTL per key (negative when missing)."""
+    if not keys:
+        return {}
+    pipe = cache.client.pipeline()
+    for key in keys:
+        pipe.ttl(key)
+    return dict(zip(keys, await pipe.execute()))
+
+
+async def coverage_report(cache: RedisCache, top_n: int | None = None) -> dict:
+    """Share of recent request volume whose pattern is cached, and how fresh the top patterns are."""
+    top_n = top_n or settings.pregen_top_patterns
+    patterns = await cache.client.zrevrange(PATTERN_FREQ_KEY, 0, -1, withscores=True)
+    ttls = await _ttls(cache, [key for key, _ in patterns])
+
+    total = sum(score for _, score in patterns)
+    covered = sum(score for key, score in patterns if ttls[key] > 0)
+    top = patterns[:top_n]
+    ages = sorted(PATTERN_CACHE_TTL - ttls[key] for key, _ in top if ttls[key] > 0)
+    return {
+        "patterns_tracked": len(patterns),
+        "coverage_pct": round(covered / total * 100, 1) if total else 0.0,
+        "top_patterns_share_pct": (
+            round(sum(score for _, score in top) / total * 100, 1) if total else 0.0
+        ),
+        "freshness": {
+            "top_patterns_cached": len(ages),
+            "top_patterns": len(top),
+            "median_age_seconds": int(statistics.median(ages)) if ages else None,
+            "oldest_age_seconds": ages[-1] if ages else None,
+        },
+    }
+
+
+async def _prepare_job(cache_key: str, raw_request: str) -> BatchJob | None:
+    try:
+        request = RecommendationRequest.model_validate_json(raw_request)
+        candidates = await tmdb_service.fetch_candidates(
+            **_candidate_filters(request), max_candidates=30
+        )
+    except Exception as e:
+        logger.warning("pregen_prepare_failed", cache_key=cache_key, error=str(e))
+        return None
+    if not candidates:
+        return None
+    complexity = compute_complexity(request)
+    return BatchJob(
+        custom_id=cache_key.rsplit(":", 1)[-1],
+        cache_key=cache_key,
+        model=complexity.model,
+        tier=complexity.tier,
+        prompt=_build_candidate_prompt(candidates, request, tier=complexity.tier),
+        candidates=candidates,
+    )
+
+
+async def _decay_and_trim(cache: RedisCache) -> None:
+    client = cache.client
+    await client.zunionstore(PATTERN_FREQ_KEY, {PATTERN_FREQ_KEY: SCORE_DECAY})
+    dropped = await client.zrange(PATTERN_FREQ_KEY, 0, -(MAX_TRACKED_PATTERNS + 1))
+    if dropped:
+        await client.zrem(PATTERN_FREQ_KEY, *dropped)
+        await client.hdel(PATTERN_REQUESTS_KEY, *dropped)
+
+
+@background_tmdb_traffic
+async def pregenerate_popular_patterns(
+    cache: RedisCache,
+    backend: BatchBackend | None = None,
+    top_n: int | None = None,
+    decay: bool = True,
+) -> dict:
+    """Generate and cache answers for the most requested stale patterns.
+
+    ``decay=False`` leaves request scores untouched (ad-hoc runs such as
+    the ops warmup shouldn't age patterns out faster).
+    """
+    backend = backend or get_batch_backend()
+    top_n = top_n or settings.pregen_top_patterns
+    started = time.monotonic()
+
+    top = await cache.client.zrevrange(PATTERN_FREQ_KEY, 0, top_n - 1, withscores=True)
+    keys = [key for key, score in top if score >= settings.pregen_min_requests]
+    ttls = await _ttls(cache, keys)
+    stale = [key for key in keys if ttls[key] < PATTERN_CACHE_TTL - REFRESH_AFTER_SECONDS]
+
+    jobs: list[BatchJob] = []
+    if stale:
+        raw_requests = await cache.client.hmget(PATTERN_REQUESTS_KEY, stale)
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+        async def _bounded(key: str, raw: str | None) -> BatchJob | None:
+            if raw is None:
+                return None
+            async with semaphore:
+                return await _prepare_job(key, raw)
+
+        prepared = await asyncio.gather(
+            *(_bounded(key, raw) for key, raw in zip(stale, raw_requests))
+        )
+        jobs = [job for job in prepared if job is not None]
+
+    texts: dict[str, str] = {}
+    if jobs:
+        try:
+            texts = await backend.run(jobs)
+        except Exception as e:
+            logger.error("pregen_batch_failed", backend=backend.name, error=str(e))
+
+    generated = 0
+    for job in jobs:
+        text = texts.get(job.custom_id)
+        if text is None:
+            continue
+        if _load_response_json(text) is None:
+            # Don't cache the parser's rating-only fallback
+            logger.warning("pregen_unparseable_response", cache_key=job.cache_key)
+            continue
+        result = _parse_ai_response(text, job.candidates, session_id="", model_used=job.model)
+        data = result.model_dump()
+        data.pop("session_id", None)
+        await cache.set_json(job.cache_key, data, ttl_seconds=PATTERN_CACHE_TTL)
+        generated += 1
+
+    report = {
+        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "duration_seconds": round(time.monotonic() - started, 1),
+        "backend": backend.name,
+        "patterns_considered": len(keys),
+        "skipped_fresh": len(keys) - len(stale),
+        "generated": generated,
+        "failed": len(stale) - generated,
+        **await coverage_report(cache, top_n),
+    }
+    await cache.set_json(PREGEN_REPORT_KEY, report, ttl_seconds=7 * 86400)
+    if decay:
+        await _decay_and_trim(cache)
+    logger.info("pregen_complete", **report)
+    return report
+
+
+async def run_scheduled_pregeneration() -> dict:
+    """Scheduler entry point."""
+    return await pregenerate_popular_patterns(RedisCache(await get_redis()))
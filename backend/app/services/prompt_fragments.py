@@ -0,0 +1,93 @@
+"""Precomputed per-movie prompt fragments.
+
+Candidate prompt lines are built once per version of a movie's data (a
+catalog row's fingerprint, a TMDB details fetch) so prompt assembly only
+joins ready-made strings.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from app.services.tmdb_service import MovieCandidate
+
+# Bump when to_prompt_string / to_compact_row output changes
+FRAGMENT_VERSION = 1
+
+# Plot characters per candidate in the compact encoding; cheap tiers get
+# the shortest synopsis
+COMPACT_PLOT_CHARS: dict[str, int] = {
+    "simple": 80,
+    "moderate": 120,
+    "complex": 200,
+}
+
+
+def compact_variant(plot_chars: int) -> str:
+    return f"compact:{plot_chars}"
+
+
+def fingerprint(candidate: MovieCandidate) -> str:
+    """Hash of everything the fragments are built from."""
+    payload = json.dumps([FRAGMENT_VERSION, candidate.to_compact()], default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def build_fragments(candidate: MovieCandidate) -> dict[str, Any]:
+    fragments: dict[str, Any] = {"v": FRAGMENT_VERSION, "full": candidate.to_prompt_string()}
+    for plot_chars in sorted(set(COMPACT_PLOT_CHARS.values())):
+        fragments[compact_variant(plot_chars)] = candidate.to_compact_row(plot_chars)
+    return fragments
+
+
+class FragmentCache:
+    """Bounded LRU of fragments keyed by the version of the movie's data."""
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, dict[str, Any]] = OrderedDict()
+
+    def get_or_build(
+        self, candidate: MovieCandidate, key: Hashable | None = None
+    ) -> dict[str, Any]:
+        """Fragments for ``candidate``; ``key`` defaults to its fingerprint."""
+        key = key or fingerprint(candidate)
+        fragments = self._entries.get(key)
+        if fragments is not None:
+            self._entries.move_to_end(key)
+            return fragments
+        fragments = build_fragments(candidate)
+        self._entries[key] = fragments
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return fragments
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Singleton
+fragment_cache = FragmentCache()
+
+
+def candidate_fragment(candidate: MovieCandidate, variant: str) -> str:
+    """Prompt line for ``candidate`` in ``variant`` ("full" or "compact:<n>")."""
+    fragments = candidate.fragments
+    if not fragments or fragments.get("v") != FRAGMENT_VERSION:
+        # No versioned source (e.g. rebuilt from a session): build only the
+        # lines asked for, once per candidate
+        fragments = candidate.fragments = {"v": FRAGMENT_VERSION, "partial": True}
+    line = fragments.get(variant)
+    if line is None:
+        if variant == "full":
+            line = candidate.to_prompt_string()
+        else:
+            line = candidate.to_compact_row(int(variant.split(":", 1)[1]))
+        if fragments.get("partial"):
+            fragments[variant] = line
+    return line
@@ -8,6 +8,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.logging import get_logger
 from app.db.models import Movie
 from app.db.session import async_session_factory
+from app.services.prompt_fragments import build_fragments, fingerprint
+from app.services.tmdb_rate import background_tmdb_traffic
 from app.services.tmdb_service import MovieCandidate, tmdb_service
 
 logger = get_logger("sync")
@@ -31,6 +33,7 @@ def _candidate_to_dict(c: MovieCandidate) -> dict:
         "original_language": c.original_language,
         "director_names": c.director_names,
         "cast_names": c.cast_names,
+        "prompt_fingerprint": fingerprint(c),
         "last_synced_at": datetime.now(timezone.utc),
     }
 
@@ -44,13 +47,17 @@ async def _upsert_movie(session: AsyncSession, candidate: MovieCandidate) -> Non
     existing = result.scalar_one_or_none()
 
     if existing:
+        # Unchanged movie: keep the stored fragments as they are
+        if existing.prompt_fingerprint != movie_data["prompt_fingerprint"]:
+            movie_data["prompt_fragments"] = build_fragments(candidate)
         for key, value in movie_data.items():
             if key != "tmdb_id":
                 setattr(existing, key, value)
     else:
-        session.add(Movie(**movie_data))
+        session.add(Movie(**movie_data, prompt_fragments=build_fragments(candidate)))
 
 
+@background_tmdb_traffic
 async def sync_tmdb_catalog() -> dict:
     """Fetch trending + popular movies from TMDB and upsert into Movie table."""
     logger.info("sync_started")
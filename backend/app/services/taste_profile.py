@@ -37,6 +37,7 @@ class TasteProfile:
     top_actors: list[str] = field(default_factory=list)
     avg_rating: float | None = None
     total_interactions: int = 0
+    excluded_tmdb_ids: list[int] = field(default_factory=list)  # watched or dismissed
 
     def to_prompt_context(self) -> str:
         """Format as a concise string for injection into Claude prompts."""
@@ -86,6 +87,7 @@ class TasteProfile:
             "top_actors": self.top_actors,
             "avg_rating": round(self.avg_rating, 1) if self.avg_rating else None,
             "total_interactions": self.total_interactions,
+            "excluded_tmdb_ids": self.excluded_tmdb_ids,
         }
 
 
@@ -120,6 +122,7 @@ async def compute_taste_profile(
                 top_actors=cached["top_actors"],
                 avg_rating=cached["avg_rating"],
                 total_interactions=cached["total_interactions"],
+                excluded_tmdb_ids=cached.get("excluded_tmdb_ids", []),
             )
 
     # Fetch watch history with movie details
@@ -142,8 +145,13 @@ async def compute_taste_profile(
     director_counts: dict[str, int] = defaultdict(int)
     actor_counts: dict[str, int] = defaultdict(int)
     ratings: list[int] = []
+    excluded_ids: set[int] = set()
 
     for history, movie in rows:
+        # Already seen or explicitly dismissed — never worth recommending again
+        if history.status in ("watched", "dismissed"):
+            excluded_ids.add(history.tmdb_id)
+
         if movie is None or not movie.genre_names:
             continue
 
@@ -223,6 +231,7 @@ async def compute_taste_profile(
         top_actors=top_actors,
         avg_rating=avg_rating,
         total_interactions=len(rows),
+        excluded_tmdb_ids=sorted(excluded_ids),
     )
 
     # Cache the result
@@ -0,0 +1,220 @@
+"""Client-side rate budget for TMDB calls.
+
+A token bucket (per process, or shared in Redis) that every outbound TMDB
+request draws from; background traffic leaves a reserve for interactive
+callers, and a 429 pauses the bucket for the server's Retry-After.
+"""
+
+import asyncio
+import functools
+import time
+from collections.abc import Callable, Coroutine
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Any, ParamSpec, TypeVar
+
+from redis.commands.core import AsyncScript
+
+from app.core.config import settings
+from app.core.exceptions import ExternalServiceError
+from app.core.logging import get_logger
+from app.core.metrics import TMDB_RATE_WAIT, TMDB_THROTTLED_TOTAL
+from app.core.redis import get_redis
+
+logger = get_logger("tmdb_rate")
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class TrafficPriority(str, Enum):
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
+_priority: ContextVar[TrafficPriority] = ContextVar(
+    "tmdb_priority", default=TrafficPriority.INTERACTIVE
+)
+
+
+def current_priority() -> TrafficPriority:
+    return _priority.get()
+
+
+def background_tmdb_traffic(
+    fn: Callable[P, Coroutine[Any, Any, R]],
+) -> Callable[P, Coroutine[Any, Any, R]]:
+    """Run ``fn`` (and tasks it spawns) as background TMDB traffic."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        token = _priority.set(TrafficPriority.BACKGROUND)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            _priority.reset(token)
+
+    return wrapper
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """In-process token bucket with a pause for server-side throttling."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def try_take(self, reserve: float = 0.0) -> float:
+        """Take a token if more than ``reserve`` remain; else seconds to wait."""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens - reserve >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 + reserve - self._tokens) / self.rate
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        # Refill starts when the pause ends, not when it began
+        self._updated = self._paused_until
+
+
+# Same algorithm as TokenBucket on Redis time; returns milliseconds to wait
+# (0 = token taken)
+_TAKE_SCRIPT = """
+local paused = redis.call('PTTL', KEYS[2])
+if paused > 0 then return paused end
+local rate, capacity, reserve = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+local wait = 0
+if tokens - reserve >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 + reserve - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return wait
+"""
+
+# Empties the shared bucket and pauses it for ARGV[1] ms; like
+# TokenBucket.pause, refill starts when the pause ends
+_PAUSE_SCRIPT = """
+local pause_ms, rate, capacity = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+if redis.call('PTTL', KEYS[2]) < pause_ms then
+    redis.call('SET', KEYS[2], 1, 'PX', pause_ms)
+end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local resume = now + redis.call('PTTL', KEYS[2])
+redis.call('HSET', KEYS[1], 'tokens', 0, 'ts', resume)
+redis.call('PEXPIRE', KEYS[1], resume - now + math.ceil(capacity * 1000 / rate) + 1000)
+"""
+
+BUCKET_KEY = "tmdb:rate:bucket"
+PAUSE_KEY = "tmdb:rate:paused"
+
+
+class TMDBRateBudget:
+    """Token budget shared by all TMDB calls.
+
+    Background traffic (catalog sync, warmup, pre-generation) only takes a
+    token while ``background_reserve`` remain and waits as long as needed.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int | None = None,
+        background_reserve: int | None = None,
+        max_wait_seconds: float | None = None,
+        shared: bool | None = None,
+    ):
+        self.rate = rate or settings.tmdb_rate_per_second
+        self.burst = burst or settings.tmdb_rate_burst
+        self.background_reserve = (
+            background_reserve
+            if background_reserve is not None
+            else settings.tmdb_rate_background_reserve
+        )
+        self.max_wait_seconds = max_wait_seconds or settings.tmdb_rate_max_wait_seconds
+        self.shared = settings.tmdb_rate_shared if shared is None else shared
+        self._local = TokenBucket(self.rate, self.burst)
+        self._script: AsyncScript | None = None
+        self._pause_script: AsyncScript | None = None
+
+    async def _try_take(self, reserve: float) -> float:
+        if self.shared:
+            try:
+                if self._script is None:
+                    self._script = (await get_redis()).register_script(_TAKE_SCRIPT)
+                wait_ms = await self._script(
+                    keys=[BUCKET_KEY, PAUSE_KEY], args=[self.rate, self.burst, reserve]
+                )
+                return int(wait_ms) / 1000
+            except Exception as e:
+                logger.warning("tmdb_rate_shared_unavailable", error=str(e))
+        return self._local.try_take(reserve)
+
+    async def acquire(self) -> None:
+        """Wait for a token; interactive callers give up after ``max_wait_seconds``."""
+        priority = current_priority()
+        background = priority == TrafficPriority.BACKGROUND
+        reserve = self.background_reserve if background else 0
+        started = time.monotonic()
+        while True:
+            wait = await self._try_take(reserve)
+            if wait <= 0:
+                break
+            if not background and time.monotonic() + wait - started > self.max_wait_seconds:
+                TMDB_THROTTLED_TOTAL.labels(reason="budget_exhausted").inc()
+                raise ExternalServiceError("TMDB", "rate budget exhausted")
+            await asyncio.sleep(wait)
+        TMDB_RATE_WAIT.labels(priority=priority.value).observe(time.monotonic() - started)
+
+    async def pause(self, seconds: float) -> None:
+        """Stop all TMDB calls for ``seconds`` (the server's Retry-After)."""
+        TMDB_THROTTLED_TOTAL.labels(reason="retry_after").inc()
+        logger.warning("tmdb_rate_limited", retry_after=seconds)
+        self._local.pause(seconds)
+        if self.shared:
+            try:
+                if self._pause_script is None:
+                    self._pause_script = (await get_redis()).register_script(_PAUSE_SCRIPT)
+                await self._pause_script(
+                    keys=[BUCKET_KEY, PAUSE_KEY],
+                    args=[max(1, int(seconds * 1000)), self.rate, self.burst],
+                )
+            except Exception as e:
+                logger.warning("tmdb_rate_shared_unavailable", error=str(e))
+
+
+# Singleton
+tmdb_rate_budget = TMDBRateBudget()
@@ -1,12 +1,35 @@
-from dataclasses import dataclass
+import asyncio
+import importlib.util
+import json
+import sys
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, fields
 from typing import Any
+from urllib.parse import urlencode
 
 import httpx
 
+from app.core.circuit_breaker import CircuitState, tmdb_breaker
 from app.core.config import settings
-from app.core.exceptions import ExternalServiceError
+from app.core.exceptions import ExternalServiceError, NotFoundError
 from app.core.logging import get_logger
-from app.core.metrics import TMDB_REQUESTS_TOTAL
+from app.core.metrics import (
+    TMDB_CACHE_HITS,
+    TMDB_CACHE_MISSES,
+    TMDB_NEGATIVE_CACHE_TOTAL,
+    TMDB_POOL_IN_USE,
+    TMDB_POOL_UTILIZATION,
+    TMDB_POOL_WAIT,
+    TMDB_REQUESTS_TOTAL,
+    TMDB_RESPONSE_BYTES,
+    TMDB_REVALIDATIONS_TOTAL,
+)
+from app.core.redis import RedisCache, get_redis
+from app.core.timing import StageTimer
+from app.services.prompt_fragments import fragment_cache
+from app.services.tmdb_rate import parse_retry_after, tmdb_rate_budget
 
 logger = get_logger("tmdb")
 
@@ -21,6 +44,25 @@ GENRE_MAP = {
 
 GENRE_NAME_TO_ID = {v.lower(): k for k, v in GENRE_MAP.items()}
 
+# Three-letter genre codes for the compact prompt encoding
+GENRE_CODES = {
+    28: "ACT", 12: "ADV", 16: "ANI", 35: "COM",
+    80: "CRI", 99: "DOC", 18: "DRA", 10751: "FAM",
+    14: "FAN", 36: "HIS", 27: "HOR", 10402: "MUS",
+    9648: "MYS", 10749: "ROM", 878: "SCI",
+    10770: "TVM", 53: "THR", 10752: "WAR", 37: "WES",
+}
+
+# Column header for MovieCandidate.to_compact_row
+COMPACT_ROW_HEADER = "id|title|year|genres|rating|min|director|cast|plot"
+
+# Max concurrent detail lookups while enriching a candidate list
+ENRICH_CONCURRENCY = 10
+
+# Discover year ranges are widened to multiples of this many years so
+# similar queries share a cached page (then trimmed locally)
+DISCOVER_YEAR_BUCKET = 5
+
 # Map moods to TMDB genre boosts and sort strategies
 MOOD_TO_GENRES: dict[str, list[int]] = {
     "feel-good": [35, 10751, 16],        # Comedy, Family, Animation
@@ -53,8 +95,17 @@ MOOD_TO_SORT: dict[str, str] = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class MovieCandidate:
+    """One candidate movie, as fetched from TMDB or the local catalog.
+
+    Slotted, since thousands are built per minute. Builders from parsed
+    JSON or DB rows pass genre names and language codes through
+    ``intern_labels`` so candidates share the same few dozen strings.
+    Derived display values (year, image URLs) are computed on access
+    rather than stored.
+    """
+
     tmdb_id: int
     title: str
     overview: str
@@ -70,6 +121,67 @@ class MovieCandidate:
     original_language: str
     director_names: list[str]
     cast_names: list[str]
+    # Precomputed prompt lines (see prompt_fragments); not part of the data
+    fragments: dict[str, Any] | None = field(default=None, compare=False, repr=False)
+
+    @property
+    def year(self) -> str | None:
+        return self.release_date[:4] if self.release_date else None
+
+    @property
+    def poster_url(self) -> str | None:
+        if not self.poster_path:
+            return None
+        return f"{settings.tmdb_image_base_url}/w500{self.poster_path}"
+
+    @property
+    def backdrop_url(self) -> str | None:
+        if not self.backdrop_path:
+            return None
+        return f"{settings.tmdb_image_base_url}/w1280{self.backdrop_path}"
+
+    def to_compact(self) -> list:
+        """Positional form for session storage (see ``from_compact``).
+
+        Cast is trimmed to the five names prompts and summaries use.
+        """
+        values = [getattr(self, name) for name in _COMPACT_FIELDS]
+        values[_CAST_INDEX] = self.cast_names[:5]
+        return values
+
+    @classmethod
+    def from_compact(cls, data: list) -> "MovieCandidate | None":
+        """Rebuild from ``to_compact`` output; None if the layout changed."""
+        if len(data) != len(_COMPACT_FIELDS):
+            return None
+        candidate = cls(*data)
+        candidate.genres, candidate.original_language = intern_labels(
+            candidate.genres, candidate.original_language
+        )
+        return candidate
+
+    def to_compact_row(self, plot_chars: int = 120) -> str:
+        """Positional, pipe-separated row matching ``COMPACT_ROW_HEADER``.
+
+        Genres use ``GENRE_CODES``, cast is cut to three names and the plot
+        to ``plot_chars`` characters (0 drops it).
+        """
+        def _cell(value: str) -> str:
+            return value.replace("|", "/")
+
+        genres = " ".join(GENRE_CODES.get(g, str(g)) for g in self.genre_ids)
+        plot = self.overview[:plot_chars].rstrip() if plot_chars else ""
+        return "|".join((
+            str(self.tmdb_id),
+            _cell(self.title),
+            self.release_date[:4] if self.release_date else "",
+            genres,
+            f"{round(self.vote_average, 1):g}",
+            str(self.runtime or ""),
+            _cell(", ".join(self.director_names[:1])),
+            _cell(", ".join(self.cast_names[:3])),
+            _cell(plot),
+        ))
 
     def to_prompt_string(self) -> str:
         genres_str = ", ".join(self.genres)
@@ -86,34 +198,311 @@ class MovieCandidate:
         )
 
 
+def intern_labels(genres: list[str], language: str | None) -> tuple[list[str], str]:
+    """Interned genre names and language code (TMDB's null read as "en")."""
+    return [sys.intern(g) for g in genres], sys.intern(language or "en")
+
+
+# Field order of the compact session form
+_COMPACT_FIELDS = tuple(f.name for f in fields(MovieCandidate) if f.name != "fragments")
+_CAST_INDEX = _COMPACT_FIELDS.index("cast_names")
+
+
+def in_year_range(movie: dict, year_min: int | None, year_max: int | None) -> bool:
+    """Whether a TMDB list result's release year lies within the bounds."""
+    release_date = movie.get("release_date") or ""
+    if not release_date[:4].isdigit():
+        return False
+    year = int(release_date[:4])
+    return (year_min is None or year >= year_min) and (year_max is None or year <= year_max)
+
+
+# Top-billed cast kept from credits (prompts and the movie page use 10)
+DETAIL_CAST_LIMIT = 10
+
+_DETAIL_FIELDS = (
+    "id", "title", "original_title", "overview", "release_date", "runtime",
+    "vote_average", "vote_count", "popularity", "poster_path", "backdrop_path",
+    "original_language",
+)
+_LIST_RESULT_FIELDS = (
+    "id", "title", "overview", "release_date", "genre_ids", "vote_average",
+    "vote_count", "popularity", "poster_path", "backdrop_path", "original_language",
+)
+
+
+def slim_movie_details(details: dict) -> dict:
+    """Project a details+credits+keywords response onto the fields we use.
+
+    Keeps TMDB's shape so consumers don't care whether a body was slimmed;
+    full credits run to hundreds of cast and crew entries, of which only
+    the directors and top-billed cast are read.
+    """
+    credits = details.get("credits") or {}
+    slim = {f: details[f] for f in _DETAIL_FIELDS if f in details}
+    slim["genres"] = [{"id": g["id"], "name": g["name"]} for g in details.get("genres") or []]
+    slim["credits"] = {
+        "cast": [
+            {"name": c["name"], "character": c.get("character", "")}
+            for c in (credits.get("cast") or [])[:DETAIL_CAST_LIMIT]
+        ],
+        "crew": [
+            {"name": c["name"], "job": "Director"}
+            for c in credits.get("crew") or []
+            if c.get("job") == "Director"
+        ],
+    }
+    slim["keywords"] = {
+        "keywords": [
+            {"name": k["name"]} for k in (details.get("keywords") or {}).get("keywords") or []
+        ]
+    }
+    return slim
+
+
+def slim_list_page(page: dict) -> dict:
+    """Project a discover/list page onto the result fields we use."""
+    return {
+        "results": [
+            {f: movie[f] for f in _LIST_RESULT_FIELDS if f in movie}
+            for movie in page.get("results") or []
+        ]
+    }
+
+
+def _response_cache_key(endpoint: str, params: dict | None) -> str:
+    query = urlencode(sorted((params or {}).items()))
+    return f"tmdb:{endpoint}?{query}" if query else f"tmdb:{endpoint}"
+
+
+def _negative_cache_key(key: str) -> str:
+    return f"{key}:neg"
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _slimmed(response: httpx.Response, slim: Callable[[dict], dict] | None) -> dict:
+    body = response.json()
+    if slim is None:
+        return body
+    kind = slim.__name__.removeprefix("slim_")
+    body = slim(body)
+    TMDB_RESPONSE_BYTES.labels(kind=kind, form="raw").inc(len(response.content))
+    TMDB_RESPONSE_BYTES.labels(kind=kind, form="slim").inc(len(json.dumps(body)))
+    return body
+
+
 class TMDBService:
     def __init__(self):
         self.base_url = settings.tmdb_base_url
         self.api_key = settings.tmdb_api_key
         self._client: httpx.AsyncClient | None = None
+        self._cache: RedisCache | None = None
+        # Mirrors the pool limit so waits and utilization are observable;
+        # httpx doesn't expose its pool state
+        self._max_connections = settings.tmdb_max_connections
+        self._slots = asyncio.Semaphore(self._max_connections)
+        self._in_use = 0
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
+            http2 = settings.tmdb_http2 and _http2_available()
+            if settings.tmdb_http2 and not http2:
+                logger.warning("tmdb_http2_unavailable", reason="h2 package not installed")
             self._client = httpx.AsyncClient(
                 base_url=self.base_url,
                 params={"api_key": self.api_key},
-                timeout=10.0,
+                http2=http2,
+                timeout=httpx.Timeout(
+                    settings.tmdb_read_timeout_seconds,
+                    connect=settings.tmdb_connect_timeout_seconds,
+                    pool=settings.tmdb_pool_timeout_seconds,
+                ),
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=settings.tmdb_max_keepalive_connections,
+                    keepalive_expiry=settings.tmdb_keepalive_expiry_seconds,
+                ),
             )
         return self._client
 
+    @asynccontextmanager
+    async def _connection_slot(self, endpoint: str) -> AsyncIterator[None]:
+        """Hold one of ``tmdb_max_connections`` request slots.
+
+        A request that can't get a slot within the pool timeout fails
+        without touching the breaker — local saturation isn't TMDB failing.
+        """
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), settings.tmdb_pool_timeout_seconds)
+        except TimeoutError:
+            TMDB_POOL_WAIT.observe(time.perf_counter() - started)
+            TMDB_REQUESTS_TOTAL.labels(endpoint=endpoint, status="pool_timeout").inc()
+            logger.warning("tmdb_pool_exhausted", endpoint=endpoint, in_use=self._in_use)
+            raise ExternalServiceError("TMDB", "connection pool exhausted")
+        TMDB_POOL_WAIT.observe(time.perf_counter() - started)
+        self._set_in_use(self._in_use + 1)
+        try:
+            yield
+        finally:
+            self._set_in_use(self._in_use - 1)
+            self._slots.release()
+
+    def _set_in_use(self, in_use: int) -> None:
+        self._in_use = in_use
+        TMDB_POOL_IN_USE.set(in_use)
+        TMDB_POOL_UTILIZATION.set(in_use / self._max_connections)
+
     async def close(self) -> None:
         if self._client and not self._client.is_closed:
             await self._client.aclose()
 
-    async def _get(self, endpoint: str, params: dict | None = None, retries: int = 2) -> dict:
+    async def _get_cache(self) -> RedisCache:
+        if self._cache is None:
+            self._cache = RedisCache(await get_redis())
+        return self._cache
+
+    async def _get(
+        self,
+        endpoint: str,
+        params: dict | None = None,
+        retries: int = 2,
+        cache_ttl: int | None = None,
+        slim: Callable[[dict], dict] | None = None,
+    ) -> dict:
+        """GET a TMDB endpoint and return its JSON body."""
+        body, _ = await self._get_versioned(endpoint, params, retries, cache_ttl, slim)
+        return body
+
+    async def _get_versioned(
+        self,
+        endpoint: str,
+        params: dict | None = None,
+        retries: int = 2,
+        cache_ttl: int | None = None,
+        slim: Callable[[dict], dict] | None = None,
+    ) -> tuple[dict, float | None]:
+        """GET a TMDB endpoint; return its JSON body and when it was fetched.
+
+        With ``cache_ttl`` the body is cached in Redis together with its
+        ETag/Last-Modified validators. Within ``cache_ttl`` the cached body
+        is served as is; after that it is revalidated with a conditional
+        request, and a 304 renews it without re-downloading the payload.
+
+        404s, and URLs that keep failing with an upstream error, are
+        negative-cached for a short while and fail fast without a request.
+
+        ``slim`` projects the body onto the fields we use before it is
+        cached or returned; the bytes it saves are counted per ``kind``.
+
+        The fetch time identifies the cached body, so data derived from it
+        can be reused until it changes; it is None for uncached requests.
+        """
+        if cache_ttl is None:
+            response = await self._request(endpoint, params, retries)
+            return _slimmed(response, slim), None
+
+        cache = await self._get_cache()
+        key = _response_cache_key(endpoint, params)
+        failure, entry = await cache.get_many_json([_negative_cache_key(key), key])
+        if entry and "error" in entry:
+            # Written before markers had their own key
+            failure, entry = entry, None
+        if failure:
+            TMDB_NEGATIVE_CACHE_TOTAL.labels(event="hit", reason=failure["error"]).inc()
+            if failure["error"] == "not_found":
+                raise NotFoundError("TMDB resource", endpoint)
+            raise ExternalServiceError("TMDB", f"{endpoint} keeps failing upstream (cached)")
+        if entry and time.time() - entry["fetched_at"] < cache_ttl:
+            TMDB_CACHE_HITS.inc()
+            return entry["body"], entry["fetched_at"]
+
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = await self._request(endpoint, params, retries, headers or None)
+        except NotFoundError:
+            await self._remember_failure(cache, key, "not_found", settings.tmdb_not_found_cache_seconds)
+            raise
+        except ExternalServiceError as e:
+            # Only failures TMDB answered for this URL say something about it;
+            # connection errors, throttling and an open breaker don't
+            if e.upstream_status is not None and e.upstream_status != 429:
+                failures = await cache.increment(
+                    f"{key}:failures", ttl_seconds=settings.tmdb_failure_cache_seconds
+                )
+                if failures >= settings.tmdb_failure_threshold:
+                    await self._remember_failure(
+                        cache, key, "failing", settings.tmdb_failure_cache_seconds
+                    )
+            raise
+        if response.status_code == 304 and entry:
+            TMDB_REVALIDATIONS_TOTAL.labels(result="not_modified").inc()
+            if slim:
+                # Bodies cached before slimming existed shrink on renewal
+                entry["body"] = slim(entry["body"])
+            entry["fetched_at"] = time.time()
+            await cache.set_json(key, entry, ttl_seconds=settings.tmdb_cache_retain_seconds)
+            return entry["body"], entry["fetched_at"]
+
+        if headers:
+            TMDB_REVALIDATIONS_TOTAL.labels(result="modified").inc()
+        else:
+            TMDB_CACHE_MISSES.inc()
+        body = _slimmed(response, slim)
+        entry = {
+            "body": body,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "fetched_at": time.time(),
+        }
+        await cache.set_json(key, entry, ttl_seconds=settings.tmdb_cache_retain_seconds)
+        return body, entry["fetched_at"]
+
+    async def _remember_failure(
+        self, cache: RedisCache, key: str, reason: str, ttl_seconds: int
+    ) -> None:
+        """Negative-cache ``key`` so callers stop paying full retries for it.
+
+        The marker has its own key: a cached body and its validators outlive
+        it, so the next fetch can still be a conditional one.
+        """
+        TMDB_NEGATIVE_CACHE_TOTAL.labels(event="stored", reason=reason).inc()
+        logger.info("tmdb_negative_cached", key=key, reason=reason, ttl_seconds=ttl_seconds)
+        await cache.set_json(_negative_cache_key(key), {"error": reason}, ttl_seconds=ttl_seconds)
+
+    async def _request(
+        self,
+        endpoint: str,
+        params: dict | None = None,
+        retries: int = 2,
+        headers: dict | None = None,
+    ) -> httpx.Response:
+        """Send the request with retries; returns a 2xx or 304 response."""
+        # Fail fast while TMDB is known to be down instead of waiting out timeouts
+        tmdb_breaker.check()
         client = await self._get_client()
         last_error: Exception | None = None
         for attempt in range(retries + 1):
+            await tmdb_rate_budget.acquire()
             try:
-                response = await client.get(endpoint, params=params or {})
+                async with self._connection_slot(endpoint):
+                    response = await client.get(endpoint, params=params or {}, headers=headers)
+                if response.status_code == 304:
+                    TMDB_REQUESTS_TOTAL.labels(endpoint=endpoint, status="not_modified").inc()
+                    tmdb_breaker.record_success()
+                    return response
                 response.raise_for_status()
                 TMDB_REQUESTS_TOTAL.labels(endpoint=endpoint, status="success").inc()
-                return response.json()
+                tmdb_breaker.record_success()
+                return response
             except httpx.HTTPStatusError as e:
                 TMDB_REQUESTS_TOTAL.labels(endpoint=endpoint, status=str(e.response.status_code)).inc()
                 logger.error(
@@ -122,9 +511,28 @@ class TMDBService:
                     status=e.response.status_code,
                     attempt=attempt + 1,
                 )
-                # Don't retry client errors (4xx)
+                if e.response.status_code == 429:
+                    # TMDB is healthy, we're just too fast: pause the shared
+                    # budget for as long as asked and try again
+                    tmdb_breaker.record_success()
+                    retry_after = parse_retry_after(e.response.headers.get("retry-after"))
+                    retry_after = 1.0 if retry_after is None else retry_after
+                    await tmdb_rate_budget.pause(retry_after)
+                    if attempt == retries or retry_after > settings.tmdb_max_retry_after_seconds:
+                        raise ExternalServiceError("TMDB", "rate limited")
+                    last_error = e
+                    continue
+                # Don't retry client errors (4xx) — TMDB itself is healthy
                 if e.response.status_code < 500:
-                    raise ExternalServiceError("TMDB", f"HTTP {e.response.status_code}")
+                    tmdb_breaker.record_success()
+                    if e.response.status_code == 404:
+                        raise NotFoundError("TMDB resource", endpoint)
+                    raise ExternalServiceError(
+                        "TMDB",
+                        f"HTTP {e.response.status_code}",
+                        upstream_status=e.response.status_code,
+                    )
+                tmdb_breaker.record_failure()
                 last_error = e
             except httpx.RequestError as e:
                 TMDB_REQUESTS_TOTAL.labels(endpoint=endpoint, status="connection_error").inc()
@@ -134,14 +542,26 @@ class TMDBService:
                     error=str(e),
                     attempt=attempt + 1,
                 )
+                tmdb_breaker.record_failure()
                 last_error = e
 
+            if tmdb_breaker.state != CircuitState.CLOSED:
+                # This failure tripped (or re-tripped) the breaker; stop retrying
+                break
+
             # Brief back-off before retry
             if attempt < retries:
-                import asyncio
                 await asyncio.sleep(0.5 * (attempt + 1))
 
-        raise ExternalServiceError("TMDB", f"Failed after {retries + 1} attempts: {last_error}")
+        raise ExternalServiceError(
+            "TMDB",
+            f"Failed after {attempt + 1} attempts: {last_error}",
+            upstream_status=(
+                last_error.response.status_code
+                if isinstance(last_error, httpx.HTTPStatusError)
+                else None
+            ),
+        )
 
     def _resolve_genre_ids(self, genre_names: list[str]) -> list[int]:
         ids = []
@@ -161,23 +581,37 @@ class TMDBService:
         sort_by: str = "vote_average.desc",
         page: int = 1,
     ) -> list[dict]:
+        """One discover page, cached on its canonical query.
+
+        Genre lists are de-duplicated and sorted, and the year range is
+        widened to ``DISCOVER_YEAR_BUCKET`` boundaries so near-identical
+        queries share a cached page. Results may therefore fall outside
+        ``year_min``/``year_max``; callers filter with ``in_year_range``.
+        """
         params: dict[str, Any] = {
             "sort_by": sort_by,
-            "vote_average.gte": str(vote_average_min),
+            "vote_average.gte": f"{vote_average_min:g}",
             "vote_count.gte": "50",
             "page": str(page),
             "include_adult": "false",
         }
         if genre_ids:
-            params["with_genres"] = ",".join(str(g) for g in genre_ids)
+            params["with_genres"] = ",".join(str(g) for g in sorted(set(genre_ids)))
         if exclude_genre_ids:
-            params["without_genres"] = ",".join(str(g) for g in exclude_genre_ids)
+            params["without_genres"] = ",".join(str(g) for g in sorted(set(exclude_genre_ids)))
         if year_min:
-            params["primary_release_date.gte"] = f"{year_min}-01-01"
+            bucket_start = year_min - year_min % DISCOVER_YEAR_BUCKET
+            params["primary_release_date.gte"] = f"{bucket_start}-01-01"
         if year_max:
-            params["primary_release_date.lte"] = f"{year_max}-12-31"
-
-        data = await self._get("/discover/movie", params)
+            bucket_end = year_max - year_max % DISCOVER_YEAR_BUCKET + DISCOVER_YEAR_BUCKET - 1
+            params["primary_release_date.lte"] = f"{bucket_end}-12-31"
+
+        data = await self._get(
+            "/discover/movie",
+            params,
+            cache_ttl=settings.tmdb_discover_cache_seconds,
+            slim=slim_list_page,
+        )
         return data.get("results", [])
 
     async def search_movies(self, query: str, page: int = 1) -> list[dict]:
@@ -185,32 +619,44 @@ class TMDBService:
         return data.get("results", [])
 
     async def get_trending(self, time_window: str = "week") -> list[dict]:
-        data = await self._get(f"/trending/movie/{time_window}")
+        data = await self._get(f"/trending/movie/{time_window}", slim=slim_list_page)
         return data.get("results", [])
 
     async def get_movie_details(self, tmdb_id: int) -> dict:
-        return await self._get(
-            f"/movie/{tmdb_id}",
-            {"append_to_response": "credits,keywords"},
-        )
+        details, _ = await self._get_movie_details_versioned(tmdb_id)
+        return details
+
+    async def _get_movie_details_versioned(self, tmdb_id: int) -> tuple[dict, float | None]:
+        try:
+            return await self._get_versioned(
+                f"/movie/{tmdb_id}",
+                {"append_to_response": "credits,keywords"},
+                cache_ttl=settings.tmdb_details_cache_seconds,
+                slim=slim_movie_details,
+            )
+        except NotFoundError:
+            raise NotFoundError("Movie", str(tmdb_id)) from None
 
     async def get_movie_credits(self, tmdb_id: int) -> dict:
         return await self._get(f"/movie/{tmdb_id}/credits")
 
     async def enrich_movie(self, basic_movie: dict) -> MovieCandidate:
         tmdb_id = basic_movie["id"]
-        details = await self.get_movie_details(tmdb_id)
+        details, fetched_at = await self._get_movie_details_versioned(tmdb_id)
 
         genre_ids = [g["id"] for g in details.get("genres", [])]
-        genre_names = [g["name"] for g in details.get("genres", [])]
+        genre_names, language = intern_labels(
+            [g["name"] for g in details.get("genres", [])],
+            details.get("original_language"),
+        )
 
         credits = details.get("credits", {})
         directors = [
             c["name"] for c in credits.get("crew", []) if c.get("job") == "Director"
         ]
-        cast = [c["name"] for c in credits.get("cast", [])[:10]]
+        cast = [c["name"] for c in credits.get("cast", [])[:DETAIL_CAST_LIMIT]]
 
-        return MovieCandidate(
+        candidate = MovieCandidate(
             tmdb_id=tmdb_id,
             title=details.get("title", ""),
             overview=details.get("overview", ""),
@@ -223,10 +669,14 @@ class TMDBService:
             runtime=details.get("runtime"),
             poster_path=details.get("poster_path"),
             backdrop_path=details.get("backdrop_path"),
-            original_language=details.get("original_language", "en"),
+            original_language=language,
             director_names=directors,
             cast_names=cast,
         )
+        if fetched_at is not None:
+            # Built from this exact details body before: reuse its prompt lines
+            candidate.fragments = fragment_cache.get_or_build(candidate, (tmdb_id, fetched_at))
+        return candidate
 
     async def fetch_candidates(
         self,
@@ -236,7 +686,16 @@ class TMDBService:
         year_max: int | None = None,
         mood: list[str] | None = None,
         max_candidates: int = 40,
+        timer: StageTimer | None = None,
     ) -> list[MovieCandidate]:
+        """Discover, merge and enrich candidate movies.
+
+        The primary discover, mood discover and trending lookups are
+        independent and run concurrently; enrichment of the merged list
+        then runs with bounded concurrency. When a ``timer`` is given the
+        two phases are recorded as ``tmdb_discover`` and ``enrichment``.
+        """
+        timer = timer or StageTimer()
         genre_ids = self._resolve_genre_ids(genre_names) if genre_names else None
         exclude_ids = self._resolve_genre_ids(exclude_genre_names) if exclude_genre_names else None
 
@@ -249,23 +708,14 @@ class TMDBService:
                 mood_genre_ids.update(MOOD_TO_GENRES.get(key, []))
                 sort_by = MOOD_TO_SORT.get(key, sort_by)
 
-        # Primary discover: user genre preferences
-        discover_results = await self.discover_movies(
-            genre_ids=genre_ids,
-            exclude_genre_ids=exclude_ids,
-            year_min=year_min,
-            year_max=year_max,
-            sort_by=sort_by,
-        )
-
-        # Secondary discover: mood-based genres (different pool)
-        mood_results: list[dict] = []
-        if mood_genre_ids:
+        async def _mood_discover() -> list[dict]:
+            if not mood_genre_ids:
+                return []
             # Combine mood genres with user genres for a mood-flavored query
             combined_genres = list(mood_genre_ids)
             if genre_ids:
                 combined_genres = list(set(combined_genres) | set(genre_ids))
-            mood_results = await self.discover_movies(
+            return await self.discover_movies(
                 genre_ids=combined_genres,
                 exclude_genre_ids=exclude_ids,
                 year_min=year_min,
@@ -274,8 +724,27 @@ class TMDBService:
                 page=2,  # Different page for variety
             )
 
-        # Also fetch trending for freshness
-        trending_results = await self.get_trending()
+        with timer.stage("tmdb_discover"):
+            # Primary discover (user genre preferences), secondary mood-based
+            # discover (different pool) and trending for freshness
+            discover_results, mood_results, trending_results = await asyncio.gather(
+                self.discover_movies(
+                    genre_ids=genre_ids,
+                    exclude_genre_ids=exclude_ids,
+                    year_min=year_min,
+                    year_max=year_max,
+                    sort_by=sort_by,
+                ),
+                _mood_discover(),
+                self.get_trending(),
+            )
+
+        # Discover pages cover whole year buckets; trim to the exact range
+        if year_min or year_max:
+            discover_results, mood_results = (
+                [m for m in results if in_year_range(m, year_min, year_max)]
+                for results in (discover_results, mood_results)
+            )
 
         # Merge and deduplicate — mood results first for priority
         seen_ids: set[int] = set()
@@ -305,14 +774,8 @@ class TMDBService:
         merged = merged[:max_candidates]
 
         # Enrich top candidates with full details
-        candidates = []
-        for movie in merged[:max_candidates]:
-            try:
-                candidate = await self.enrich_movie(movie)
-                candidates.append(candidate)
-            except Exception:
-                logger.warning("enrich_failed", tmdb_id=movie.get("id"))
-                continue
+        with timer.stage("enrichment"):
+            candidates = await self.enrich_many(merged)
 
         logger.info(
             "candidates_fetched",
@@ -322,6 +785,21 @@ class TMDBService:
         )
         return candidates
 
+    async def enrich_many(self, movies: list[dict]) -> list[MovieCandidate]:
+        """Enrich movies concurrently, preserving order and skipping failures."""
+        semaphore = asyncio.Semaphore(ENRICH_CONCURRENCY)
+
+        async def _enrich(movie: dict) -> MovieCandidate | None:
+            async with semaphore:
+                try:
+                    return await self.enrich_movie(movie)
+                except Exception:
+                    logger.warning("enrich_failed", tmdb_id=movie.get("id"))
+                    return None
+
+        results = await asyncio.gather(*(_enrich(m) for m in movies))
+        return [c for c in results if c is not None]
+
 
 # Singleton
 tmdb_service = TMDBService()
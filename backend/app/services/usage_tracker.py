@@ -0,0 +1,145 @@
+"""Claude token usage and cost accounting.
+
+Every model call is recorded here: token counts and an estimated USD cost
+are exported as Prometheus counters labelled by model and complexity tier,
+and kept in a rolling in-process window so ``/ops/stats`` can show what
+recent routing decisions actually cost against the hourly budget.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import CLAUDE_COST_USD_TOTAL, CLAUDE_TOKENS_TOTAL
+
+# USD per million tokens: (input, output)
+MODEL_PRICING: dict[str, tuple[float, float]] = {
+    "claude-haiku-4-5-20250514": (1.0, 5.0),
+    "claude-sonnet-4-5-20250929": (3.0, 15.0),
+    "claude-opus-4-6": (5.0, 25.0),
+}
+DEFAULT_PRICING = MODEL_PRICING["claude-sonnet-4-5-20250929"]
+
+# Prompt caching: writes cost more than base input, reads far less
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+# Message Batches API calls are billed at half price
+BATCH_MULTIPLIER = 0.5
+
+
+@dataclass
+class TokenUsage:
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_tokens: int = 0
+    cache_read_tokens: int = 0
+
+    @classmethod
+    def from_response(cls, usage: Any) -> "TokenUsage":
+        """Build from an Anthropic ``response.usage`` object."""
+        return cls(
+            input_tokens=getattr(usage, "input_tokens", 0) or 0,
+            output_tokens=getattr(usage, "output_tokens", 0) or 0,
+            cache_creation_tokens=getattr(usage, "cache_creation_input_tokens", 0) or 0,
+            cache_read_tokens=getattr(usage, "cache_read_input_tokens", 0) or 0,
+        )
+
+    @property
+    def total(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    @property
+    def cache_read_ratio(self) -> float:
+        """Share of prompt tokens served from the provider prompt cache."""
+        prompt = self.input_tokens + self.cache_creation_tokens + self.cache_read_tokens
+        return self.cache_read_tokens / prompt if prompt else 0.0
+
+
+def estimate_cost(model: str, usage: TokenUsage, batch: bool = False) -> float:
+    """Estimated USD cost of a single call."""
+    input_price, output_price = MODEL_PRICING.get(model, DEFAULT_PRICING)
+    cost = (
+        usage.input_tokens * input_price
+        + usage.cache_creation_tokens * input_price * CACHE_WRITE_MULTIPLIER
+        + usage.cache_read_tokens * input_price * CACHE_READ_MULTIPLIER
+        + usage.output_tokens * output_price
+    ) / 1_000_000
+    return cost * BATCH_MULTIPLIER if batch else cost
+
+
+class UsageTracker:
+    """Rolling window of model spend for budget views.
+
+    State is per process — Prometheus counters are the source of truth
+    across replicas; this window only answers "how close are we to the
+    hourly cap right now" cheaply.
+    """
+
+    def __init__(self, window_seconds: int = 3600):
+        self.window_seconds = window_seconds
+        # (timestamp, model, tier, cost_usd, total_tokens)
+        self._events: deque[tuple[float, str, str, float, int]] = deque()
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._events and self._events[0][0] < cutoff:
+            self._events.popleft()
+
+    def record(self, model: str, tier: str, usage: TokenUsage, batch: bool = False) -> float:
+        """Export token/cost counters and add the call to the window."""
+        for kind, count in (
+            ("input", usage.input_tokens),
+            ("output", usage.output_tokens),
+            ("cache_creation", usage.cache_creation_tokens),
+            ("cache_read", usage.cache_read_tokens),
+        ):
+            if count:
+                CLAUDE_TOKENS_TOTAL.labels(model=model, tier=tier, kind=kind).inc(count)
+
+        cost = estimate_cost(model, usage, batch)
+        CLAUDE_COST_USD_TOTAL.labels(model=model, tier=tier).inc(cost)
+
+        now = time.monotonic()
+        self._events.append((now, model, tier, cost, usage.total))
+        self._prune(now)
+        return cost
+
+    def spend(self) -> float:
+        """USD spent within the rolling window."""
+        self._prune(time.monotonic())
+        return sum(e[3] for e in self._events)
+
+    def snapshot(self) -> dict:
+        """Budget view for the ops dashboard."""
+        self._prune(time.monotonic())
+        by_model: dict[str, dict[str, float]] = {}
+        by_tier: dict[str, dict[str, float]] = {}
+        for _, model, tier, cost, tokens in self._events:
+            for bucket, key in ((by_model, model), (by_tier, tier)):
+                entry = bucket.setdefault(key, {"calls": 0, "tokens": 0, "cost_usd": 0.0})
+                entry["calls"] += 1
+                entry["tokens"] += tokens
+                entry["cost_usd"] += cost
+
+        for bucket in (by_model, by_tier):
+            for entry in bucket.values():
+                entry["cost_usd"] = round(entry["cost_usd"], 4)
+
+        spend = sum(e[3] for e in self._events)
+        budget = settings.ai_hourly_budget_usd
+        return {
+            "window_seconds": self.window_seconds,
+            "calls": len(self._events),
+            "spend_usd": round(spend, 4),
+            "budget_usd": budget,
+            "budget_used_pct": round(spend / budget * 100, 1) if budget else None,
+            "by_model": by_model,
+            "by_tier": by_tier,
+        }
+
+
+# Singleton
+usage_tracker = UsageTracker()
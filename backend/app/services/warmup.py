@@ -0,0 +1,203 @@
+"""Cache warmup after deploys.
+
+Started in the background by ``POST /ops/warmup`` and polled via
+``GET /ops/warmup``: trending, per-genre discover, movie details, then
+pattern-cache entries for the most requested patterns.
+"""
+
+import asyncio
+import functools
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import orjson
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.redis import ByteCache, RedisCache, get_binary_redis
+from app.services.movie_cache import movie_key, refresh_movie, refresh_trending
+from app.services.pregeneration import pregenerate_popular_patterns
+from app.services.tmdb_rate import background_tmdb_traffic
+from app.services.tmdb_service import GENRE_MAP, tmdb_service
+
+logger = get_logger("warmup")
+
+# Last run's progress, shared so any worker can answer the status poll
+WARMUP_STATUS_KEY = "ops:warmup:status"
+STATUS_TTL = 86400
+TRENDING_WINDOWS = ("week", "day")
+MAX_ERRORS = 20
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+class RequestPacer:
+    """Spaces call starts at least ``1 / rate`` seconds apart."""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_at > now:
+                await asyncio.sleep(self._next_at - now)
+                now = self._next_at
+            self._next_at = now + self.interval
+
+
+@dataclass
+class StageProgress:
+    total: int = 0
+    done: int = 0
+    failed: int = 0
+    skipped: int = 0  # already cached / still fresh
+
+
+@dataclass
+class WarmupRun:
+    started_at: str = field(default_factory=_now)
+    state: str = "running"  # running | complete | partial | failed
+    stage: str | None = None
+    stages: dict[str, StageProgress] = field(default_factory=dict)
+    errors: list[str] = field(default_factory=list)
+    errors_total: int = 0
+    finished_at: str | None = None
+    duration_seconds: float | None = None
+
+    def begin(self, stage: str, total: int = 0) -> StageProgress:
+        self.stage = stage
+        self.stages[stage] = StageProgress(total=total)
+        return self.stages[stage]
+
+    def error(self, message: str) -> None:
+        self.errors_total += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(message)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+async def _uncached(cache: RedisCache, tmdb_ids: list[int]) -> list[int]:
+    if not tmdb_ids:
+        return []
+    pipe = cache.client.pipeline()
+    for tmdb_id in tmdb_ids:
+        pipe.exists(movie_key(tmdb_id))
+    found = await pipe.execute()
+    return [tmdb_id for tmdb_id, hit in zip(tmdb_ids, found) if not hit]
+
+
+async def _publish(cache: RedisCache, run: WarmupRun) -> None:
+    await cache.set_json(WARMUP_STATUS_KEY, run.to_dict(), ttl_seconds=STATUS_TTL)
+
+
+@background_tmdb_traffic
+async def run_warmup(
+    cache: RedisCache, run: WarmupRun | None = None, movies: ByteCache | None = None
+) -> WarmupRun:
+    """Warm trending, discover, movie-detail and pattern caches."""
+    run = run or WarmupRun()
+    movies = movies or ByteCache(await get_binary_redis())
+    started = time.monotonic()
+    pacer = RequestPacer(settings.warmup_tmdb_rate_per_second)
+    semaphore = asyncio.Semaphore(settings.warmup_concurrency)
+
+    async def _tmdb(
+        progress: StageProgress, label: str, call: Callable[[], Awaitable[Any]]
+    ) -> Any | None:
+        async with semaphore:
+            await pacer.wait()
+            try:
+                result = await call()
+            except Exception as e:
+                progress.failed += 1
+                run.error(f"{run.stage} {label}: {e}")
+                return None
+        progress.done += 1
+        return result
+
+    try:
+        # Trending ids (in rank order) seed the detail stage
+        progress = run.begin("trending", len(TRENDING_WINDOWS))
+        entries = await asyncio.gather(*(
+            _tmdb(progress, window, functools.partial(refresh_trending, movies, window))
+            for window in TRENDING_WINDOWS
+        ))
+        movie_ids: dict[int, None] = {}
+        for entry in entries:
+            for movie in orjson.loads(entry.body)["results"] if entry else []:
+                movie_ids.setdefault(movie["tmdb_id"])
+        await _publish(cache, run)
+
+        pages = [
+            (genre_id, page)
+            for genre_id in GENRE_MAP
+            for page in range(1, settings.warmup_discover_pages + 1)
+        ]
+        progress = run.begin("discover", len(pages))
+        results = await asyncio.gather(*(
+            _tmdb(
+                progress,
+                f"{GENRE_MAP[genre_id]} p{page}",
+                functools.partial(tmdb_service.discover_movies, genre_ids=[genre_id], page=page),
+            )
+            for genre_id, page in pages
+        ))
+        per_genre: dict[int, list[dict]] = {}
+        for (genre_id, _), found in zip(pages, results):
+            per_genre.setdefault(genre_id, []).extend(found or [])
+        for found in per_genre.values():
+            for movie in found[: settings.warmup_movies_per_genre]:
+                movie_ids.setdefault(movie["id"])
+        await _publish(cache, run)
+
+        ids = list(movie_ids)
+        missing = await _uncached(cache, ids)
+        progress = run.begin("details", len(ids))
+        progress.skipped = len(ids) - len(missing)
+        await asyncio.gather(*(
+            _tmdb(progress, str(tmdb_id), functools.partial(refresh_movie, movies, tmdb_id))
+            for tmdb_id in missing
+        ))
+        await _publish(cache, run)
+
+        # Pattern answers come from a paid batch job, so only when opted in
+        if settings.pregen_enabled and settings.warmup_top_patterns > 0:
+            progress = run.begin("patterns")
+            report = await pregenerate_popular_patterns(
+                cache, top_n=settings.warmup_top_patterns, decay=False
+            )
+            progress.total = report["patterns_considered"]
+            progress.done = report["generated"]
+            progress.skipped = report["skipped_fresh"]
+            progress.failed = report["failed"]
+    except Exception as e:
+        run.state = "failed"
+        run.error(f"{run.stage}: {e}")
+        logger.error("warmup_failed", stage=run.stage, error=str(e))
+    else:
+        run.state = "partial" if run.errors_total else "complete"
+    finally:
+        run.stage = None
+        run.finished_at = _now()
+        run.duration_seconds = round(time.monotonic() - started, 1)
+        await _publish(cache, run)
+
+    logger.info(
+        "warmup_complete",
+        state=run.state,
+        duration_seconds=run.duration_seconds,
+        errors=run.errors_total,
+        **{name: asdict(p) for name, p in run.stages.items()},
+    )
+    return run
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: candidate construction and summary conversion.
+
+Builds the candidates for one recommendation from TMDB-shaped details,
+converts the picks to ``MovieSummary`` and reports time and allocated
+bytes per recommendation. The slotted ``MovieCandidate`` and dict-validated
+``_candidate_to_summary`` are compared with the previous representation
+(plain dataclass, validated ``MovieSummary(...)``). Also times the
+candidate block of the prompt: formatted per request vs joined from the
+fragments enrichment attaches.
+
+Usage:
+    python scripts/bench_candidates.py [--candidates 30] [--rounds 2000]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.schemas.recommendation import MovieSummary  # noqa: E402
+from app.services.ai_service import _candidate_to_summary  # noqa: E402
+from app.services.prompt_fragments import (  # noqa: E402
+    FragmentCache,
+    candidate_fragment,
+)
+from app.services.tmdb_service import GENRE_MAP, MovieCandidate  # noqa: E402
+
+PICKS = 6
+
+# Same fields, no slots
+LegacyCandidate = make_dataclass(
+    "LegacyCandidate", [(f.name, f.type, f) for f in fields(MovieCandidate)]
+)
+
+
+def legacy_summary(candidate) -> MovieSummary:
+    return MovieSummary(
+        tmdb_id=candidate.tmdb_id,
+        title=candidate.title,
+        year=candidate.release_date[:4] if candidate.release_date else None,
+        genres=candidate.genres,
+        vote_average=candidate.vote_average,
+        runtime=candidate.runtime,
+        poster_url=(
+            f"{settings.tmdb_image_base_url}/w500{candidate.poster_path}"
+            if candidate.poster_path
+            else None
+        ),
+        backdrop_url=(
+            f"{settings.tmdb_image_base_url}/w1280{candidate.backdrop_path}"
+            if candidate.backdrop_path
+            else None
+        ),
+        overview=candidate.overview,
+        directors=candidate.director_names,
+        cast=candidate.cast_names[:5],
+        match_score=8.0,
+        rationale="Because you liked it",
+    )
+
+
+def fake_details(n: int) -> list[dict]:
+    genre_ids = list(GENRE_MAP)
+    return [
+        {
+            "tmdb_id": 1000 + i,
+            "title": f"Movie {i}",
+            "overview": "A story about people and the choices they make. " * 4,
+            "release_date": f"{1980 + i % 40}-05-01",
+            # Fresh string objects, as json.loads produces per response
+            "genres": ["".join(GENRE_MAP[g]) for g in genre_ids[i % 5 : i % 5 + 3]],
+            "genre_ids": genre_ids[i % 5 : i % 5 + 3],
+            "vote_average": 7.1,
+            "vote_count": 1500,
+            "popularity": 42.0,
+            "runtime": 118,
+            "poster_path": f"/poster{i}.jpg",
+            "backdrop_path": f"/backdrop{i}.jpg",
+            "original_language": "".join("en"),
+            "director_names": [f"Director {i}"],
+            "cast_names": [f"Actor {i}-{j}" for j in range(10)],
+        }
+        for i in range(n)
+    ]
+
+
+def run(label: str, cls, to_summary, details: list[dict], rounds: int) -> None:
+    # Time
+    started = time.perf_counter()
+    for _ in range(rounds):
+        candidates = [cls(**d) for d in details]
+        [to_summary(c) for c in candidates[:PICKS]]
+    per_rec_us = (time.perf_counter() - started) / rounds * 1e6
+
+    # Memory retained by one recommendation's candidates and summaries
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    candidates = [cls(**d) for d in details]
+    summaries = [to_summary(c) for c in candidates[:PICKS]]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    del summaries
+
+    print(f"  {label:<10} {per_rec_us:9.1f} µs/rec   {retained / 1024:8.1f} KiB/rec")
+
+
+def run_prompt_lines(details: list[dict], rounds: int) -> None:
+    cache = FragmentCache()
+
+    def formatted(candidates):
+        return "\n".join(c.to_prompt_string() for c in candidates)
+
+    def assembled(candidates):
+        # What enrich_movie does for a details body it has seen before
+        for c in candidates:
+            c.fragments = cache.get_or_build(c, (c.tmdb_id, 1.0))
+        return "\n".join(candidate_fragment(c, "full") for c in candidates)
+
+    assembled([MovieCandidate(**d) for d in details])  # warm the LRU
+    for label, build in (("formatted", formatted), ("fragments", assembled)):
+        elapsed = 0.0
+        for _ in range(rounds):
+            candidates = [MovieCandidate(**d) for d in details]
+            started = time.perf_counter()
+            build(candidates)
+            elapsed += time.perf_counter() - started
+        print(f"  {label:<10} {elapsed / rounds * 1e6:9.1f} µs/prompt")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MovieCandidate micro-benchmark")
+    parser.add_argument("--candidates", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    details = fake_details(args.candidates)
+    print(f"\n{args.candidates} candidates, {PICKS} summaries per recommendation\n")
+    run("legacy", LegacyCandidate, legacy_summary, details, args.rounds)
+    run(
+        "current",
+        MovieCandidate,
+        lambda c: _candidate_to_summary(c, match_score=8.0, rationale="Because you liked it"),
+        details,
+        args.rounds,
+    )
+    print("\nCandidate block of the prompt\n")
+    run_prompt_lines(details, args.rounds)
+    print()
+
+
+if __name__ == "__main__":
+    main()
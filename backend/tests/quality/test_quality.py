@@ -17,7 +17,12 @@ from dataclasses import dataclass, field
 
 import pytest
 
-from app.services.ai_service import _build_candidate_prompt, _parse_ai_response, compute_complexity
+from app.services.ai_service import (
+    _build_candidate_prompt,
+    _estimate_tokens,
+    _parse_ai_response,
+    compute_complexity,
+)
 from app.schemas.recommendation import (
     Context,
     RecommendationRequest,
@@ -301,3 +306,57 @@ class TestPromptBuilding:
         prompt = _build_candidate_prompt(case.candidates, case.request)
         assert "MUST ONLY recommend movies from the numbered list" in prompt
         assert "Do NOT recommend any movie not in this list" in prompt
+
+
+class TestCompactEncoding:
+    """A/B check: the compact candidate encoding must be cheaper without
+    dropping anything the model needs to pick well."""
+
+    @staticmethod
+    def _prompts(case: GoldenCase) -> tuple[str, str]:
+        tier = compute_complexity(case.request).tier
+        full = _build_candidate_prompt(case.candidates, case.request)
+        compact = _build_candidate_prompt(
+            case.candidates, case.request, encoding="compact", tier=tier
+        )
+        return full, compact
+
+    @pytest.mark.parametrize("case", GOLDEN_CASES, ids=[c.name for c in GOLDEN_CASES])
+    def test_compact_prompt_keeps_decision_fields(self, case: GoldenCase):
+        _, compact = self._prompts(case)
+        rows = {
+            int(line.split(". ", 1)[1].split("|")[0]): line.split(". ", 1)[1].split("|")
+            for line in compact.splitlines()
+            if line.startswith("  ") and "|" in line
+        }
+        legend = dict(
+            item.split("=", 1)
+            for line in compact.splitlines() if line.startswith("Genres: ")
+            for item in line.removeprefix("Genres: ").split(", ")
+        )
+        assert set(rows) == {c.tmdb_id for c in case.candidates}
+        for c in case.candidates:
+            _, title, year, genres, rating, runtime, *_ = rows[c.tmdb_id]
+            assert title == c.title
+            assert year == c.release_date[:4]
+            assert [legend[g] for g in genres.split()] == c.genres
+            assert float(rating) == c.vote_average
+            assert int(runtime) == c.runtime
+
+    @pytest.mark.parametrize("case", GOLDEN_CASES, ids=[c.name for c in GOLDEN_CASES])
+    def test_compact_prompt_keeps_request_and_rules(self, case: GoldenCase):
+        _, compact = self._prompts(case)
+        assert f'"mode":"{case.request.mode}"' in compact
+        for user in case.request.users:
+            for genre in user.likes_genres + user.dislikes_genres + user.dealbreakers:
+                assert genre in compact
+        assert "MUST ONLY recommend movies from the numbered list" in compact
+
+    def test_compact_encoding_saves_tokens(self):
+        full_tokens = compact_tokens = 0
+        for case in GOLDEN_CASES:
+            full, compact = self._prompts(case)
+            assert _estimate_tokens(compact) < _estimate_tokens(full), case.name
+            full_tokens += _estimate_tokens(full)
+            compact_tokens += _estimate_tokens(compact)
+        assert compact_tokens <= full_tokens * 0.75
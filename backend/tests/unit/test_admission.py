@@ -0,0 +1,64 @@
+"""Tests for the Claude admission controller."""
+
+import asyncio
+
+import pytest
+
+from app.core.exceptions import ServiceOverloadedError
+from app.services.admission import AdmissionController, Priority
+
+MODEL = "test-model"
+
+
+async def test_admits_up_to_limit_without_waiting():
+    controller = AdmissionController(max_in_flight=2, max_queue=4, max_wait_seconds=1)
+    async with controller.slot(MODEL, Priority.USER):
+        async with controller.slot(MODEL, Priority.USER):
+            assert controller.snapshot()[MODEL] == {"in_flight": 2, "queued": 0}
+    assert controller.snapshot()[MODEL] == {"in_flight": 0, "queued": 0}
+
+
+async def test_rejects_when_queue_is_full():
+    controller = AdmissionController(max_in_flight=1, max_queue=0, max_wait_seconds=1)
+    async with controller.slot(MODEL, Priority.USER):
+        with pytest.raises(ServiceOverloadedError):
+            async with controller.slot(MODEL, Priority.USER):
+                pass
+
+
+async def test_rejects_after_max_wait():
+    controller = AdmissionController(max_in_flight=1, max_queue=4, max_wait_seconds=0.01)
+    async with controller.slot(MODEL, Priority.USER):
+        with pytest.raises(ServiceOverloadedError):
+            async with controller.slot(MODEL, Priority.USER):
+                pass
+        assert controller.snapshot()[MODEL]["queued"] == 0
+
+
+async def test_higher_priority_waiters_served_first():
+    controller = AdmissionController(max_in_flight=1, max_queue=4, max_wait_seconds=1)
+    order: list[str] = []
+
+    async def _call(name: str, priority: Priority) -> None:
+        async with controller.slot(MODEL, priority):
+            order.append(name)
+
+    async with controller.slot(MODEL, Priority.USER):
+        tasks = [
+            asyncio.create_task(_call("anonymous", Priority.ANONYMOUS)),
+            asyncio.create_task(_call("user", Priority.USER)),
+            asyncio.create_task(_call("refine", Priority.REFINE)),
+        ]
+        await asyncio.sleep(0)
+        assert controller.snapshot()[MODEL]["queued"] == 3
+
+    await asyncio.gather(*tasks)
+    assert order == ["refine", "user", "anonymous"]
+    assert controller.snapshot()[MODEL] == {"in_flight": 0, "queued": 0}
+
+
+async def test_models_are_limited_independently():
+    controller = AdmissionController(max_in_flight=1, max_queue=0, max_wait_seconds=1)
+    async with controller.slot("model-a", Priority.USER):
+        async with controller.slot("model-b", Priority.USER):
+            pass
@@ -1,14 +1,43 @@
+import asyncio
 import json
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
+
+from app.core.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    anthropic_breaker,
+)
+from app.core.exceptions import ExternalServiceError
+from app.core.redis import RedisCache
 from app.schemas.recommendation import RecommendationRequest, UserProfile
+from app.services.admission import Priority
 from app.services.ai_service import (
+    PROFILE_TOKEN_BUDGET,
+    _budget_profile_context,
     _build_candidate_prompt,
+    _cacheable_user_turn,
+    _call_model,
     _candidate_to_summary,
+    _choose_encoding,
+    _compact_candidates,
+    _estimate_tokens,
+    _filter_seen,
+    _history_for_session,
     _parse_ai_response,
+    _rebuild_candidates,
+    get_recommendation,
+    refine_recommendation,
     select_model,
 )
+from app.services.model_router import MODEL_LADDER, ModelRouter
+from app.services.taste_profile import GenreAffinity, TasteProfile
 from app.services.tmdb_service import MovieCandidate
 
+HAIKU, SONNET, OPUS = MODEL_LADDER
+
 
 def _make_candidate(tmdb_id: int, title: str, vote_avg: float = 7.0) -> MovieCandidate:
     return MovieCandidate(
@@ -145,3 +174,394 @@ def test_parse_invalid_json_fallback():
     # Should fallback to vote_average ranking
     assert result.best_pick.tmdb_id == 278  # Shawshank has highest vote_average
     assert len(result.additional_picks) == 5
+
+
+def test_build_candidate_prompt_includes_profile_context():
+    candidates = [_make_candidate(550, "Fight Club")]
+    req = RecommendationRequest(mode="solo", users=[UserProfile(name="Mike")])
+    prompt = _build_candidate_prompt(
+        candidates, req, "Favorite directors: David Fincher"
+    )
+    assert "LONG-TERM TASTE" in prompt
+    assert "David Fincher" in prompt
+
+    assert "LONG-TERM TASTE" not in _build_candidate_prompt(candidates, req)
+
+
+def test_choose_encoding_follows_rollout_pct():
+    with patch("app.services.ai_service.settings.prompt_compact_pct", 0):
+        assert _choose_encoding("session-a") == "full"
+    with patch("app.services.ai_service.settings.prompt_compact_pct", 100):
+        assert _choose_encoding("session-a") == "compact"
+    with patch("app.services.ai_service.settings.prompt_compact_pct", 50):
+        # Stable per session
+        assert _choose_encoding("session-a") == _choose_encoding("session-a")
+
+
+def test_compact_prompt_plot_length_follows_tier():
+    candidate = _make_candidate(1, "Long Plot")
+    candidate.overview = "y" * 400
+    req = RecommendationRequest(mode="solo", users=[UserProfile(name="Test")])
+    simple = _build_candidate_prompt([candidate], req, encoding="compact", tier="simple")
+    complex_ = _build_candidate_prompt([candidate], req, encoding="compact", tier="complex")
+    assert "y" * 80 in simple and "y" * 81 not in simple
+    assert "y" * 200 in complex_
+
+
+def test_profile_context_respects_tier_budget():
+    profile = TasteProfile(
+        user_id="u1",
+        genre_affinities=[
+            GenreAffinity(genre=f"Genre{i}", score=0.9, interactions=5)
+            for i in range(5)
+        ],
+        preferred_decades=["1990s", "2000s", "2010s"],
+        top_directors=["Christopher Nolan", "Denis Villeneuve", "David Fincher"],
+        top_actors=["Ryan Gosling", "Emily Blunt", "Tom Hardy"],
+        total_interactions=50,
+    )
+    for tier, budget in PROFILE_TOKEN_BUDGET.items():
+        ctx = _budget_profile_context(profile, tier)
+        assert _estimate_tokens(ctx) <= budget
+    # Genre line is kept first; lower-value lines are dropped to fit
+    simple = _budget_profile_context(profile, "simple")
+    assert simple.startswith("Implicit genre preferences")
+    assert len(simple) <= len(_budget_profile_context(profile, "complex"))
+
+
+def test_profile_context_empty_without_profile():
+    assert _budget_profile_context(None, "complex") == ""
+
+
+def test_filter_seen_drops_watched_and_dismissed():
+    candidates = [_make_candidate(550, "Fight Club"), _make_candidate(680, "Pulp Fiction")]
+    profile = TasteProfile(user_id="u1", excluded_tmdb_ids=[550])
+    assert [c.tmdb_id for c in _filter_seen(candidates, profile)] == [680]
+
+
+def test_filter_seen_keeps_pool_when_everything_was_seen():
+    candidates = [_make_candidate(550, "Fight Club")]
+    profile = TasteProfile(user_id="u1", excluded_tmdb_ids=[550])
+    assert _filter_seen(candidates, profile) == candidates
+
+
+# ---------------------------------------------------------------------------
+# Shared model call wrapper
+# ---------------------------------------------------------------------------
+
+def _message(text: str = "{}") -> MagicMock:
+    message = MagicMock()
+    message.content = [MagicMock(text=text)]
+    message.usage = MagicMock(
+        input_tokens=100,
+        output_tokens=50,
+        cache_creation_input_tokens=0,
+        cache_read_input_tokens=0,
+    )
+    return message
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int, retry_after: str | None = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = MagicMock(headers={"retry-after": retry_after} if retry_after else {})
+
+
+def _patched_client(create):
+    client = MagicMock()
+    client.messages.create = create
+    return patch("app.services.ai_service._get_client", return_value=client)
+
+
+async def test_call_model_retries_transient_errors():
+    create = AsyncMock(side_effect=[_StatusError(529, retry_after="0"), _message("ok")])
+    with _patched_client(create):
+        result = await _call_model(HAIKU, "simple", [], Priority.USER)
+    assert result.text == "ok"
+    assert result.attempts == 2
+    assert result.usage.total == 150
+
+
+async def test_call_model_does_not_retry_client_errors():
+    create = AsyncMock(side_effect=_StatusError(400))
+    with _patched_client(create), pytest.raises(ExternalServiceError):
+        await _call_model(HAIKU, "simple", [], Priority.USER)
+    assert create.await_count == 1
+
+
+async def test_call_model_stops_at_deadline():
+    create = AsyncMock(side_effect=_StatusError(529, retry_after="30"))
+    with (
+        _patched_client(create),
+        patch("app.services.ai_service.settings.claude_deadline_seconds", 1.0),
+        pytest.raises(ExternalServiceError),
+    ):
+        await _call_model(HAIKU, "simple", [], Priority.USER)
+    # Retry-After is longer than the remaining deadline — no second attempt
+    assert create.await_count == 1
+
+
+async def test_call_model_hedges_to_cheaper_tier():
+    async def _create(model: str, **kwargs):
+        if model == SONNET:
+            await asyncio.sleep(5)
+        return _message(f"from {model}")
+
+    with (
+        _patched_client(_create),
+        patch("app.services.ai_service.settings.claude_hedge_after_seconds", 0.01),
+    ):
+        result = await _call_model(SONNET, "moderate", [], Priority.USER)
+    assert result.model == HAIKU
+    assert result.text == f"from {HAIKU}"
+
+
+async def test_call_model_fails_fast_when_breaker_open():
+    create = AsyncMock(return_value=_message("ok"))
+    for _ in range(anthropic_breaker.failure_threshold):
+        anthropic_breaker.record_failure()
+    try:
+        with _patched_client(create), pytest.raises(CircuitOpenError):
+            await _call_model(HAIKU, "simple", [], Priority.USER)
+    finally:
+        anthropic_breaker.reset()
+    create.assert_not_awaited()
+
+
+async def test_hanging_calls_open_the_breaker_and_count_against_the_model():
+    async def _hang(**kwargs):
+        await asyncio.sleep(60)
+
+    router = ModelRouter()
+    try:
+        with (
+            _patched_client(_hang),
+            patch("app.services.ai_service.model_router", router),
+            patch("app.services.ai_service.settings.claude_deadline_seconds", 0.01),
+        ):
+            for _ in range(anthropic_breaker.failure_threshold):
+                with pytest.raises(ExternalServiceError, match="deadline exceeded"):
+                    await _call_model(OPUS, "complex", [], Priority.USER)
+            assert anthropic_breaker.state == CircuitState.OPEN
+            with pytest.raises(CircuitOpenError):
+                await _call_model(OPUS, "complex", [], Priority.USER)
+    finally:
+        anthropic_breaker.reset()
+    assert router.health(OPUS).samples == anthropic_breaker.failure_threshold
+
+
+# ---------------------------------------------------------------------------
+# Refine candidate reuse
+# ---------------------------------------------------------------------------
+
+async def test_rebuild_candidates_uses_session_details_and_fetches_misses():
+    stored = _make_candidate(1, "Stored")
+    fetched = _make_candidate(2, "Fetched")
+    enrich_many = AsyncMock(return_value=[fetched])
+
+    with patch("app.services.ai_service.tmdb_service.enrich_many", enrich_many):
+        rebuilt = await _rebuild_candidates([2, 1], _compact_candidates([stored]))
+
+    assert [c.tmdb_id for c in rebuilt] == [2, 1]
+    assert rebuilt[1] == stored
+    enrich_many.assert_awaited_once_with([{"id": 2}])
+
+
+async def test_rebuild_candidates_skips_upstream_when_all_stored():
+    pool = [_make_candidate(i, f"Movie {i}") for i in range(1, 4)]
+    enrich_many = AsyncMock()
+
+    with patch("app.services.ai_service.tmdb_service.enrich_many", enrich_many):
+        rebuilt = await _rebuild_candidates([3, 1], _compact_candidates(pool))
+
+    assert [c.title for c in rebuilt] == ["Movie 3", "Movie 1"]
+    enrich_many.assert_not_awaited()
+
+
+# ---------------------------------------------------------------------------
+# Refine conversation reuse
+# ---------------------------------------------------------------------------
+
+def _refine_session(pool: list[MovieCandidate], messages: list[dict] | None = None) -> dict:
+    return {
+        "session_id": "s1",
+        "preferences": {"mode": "solo", "users": [{"name": "A"}]},
+        "candidate_tmdb_ids": [c.tmdb_id for c in pool],
+        "candidate_details": _compact_candidates(pool),
+        "presented_tmdb_ids": [1],
+        "turn_count": 1,
+        "model_used": HAIKU,
+        "total_tokens": 150,
+        "complexity": {"tier": "simple"},
+        "messages": messages or [],
+        "conversation_tmdb_ids": [c.tmdb_id for c in pool],
+        "cache_read_ratios": [0.0],
+    }
+
+
+def _refine_response(pick_id: int) -> str:
+    return json.dumps({"best_pick": {"tmdb_id": pick_id, "rationale": "fits", "match_score": 8}})
+
+
+def test_history_keeps_only_candidate_block_breakpoint():
+    messages = [
+        _cacheable_user_turn("candidates"),
+        {"role": "assistant", "content": "{}"},
+        _cacheable_user_turn("refine"),
+    ]
+    history = _history_for_session(messages)
+    assert history[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in history[2]["content"][0]
+    # The live message list is untouched
+    assert "cache_control" in messages[2]["content"][0]
+
+
+async def test_refine_continues_stored_conversation():
+    pool = [_make_candidate(i, f"Movie {i}") for i in range(1, 9)]
+    opening = [_cacheable_user_turn("opening candidates"), {"role": "assistant", "content": "{}"}]
+    session_data = _refine_session(pool, opening)
+    session_store = MagicMock(get=AsyncMock(return_value=session_data), set=AsyncMock())
+    message = _message(_refine_response(2))
+    message.usage.cache_read_input_tokens = 300
+
+    with _patched_client(AsyncMock(return_value=message)) as get_client:
+        result = await refine_recommendation("s1", "more", [], [1], session_store)
+
+    sent = get_client.return_value.messages.create.await_args.kwargs["messages"]
+    assert sent[:2] == opening
+    new_turn = sent[2]["content"][0]
+    assert new_turn["cache_control"] == {"type": "ephemeral"}
+    # Candidates already in the conversation are referenced by id only
+    assert "Movie 2" not in new_turn["text"]
+    assert result.best_pick.tmdb_id == 2
+
+    stored = session_store.set.await_args.args[1]
+    assert len(stored["messages"]) == 4
+    assert stored["cache_read_ratios"] == [0.0, 0.75]
+
+
+async def test_refine_without_history_starts_cacheable_conversation():
+    pool = [_make_candidate(i, f"Movie {i}") for i in range(1, 9)]
+    session_data = _refine_session(pool)
+    session_store = MagicMock(get=AsyncMock(return_value=session_data), set=AsyncMock())
+
+    with _patched_client(AsyncMock(return_value=_message(_refine_response(3)))) as get_client:
+        await refine_recommendation("s1", "more", [], [1], session_store)
+
+    sent = get_client.return_value.messages.create.await_args.kwargs["messages"]
+    assert len(sent) == 1
+    candidate_block, instructions = sent[0]["content"]
+    assert "Movie 2" in candidate_block["text"]
+    assert instructions["cache_control"] == {"type": "ephemeral"}
+
+
+def _pending_profile_load(state: dict):
+    """A taste-profile query that never finishes, recording how it ended."""
+
+    async def load(user_id, db, cache):
+        state["started"] = True
+        try:
+            await asyncio.Event().wait()
+        finally:
+            state["unwound"] = True
+
+    return load
+
+
+def _cache(value: str | None) -> RedisCache:
+    client = MagicMock(
+        get=AsyncMock(return_value=value), zincrby=AsyncMock(), hsetnx=AsyncMock()
+    )
+    return RedisCache(client)
+
+
+async def test_cache_hit_never_starts_profile_query():
+    hit = json.dumps({"best_pick": {"tmdb_id": 550, "title": "Fight Club"}})
+    state = {}
+    request = RecommendationRequest(mode="solo", users=[UserProfile(name="A")])
+    with patch("app.services.ai_service._load_taste_profile", new=_pending_profile_load(state)):
+        body = await get_recommendation(request, cache=_cache(hit))
+
+    assert json.loads(body)["best_pick"]["tmdb_id"] == 550
+    assert state == {}
+
+
+async def test_users_with_a_profile_bypass_the_shared_pattern_cache():
+    hit = json.dumps({"best_pick": {"tmdb_id": 550, "title": "Fight Club"}})
+    cache = _cache(hit)
+    cache.client.set = AsyncMock()
+    # No history worth a prompt block yet, but one dismissed title
+    profile = TasteProfile(user_id="u1", excluded_tmdb_ids=[1])
+    candidates = [_make_candidate(i, f"Movie {i}") for i in range(1, 6)]
+    request = RecommendationRequest(mode="solo", users=[UserProfile(name="A")])
+    with (
+        patch("app.services.ai_service._load_taste_profile", AsyncMock(return_value=profile)),
+        patch(
+            "app.services.ai_service.tmdb_service.fetch_candidates",
+            AsyncMock(return_value=candidates),
+        ),
+        _patched_client(AsyncMock(return_value=_message(_refine_response(2)))),
+    ):
+        result = await get_recommendation(request, cache=cache, user_id="u1", db=MagicMock())
+
+    cache.client.get.assert_not_called()
+    assert result.best_pick.tmdb_id == 2
+    # Seen-filtered for this user, so not shared even without profile context
+    cache.client.set.assert_not_called()
+
+
+async def test_failed_fetch_waits_for_cancelled_profile_query():
+    state = {}
+
+    async def failing_fetch(**kwargs):
+        await asyncio.sleep(0)  # the profile query is in flight by now
+        raise ExternalServiceError("TMDB", "HTTP 500")
+
+    request = RecommendationRequest(mode="solo", users=[UserProfile(name="A")])
+    with (
+        patch("app.services.ai_service._load_taste_profile", new=_pending_profile_load(state)),
+        patch("app.services.ai_service.tmdb_service.fetch_candidates", new=failing_fetch),
+        pytest.raises(ExternalServiceError),
+    ):
+        await get_recommendation(request, cache=_cache(None), user_id="u1")
+
+    # The shared db session is free again before the error reaches get_db
+    assert state == {"started": True, "unwound": True}
+
+
+async def test_refine_falls_back_to_catalog_while_tmdb_breaker_is_open():
+    # Only two unseen candidates left, so refine needs fresh ones
+    pool = [_make_candidate(i, f"Movie {i}") for i in range(1, 4)]
+    session_store = MagicMock(get=AsyncMock(return_value=_refine_session(pool)), set=AsyncMock())
+    breaker = CircuitBreaker("TMDB", failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+    tmdb_cache = RedisCache(MagicMock(get=AsyncMock(return_value=None)))
+    catalog = AsyncMock(return_value=[_make_candidate(i, f"Catalog {i}") for i in range(10, 16)])
+    db = MagicMock()
+
+    with (
+        patch("app.services.tmdb_service.tmdb_breaker", breaker),
+        patch("app.services.ai_service.tmdb_service._cache", tmdb_cache),
+        patch("app.services.ai_service.load_catalog_candidates", new=catalog),
+        _patched_client(AsyncMock(return_value=_message(_refine_response(12)))),
+    ):
+        result = await refine_recommendation("s1", "more", [], [], session_store, db=db)
+
+    assert catalog.await_args.args == (db,)
+    assert result.best_pick.tmdb_id == 12
+
+
+async def test_refine_without_db_surfaces_open_breaker():
+    pool = [_make_candidate(i, f"Movie {i}") for i in range(1, 4)]
+    session_store = MagicMock(get=AsyncMock(return_value=_refine_session(pool)), set=AsyncMock())
+    breaker = CircuitBreaker("TMDB", failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+    tmdb_cache = RedisCache(MagicMock(get=AsyncMock(return_value=None)))
+
+    with (
+        patch("app.services.tmdb_service.tmdb_breaker", breaker),
+        patch("app.services.ai_service.tmdb_service._cache", tmdb_cache),
+        pytest.raises(CircuitOpenError),
+    ):
+        await refine_recommendation("s1", "more", [], [], session_store)
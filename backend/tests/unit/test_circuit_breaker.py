@@ -0,0 +1,63 @@
+"""Tests for dependency circuit breakers."""
+
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+def _tripped(recovery_timeout: float = 60) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=recovery_timeout)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = _tripped(recovery_timeout=0)
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request() is True
+    breaker.recovery_timeout = 60  # keep the in-flight probe from going stale
+    assert breaker.allow_request() is False
+
+
+def test_successful_probe_closes_breaker():
+    breaker = _tripped(recovery_timeout=0)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = _tripped(recovery_timeout=0)
+    assert breaker.allow_request()
+    breaker.recovery_timeout = 60
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.allow_request() is False
+
+
+def test_snapshot_reports_state():
+    breaker = _tripped()
+    snapshot = breaker.snapshot()
+    assert snapshot["state"] == "open"
+    assert 0 < snapshot["retry_in_seconds"] <= 60
+    breaker.reset()
+    assert breaker.snapshot()["state"] == "closed"
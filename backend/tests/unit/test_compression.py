@@ -0,0 +1,151 @@
+"""Tests for the response compression middleware."""
+
+import gzip
+from unittest.mock import patch
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.api.middleware.compression import ENCODERS, CompressionMiddleware, negotiate
+
+BIG = b'{"overview": "' + b"a long overview " * 200 + b'"}'
+
+
+async def _json(request):
+    return Response(BIG, media_type="application/json", headers={"ETag": '"v1"'})
+
+
+async def _small(request):
+    return Response(b'{"ok": true}', media_type="application/json")
+
+
+async def _pre_encoded(request):
+    return Response(
+        gzip.compress(BIG), media_type="application/json", headers={"Content-Encoding": "gzip"}
+    )
+
+
+async def _events(request):
+    async def stream():
+        yield b"data: " + b"x" * 2000 + b"\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+async def _streamed(request):
+    async def stream():
+        for _ in range(3):
+            yield b"line of text " * 100
+
+    return StreamingResponse(stream(), media_type="text/plain")
+
+
+async def _image(request):
+    return Response(b"\x89PNG" + b"\0" * 4000, media_type="image/png")
+
+
+def _client() -> tuple[TestClient, CompressionMiddleware]:
+    app = Starlette(routes=[
+        Route("/json", _json),
+        Route("/small", _small),
+        Route("/pre", _pre_encoded),
+        Route("/events", _events),
+        Route("/streamed", _streamed),
+        Route("/image", _image),
+        Route("/text", lambda request: PlainTextResponse("hello " * 500)),
+    ])
+    middleware = CompressionMiddleware(app, minimum_size=500, variant_cache_entries=8)
+    return TestClient(middleware), middleware
+
+
+def test_compresses_large_json_and_weakens_etag():
+    client, _ = _client()
+    response = client.get("/json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert int(response.headers["content-length"]) < len(BIG)
+    assert response.content == BIG
+
+
+def test_leaves_small_pre_encoded_sse_and_binary_responses_alone():
+    client, _ = _client()
+    headers = {"Accept-Encoding": "gzip"}
+    assert "content-encoding" not in client.get("/small", headers=headers).headers
+    assert "content-encoding" not in client.get("/image", headers=headers).headers
+    events = client.get("/events", headers=headers)
+    assert "content-encoding" not in events.headers
+    assert events.content.startswith(b"data: ")
+    # Already gzip: passed through untouched, not compressed twice
+    pre = client.get("/pre", headers=headers)
+    assert pre.headers["content-encoding"] == "gzip"
+    assert pre.content == BIG
+
+
+def test_eligible_responses_vary_on_accept_encoding_even_when_sent_as_is():
+    client, _ = _client()
+    for headers in ({"Accept-Encoding": "gzip"}, {"Accept-Encoding": "identity"}):
+        small = client.get("/small", headers=headers)
+        assert "content-encoding" not in small.headers
+        assert small.headers["vary"] == "Accept-Encoding"
+    assert client.get("/json", headers={"Accept-Encoding": "identity"}).headers["vary"] == (
+        "Accept-Encoding"
+    )
+    assert "vary" not in client.get("/image", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_existing_vary_is_not_repeated():
+    async def varied(request):
+        return Response(BIG, media_type="application/json", headers={"Vary": "Accept-Encoding"})
+
+    client = TestClient(CompressionMiddleware(Starlette(routes=[Route("/", varied)])))
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_no_accepted_coding_means_identity():
+    client, _ = _client()
+    response = client.get("/json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.content == BIG
+
+
+def test_streamed_bodies_are_compressed_chunk_by_chunk():
+    client, _ = _client()
+    response = client.get("/streamed", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.content == b"line of text " * 300
+
+
+def test_compressed_variants_are_reused_by_etag():
+    client, middleware = _client()
+    one_shot, stream = ENCODERS["gzip"]
+    calls = []
+
+    def counting(data):
+        calls.append(len(data))
+        return one_shot(data)
+
+    with patch.dict(ENCODERS, {"gzip": (counting, stream)}):
+        for _ in range(3):
+            client.get("/json", headers={"Accept-Encoding": "gzip"})
+        client.get("/text", headers={"Accept-Encoding": "gzip"})
+        client.get("/text", headers={"Accept-Encoding": "gzip"})
+
+    # /json compressed once; /text has no ETag so every response is compressed
+    assert len(calls) == 3
+    assert list(middleware._variants) == [('"v1"', "gzip")]
+
+
+def test_negotiation_prefers_client_weight_then_server_order():
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip;q=0") is None
+    assert negotiate("deflate") is None
+    assert negotiate("*") == next(iter(ENCODERS))
+    with patch.dict(ENCODERS, {"br": ENCODERS["gzip"]}):
+        assert negotiate("gzip;q=0.5, br") == "br"
+        assert negotiate("gzip, br;q=0.5") == "gzip"
@@ -0,0 +1,72 @@
+"""Tests for adaptive model routing."""
+
+from unittest.mock import patch
+
+from app.services.model_router import MODEL_LADDER, ModelRouter, cheaper_model
+from app.services.usage_tracker import TokenUsage, UsageTracker
+
+HAIKU, SONNET, OPUS = MODEL_LADDER
+
+
+def _router() -> ModelRouter:
+    return ModelRouter(tracker=UsageTracker())
+
+
+class TestCheaperModel:
+    def test_steps_down_the_ladder(self):
+        assert cheaper_model(OPUS) == SONNET
+        assert cheaper_model(SONNET) == HAIKU
+
+    def test_cheapest_and_unknown_have_no_step(self):
+        assert cheaper_model(HAIKU) is None
+        assert cheaper_model("some-other-model") is None
+
+
+class TestModelRouter:
+    def test_healthy_and_under_budget_keeps_requested_model(self):
+        decision = _router().route(OPUS, "complex", 8)
+        assert decision.model == OPUS
+        assert not decision.downgraded
+
+    def test_slow_opus_downgrades_to_sonnet(self):
+        router = _router()
+        for _ in range(10):
+            router.record_call(OPUS, 30.0, ok=True)
+        decision = router.route(OPUS, "complex", 9)
+        assert decision.model == SONNET
+        assert "p95" in decision.reasons[0]
+
+    def test_error_prone_models_cascade(self):
+        router = _router()
+        for model in (OPUS, SONNET):
+            for _ in range(10):
+                router.record_call(model, 1.0, ok=False)
+        assert router.route(OPUS, "complex", 9).model == HAIKU
+
+    def test_too_few_samples_are_ignored(self):
+        router = _router()
+        router.record_call(OPUS, 60.0, ok=False)
+        assert router.route(OPUS, "complex", 9).model == OPUS
+
+    def test_exhausted_budget_routes_to_cheapest(self):
+        router = _router()
+        router.tracker.record(OPUS, "complex", TokenUsage(output_tokens=1_000_000))
+        with patch("app.services.model_router.settings.ai_hourly_budget_usd", 10.0):
+            decision = router.route(OPUS, "complex", 12)
+        assert decision.model == HAIKU
+
+    def test_soft_budget_only_downgrades_borderline_scores(self):
+        router = _router()
+        router.tracker.record(OPUS, "complex", TokenUsage(output_tokens=360_000))
+        with patch("app.services.model_router.settings.ai_hourly_budget_usd", 10.0):
+            borderline = router.route(OPUS, "complex", 6)
+            strong = router.route(OPUS, "complex", 11)
+        assert borderline.model == SONNET
+        assert strong.model == OPUS
+
+    def test_disabled_router_never_adjusts(self):
+        router = _router()
+        for _ in range(10):
+            router.record_call(OPUS, 30.0, ok=False)
+        with patch("app.services.model_router.settings.router_enabled", False):
+            assert router.route(OPUS, "complex", 9).model == OPUS
@@ -0,0 +1,188 @@
+"""Tests for the byte-cached /movies routes."""
+
+import asyncio
+import gzip
+from unittest.mock import AsyncMock, patch
+
+import orjson
+from fastapi.testclient import TestClient
+
+from app.core.deps import get_byte_cache
+from app.core.exceptions import ExternalServiceError, NotFoundError
+from app.core.redis import ByteCache
+from app.core.responses import accepts_encoding, etag_matches
+from app.db.models import Movie
+from app.db.session import get_db
+from app.main import app
+from app.services.movie_cache import (
+    GZIP_MIN_BYTES,
+    encode_payload,
+    gzip_key,
+    load_movie_batch,
+    movie_key,
+    trending_key,
+)
+from app.services.tmdb_service import ENRICH_CONCURRENCY
+
+
+class _Pipeline:
+    def __init__(self, store: dict):
+        self._store = store
+        self._writes = []
+
+    def set(self, key, value, ex=None):
+        self._writes.append((key, value))
+
+    async def execute(self):
+        self._store.update(self._writes)
+
+
+class _BinaryRedis:
+    def __init__(self):
+        self.store: dict[str, bytes] = {}
+
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self):
+        return _Pipeline(self.store)
+
+
+_DB = object()  # stands in for the session; catalog lookups are patched
+
+
+def _client(redis: _BinaryRedis) -> TestClient:
+    app.dependency_overrides[get_byte_cache] = lambda: ByteCache(redis)
+    app.dependency_overrides[get_db] = lambda: _DB
+    return TestClient(app)
+
+
+def _details(tmdb_id: int) -> dict:
+    return {"id": tmdb_id, "title": f"Movie {tmdb_id}", "overview": "x" * 1000}
+
+
+def test_miss_fetches_and_stores_body_and_gzip_variant():
+    redis = _BinaryRedis()
+    fetch = AsyncMock(side_effect=_details)
+    try:
+        with patch("app.services.movie_cache.tmdb_service.get_movie_details", new=fetch):
+            response = _client(redis).get("/api/v1/movies/7")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Movie 7"
+    stored = redis.store[movie_key(7)]
+    assert orjson.loads(stored)["tmdb_id"] == 7
+    assert gzip.decompress(redis.store[gzip_key(movie_key(7))]) == stored
+    assert response.headers["cache-control"] == "public, max-age=3600"
+
+
+def test_hit_serves_stored_gzip_bytes_and_304s():
+    redis = _BinaryRedis()
+    entry = encode_payload({"results": [_details(i) for i in range(5)]})
+    redis.store[trending_key("week")] = entry.body
+    redis.store[gzip_key(trending_key("week"))] = entry.gzip
+    try:
+        client = _client(redis)
+        with patch("app.services.movie_cache.tmdb_service.get_trending") as fetch:
+            compressed = client.get(
+                "/api/v1/movies/trending", headers={"Accept-Encoding": "gzip"}
+            )
+            plain = client.get("/api/v1/movies/trending", headers={"Accept-Encoding": "identity"})
+            revalidated = client.get(
+                "/api/v1/movies/trending", headers={"If-None-Match": compressed.headers["etag"]}
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    fetch.assert_not_called()
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.content == entry.body  # decoded by the client
+    assert "content-encoding" not in plain.headers
+    assert plain.content == entry.body
+    assert plain.headers["etag"] == compressed.headers["etag"] == entry.etag
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+
+def test_batch_resolves_hits_misses_and_errors_in_order():
+    redis = _BinaryRedis()
+    redis.store[movie_key(13)] = encode_payload({"tmdb_id": 13, "title": "Cached"}).body
+
+    async def fetch(tmdb_id):
+        if tmdb_id == 404:
+            raise NotFoundError("TMDB resource", "/movie/404")
+        if tmdb_id in (7, 8):
+            raise ExternalServiceError("TMDB", "HTTP 503", upstream_status=503)
+        return _details(tmdb_id)
+
+    catalog = AsyncMock(return_value=[Movie(tmdb_id=7, title="From catalog")])
+    try:
+        with (
+            patch("app.services.movie_cache.tmdb_service.get_movie_details", new=fetch),
+            patch("app.services.movie_cache.load_catalog_movies", new=catalog),
+        ):
+            response = _client(redis).get("/api/v1/movies?ids=550,13,404,7,8,13")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["tmdb_id"] for r in results] == [550, 13, 404, 7, 8]
+    assert results[0]["title"] == "Movie 550"
+    assert results[1]["title"] == "Cached"
+    assert results[2] == {"tmdb_id": 404, "error": "not_found"}
+    assert results[3]["title"] == "From catalog"
+    assert results[4] == {"tmdb_id": 8, "error": "unavailable"}
+    catalog.assert_awaited_once_with(_DB, [7, 8])
+    # Fetched misses are cached; catalog fallbacks are not
+    assert movie_key(550) in redis.store
+    assert movie_key(7) not in redis.store
+    assert response.headers["cache-control"] == "public, max-age=0"
+
+
+async def test_batch_misses_are_fetched_with_bounded_concurrency():
+    in_flight = peak = 0
+
+    async def fetch(tmdb_id):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return _details(tmdb_id)
+
+    ids = list(range(1, 51))
+    with patch("app.services.movie_cache.tmdb_service.get_movie_details", new=fetch):
+        _, errors = await load_movie_batch(ByteCache(_BinaryRedis()), ids)
+
+    assert errors == 0
+    assert peak == ENRICH_CONCURRENCY
+
+
+def test_batch_rejects_bad_or_too_many_ids():
+    try:
+        client = _client(_BinaryRedis())
+        assert client.get("/api/v1/movies?ids=1,abc").status_code == 422
+        assert client.get("/api/v1/movies?ids=,").status_code == 422
+        too_many = ",".join(str(i) for i in range(51))
+        assert client.get(f"/api/v1/movies?ids={too_many}").status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_small_bodies_are_not_compressed():
+    entry = encode_payload({"tmdb_id": 1})
+    assert len(entry.body) < GZIP_MIN_BYTES
+    assert entry.gzip is None
+
+
+def test_header_matching():
+    assert accepts_encoding("gzip, deflate", "gzip")
+    assert not accepts_encoding("gzip;q=0, br", "gzip")
+    assert accepts_encoding("*", "gzip")
+    assert not accepts_encoding(None, "gzip")
+    assert etag_matches('"abc", W/"def"', 'W/"def"')
+    assert etag_matches('"def"', 'W/"def"')
+    assert not etag_matches('"abc"', 'W/"def"')
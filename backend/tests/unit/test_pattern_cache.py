@@ -1,12 +1,25 @@
-"""Tests for recommendation pattern cache normalization."""
+"""Tests for recommendation pattern cache normalization and cache hits."""
 
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import orjson
+
+from app.core.redis import RedisCache
+from app.core.responses import json_response
 from app.schemas.recommendation import (
     Context,
+    MovieSummary,
     RecommendationRequest,
+    RecommendationResponse,
     UserProfile,
     YearRange,
 )
-from app.services.ai_service import _normalize_cache_key
+from app.services.ai_service import (
+    _normalize_cache_key,
+    _read_cached_response,
+    get_recommendation,
+)
 
 
 class TestPatternCacheKey:
@@ -126,3 +139,60 @@ class TestPatternCacheKey:
             users=[UserProfile(name="A", mood=["Dark", "Intense"])],
         )
         assert _normalize_cache_key(req1) == _normalize_cache_key(req2)
+
+
+def _response() -> RecommendationResponse:
+    return RecommendationResponse(
+        session_id="s-1",
+        best_pick=MovieSummary(tmdb_id=550, title="Fight Club", match_score=9.1),
+        additional_picks=[MovieSummary(tmdb_id=13, title="Forrest Gump")],
+        model_used="claude-haiku",
+    )
+
+
+def _cache_holding(value: str | None) -> RedisCache:
+    client = MagicMock()
+    client.get = AsyncMock(return_value=value)
+    client.zincrby = AsyncMock()
+    client.hsetnx = AsyncMock()
+    return RedisCache(client)
+
+
+class TestCachedResponses:
+    async def test_cache_hit_is_served_as_preserialized_bytes(self):
+        stored = _response().model_dump()
+        stored.pop("session_id")
+        session_store = MagicMock()
+        session_store.set = AsyncMock()
+        request = RecommendationRequest(mode="solo", users=[UserProfile(name="A")])
+
+        body = await get_recommendation(
+            request, cache=_cache_holding(json.dumps(stored)), session_store=session_store
+        )
+
+        assert isinstance(body, bytes)
+        data = orjson.loads(body)
+        session_id, session = session_store.set.await_args.args
+        assert data == {**stored, "session_id": session_id}
+        assert session["presented_tmdb_ids"] == [550, 13]
+        assert session["model_used"] == "claude-haiku"
+
+    async def test_patterns_are_only_counted_for_pregeneration(self):
+        stored = _response().model_dump()
+        request = RecommendationRequest(mode="solo", users=[UserProfile(name="A")])
+        for enabled in (False, True):
+            cache = _cache_holding(json.dumps(stored))
+            with patch("app.services.ai_service.settings.pregen_enabled", enabled):
+                await get_recommendation(request, cache=cache)
+            assert cache.client.zincrby.await_count == int(enabled)
+            assert cache.client.hsetnx.await_count == int(enabled)
+
+    async def test_unreadable_entry_is_a_miss(self):
+        assert _read_cached_response("{not json") is None
+        assert _read_cached_response('{"additional_picks": []}') is None
+
+    def test_json_response_matches_model_json(self):
+        response = json_response(_response())
+        assert response.media_type == "application/json"
+        assert orjson.loads(response.body) == _response().model_dump()
+        assert json_response(b'{"a":1}').body == b'{"a":1}'
@@ -0,0 +1,212 @@
+"""Tests for offline pre-generation of popular recommendation patterns."""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+from app.api.routes.ops import pregenerate
+from app.core.redis import RedisCache
+from app.schemas.recommendation import RecommendationRequest, UserProfile
+from app.services.ai_service import (
+    PATTERN_CACHE_TTL,
+    PATTERN_FREQ_KEY,
+    PATTERN_REQUESTS_KEY,
+    _normalize_cache_key,
+    _pattern_request,
+    _record_pattern,
+)
+from app.services.pregeneration import (
+    PREGEN_REPORT_KEY,
+    LocalBatchBackend,
+    pregenerate_popular_patterns,
+)
+from app.services.tmdb_service import MovieCandidate
+
+
+class _Pipeline:
+    def __init__(self, client: "_FakeRedis"):
+        self._client = client
+        self._calls = []
+
+    def ttl(self, key):
+        self._calls.append(key)
+
+    async def execute(self):
+        return [await self._client.ttl(key) for key in self._calls]
+
+
+class _FakeRedis:
+    """Just the commands the pattern tracker and pre-generation job use."""
+
+    def __init__(self):
+        self.strings: dict[str, tuple[str, int]] = {}
+        self.zsets: dict[str, dict[str, float]] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    def pipeline(self):
+        return _Pipeline(self)
+
+    async def get(self, key):
+        entry = self.strings.get(key)
+        return entry[0] if entry else None
+
+    async def set(self, key, value, ex=None):
+        self.strings[key] = (value, ex or -1)
+
+    async def ttl(self, key):
+        entry = self.strings.get(key)
+        return entry[1] if entry else -2
+
+    async def zincrby(self, name, amount, member):
+        zset = self.zsets.setdefault(name, {})
+        zset[member] = zset.get(member, 0) + amount
+        return zset[member]
+
+    async def zrevrange(self, name, start, end, withscores=False):
+        items = sorted(self.zsets.get(name, {}).items(), key=lambda kv: -kv[1])
+        items = items[start:] if end == -1 else items[start : end + 1]
+        return items if withscores else [k for k, _ in items]
+
+    async def zrange(self, name, start, end):
+        items = sorted(self.zsets.get(name, {}).items(), key=lambda kv: kv[1])
+        stop = len(items) + end + 1 if end < 0 else end + 1
+        return [k for k, _ in items[start:stop]]
+
+    async def zunionstore(self, dest, keys):
+        ((source, weight),) = keys.items()
+        self.zsets[dest] = {k: v * weight for k, v in self.zsets.get(source, {}).items()}
+
+    async def zrem(self, name, *members):
+        for m in members:
+            self.zsets.get(name, {}).pop(m, None)
+
+    async def hsetnx(self, name, key, value):
+        self.hashes.setdefault(name, {}).setdefault(key, value)
+
+    async def hmget(self, name, keys):
+        return [self.hashes.get(name, {}).get(k) for k in keys]
+
+    async def hdel(self, name, *keys):
+        for k in keys:
+            self.hashes.get(name, {}).pop(k, None)
+
+
+def _request(genre: str, name: str = "Alice") -> RecommendationRequest:
+    return RecommendationRequest(
+        mode="solo",
+        users=[UserProfile(name=name, likes_genres=[genre])],
+        message="something for my birthday",
+    )
+
+
+def _candidates() -> list[MovieCandidate]:
+    return [
+        MovieCandidate(
+            tmdb_id=i,
+            title=f"Movie {i}",
+            overview="",
+            release_date="2010-01-01",
+            genres=["Drama"],
+            genre_ids=[18],
+            vote_average=6.0 + i / 10,
+            vote_count=500,
+            popularity=10.0,
+            runtime=110,
+            poster_path=None,
+            backdrop_path=None,
+            original_language="en",
+            director_names=[],
+            cast_names=[],
+        )
+        for i in range(1, 9)
+    ]
+
+
+async def _track(cache: RedisCache, request: RecommendationRequest, times: int) -> str:
+    key = _normalize_cache_key(request)
+    for _ in range(times):
+        await _record_pattern(cache, key, request)
+    return key
+
+
+def test_pattern_request_drops_personal_details():
+    pattern = _pattern_request(_request("Drama", name="Alice Smith"))
+    assert pattern["users"][0]["name"] == "User 1"
+    assert "message" not in pattern
+    # The stored pattern rebuilds the same cache key
+    rebuilt = RecommendationRequest.model_validate(pattern)
+    assert _normalize_cache_key(rebuilt) == _normalize_cache_key(_request("Drama"))
+
+
+async def test_record_pattern_counts_requests():
+    cache = RedisCache(_FakeRedis())
+    key = await _track(cache, _request("Drama"), times=3)
+    assert cache.client.zsets[PATTERN_FREQ_KEY][key] == 3
+    stored = json.loads(cache.client.hashes[PATTERN_REQUESTS_KEY][key])
+    assert "Alice" not in json.dumps(stored)
+
+
+async def test_record_pattern_swallows_redis_errors():
+    client = AsyncMock()
+    client.zincrby.side_effect = ConnectionError("down")
+    await _record_pattern(RedisCache(client), "rec:pattern:x", _request("Drama"))
+
+
+async def test_pregenerates_popular_stale_patterns_only():
+    cache = RedisCache(_FakeRedis())
+    popular = await _track(cache, _request("Drama"), times=5)
+    fresh = await _track(cache, _request("Comedy"), times=4)
+    rare = await _track(cache, _request("Horror"), times=1)
+    await cache.set_json(fresh, {"cached": True}, ttl_seconds=PATTERN_CACHE_TTL)
+
+    with patch(
+        "app.services.pregeneration.tmdb_service.fetch_candidates",
+        new=AsyncMock(return_value=_candidates()),
+    ) as fetch:
+        report = await pregenerate_popular_patterns(cache, backend=LocalBatchBackend())
+
+    assert fetch.await_count == 1
+    cached = await cache.get_json(popular)
+    assert cached["best_pick"]["tmdb_id"] == 8  # highest rated
+    assert "session_id" not in cached
+    assert await cache.get_json(fresh) == {"cached": True}
+    assert await cache.get_json(rare) is None
+
+    assert report["generated"] == 1
+    assert report["skipped_fresh"] == 1
+    assert report["patterns_considered"] == 2
+    assert report["coverage_pct"] == 90.0  # 9 of 10 tracked requests now cached
+    assert await cache.get_json(PREGEN_REPORT_KEY) == report
+    # Scores decay so patterns that stop being requested fade out
+    assert cache.client.zsets[PATTERN_FREQ_KEY][popular] == 2.5
+
+
+async def test_unparseable_batch_results_are_not_cached():
+    cache = RedisCache(_FakeRedis())
+    key = await _track(cache, _request("Drama"), times=5)
+
+    class _Garbage:
+        name = "garbage"
+
+        async def run(self, jobs):
+            return {job.custom_id: "sorry, no JSON" for job in jobs}
+
+    with patch(
+        "app.services.pregeneration.tmdb_service.fetch_candidates",
+        new=AsyncMock(return_value=_candidates()),
+    ):
+        report = await pregenerate_popular_patterns(cache, backend=_Garbage())
+
+    assert report["generated"] == 0
+    assert report["failed"] == 1
+    assert await cache.get_json(key) is None
+
+
+async def test_manual_pregeneration_is_refused_unless_enabled():
+    with (
+        patch("app.api.routes.ops.settings.pregen_enabled", False),
+        patch("app.api.routes.ops.pregenerate_popular_patterns") as pregen,
+    ):
+        response = await pregenerate(cache=RedisCache(_FakeRedis()))
+
+    assert response["status"] == "disabled"
+    pregen.assert_not_called()
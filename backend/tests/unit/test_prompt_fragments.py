@@ -0,0 +1,100 @@
+"""Tests for precomputed prompt fragments."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.prompt_fragments import (
+    FRAGMENT_VERSION,
+    FragmentCache,
+    build_fragments,
+    candidate_fragment,
+    compact_variant,
+    fingerprint,
+)
+from app.services.sync_service import _upsert_movie
+from app.services.tmdb_service import MovieCandidate
+
+
+def _candidate(tmdb_id: int = 1, title: str = "Heat") -> MovieCandidate:
+    return MovieCandidate(
+        tmdb_id=tmdb_id,
+        title=title,
+        overview="A thief and a detective circle each other across Los Angeles.",
+        release_date="1995-12-15",
+        genres=["Crime", "Thriller"],
+        genre_ids=[80, 53],
+        vote_average=7.9,
+        vote_count=7000,
+        popularity=40.0,
+        runtime=170,
+        poster_path=None,
+        backdrop_path=None,
+        original_language="en",
+        director_names=["Michael Mann"],
+        cast_names=["Al Pacino", "Robert De Niro"],
+    )
+
+
+def test_fragments_match_direct_formatting():
+    candidate = _candidate()
+    assert candidate_fragment(candidate, "full") == candidate.to_prompt_string()
+    assert candidate_fragment(candidate, compact_variant(80)) == candidate.to_compact_row(80)
+    # Off-table plot lengths are still served
+    assert candidate_fragment(candidate, compact_variant(33)) == candidate.to_compact_row(33)
+
+
+def test_fingerprint_tracks_movie_data():
+    assert fingerprint(_candidate()) == fingerprint(_candidate())
+    assert fingerprint(_candidate()) != fingerprint(_candidate(title="Heat (Director's Cut)"))
+
+
+def test_cache_reuses_fragments_by_fingerprint():
+    cache = FragmentCache(max_entries=2)
+    first = cache.get_or_build(_candidate())
+    assert cache.get_or_build(_candidate()) is first
+    cache.get_or_build(_candidate(2))
+    cache.get_or_build(_candidate(3))
+    assert len(cache) == 2
+
+
+def test_stale_fragment_version_is_rebuilt():
+    candidate = _candidate()
+    candidate.fragments = {"v": FRAGMENT_VERSION - 1, "full": "old line"}
+    assert candidate_fragment(candidate, "full") == candidate.to_prompt_string()
+    assert candidate.fragments["v"] == FRAGMENT_VERSION
+
+
+async def test_sync_keeps_stored_fragments_when_movie_unchanged():
+    candidate = _candidate()
+    stored = {"v": FRAGMENT_VERSION, "full": "stored"}
+    existing = SimpleNamespace(prompt_fingerprint=fingerprint(candidate), prompt_fragments=stored)
+    session = MagicMock()
+    session.execute = AsyncMock(
+        return_value=MagicMock(scalar_one_or_none=MagicMock(return_value=existing))
+    )
+
+    with patch("app.services.sync_service.build_fragments") as build:
+        await _upsert_movie(session, candidate)
+    build.assert_not_called()
+    assert existing.prompt_fragments is stored
+
+    await _upsert_movie(session, _candidate(title="Heat 2"))
+    assert existing.prompt_fragments == build_fragments(_candidate(title="Heat 2"))
+
+
+def test_off_table_lines_on_shared_fragments_are_not_stored():
+    candidate = _candidate()
+    shared = build_fragments(candidate)
+    candidate.fragments = shared
+    assert candidate_fragment(candidate, compact_variant(33)) == candidate.to_compact_row(33)
+    assert compact_variant(33) not in shared
+
+
+def test_assembling_attached_fragments_matches_formatting():
+    # Timing comparison: scripts/bench_candidates.py
+    cache = FragmentCache()
+    candidates = [_candidate(tmdb_id) for tmdb_id in range(30)]
+    for c in candidates:
+        c.fragments = cache.get_or_build(c, (c.tmdb_id, 1.0))
+    assembled = "\n".join(candidate_fragment(c, "full") for c in candidates)
+    assert assembled == "\n".join(c.to_prompt_string() for c in candidates)
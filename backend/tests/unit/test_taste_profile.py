@@ -105,6 +105,10 @@ class TestTasteProfileDict:
         assert d["genre_affinities"][0]["genre"] == "Action"
         assert d["preferred_decades"] == ["2010s"]
 
+    def test_excluded_ids_serialized(self):
+        profile = TasteProfile(user_id="u1", excluded_tmdb_ids=[550, 680])
+        assert profile.to_dict()["excluded_tmdb_ids"] == [550, 680]
+
     def test_none_avg_rating(self):
         profile = TasteProfile(user_id="u1")
         d = profile.to_dict()
@@ -0,0 +1,55 @@
+"""Tests for pipeline stage timing."""
+
+import time
+
+from prometheus_client import CollectorRegistry, Histogram
+
+from app.core.timing import StageTimer
+
+
+class TestStageTimer:
+    def test_records_stage_duration(self):
+        timer = StageTimer()
+        with timer.stage("work"):
+            time.sleep(0.01)
+        start, duration = timer.stages["work"]
+        assert start >= 0
+        assert duration >= 0.01
+
+    def test_stage_recorded_on_exception(self):
+        timer = StageTimer()
+        try:
+            with timer.stage("boom"):
+                raise ValueError
+        except ValueError:
+            pass
+        assert "boom" in timer.stages
+
+    def test_critical_path_orders_by_finish(self):
+        timer = StageTimer()
+        timer.stages = {"late": (0.0, 0.5), "early": (0.0, 0.1), "mid": (0.2, 0.2)}
+        assert timer.critical_path() == ["early", "mid", "late"]
+
+    def test_as_dict_in_milliseconds(self):
+        timer = StageTimer()
+        timer.stages = {"cache_lookup": (0.0012, 0.0034)}
+        assert timer.as_dict() == {
+            "cache_lookup": {"start_ms": 1.2, "duration_ms": 3.4}
+        }
+
+    def test_observe_exports_each_stage(self):
+        registry = CollectorRegistry()
+        histogram = Histogram(
+            "test_stage_seconds", "test", ["stage", "mode"], registry=registry
+        )
+        timer = StageTimer()
+        timer.stages = {"cache_lookup": (0.0, 0.002), "model_call": (0.1, 1.5)}
+        timer.observe(histogram, mode="solo")
+
+        def _sum(stage: str) -> float:
+            return registry.get_sample_value(
+                "test_stage_seconds_sum", {"stage": stage, "mode": "solo"}
+            )
+
+        assert _sum("cache_lookup") == 0.002
+        assert _sum("model_call") == 1.5
@@ -0,0 +1,154 @@
+"""Tests for the client-side TMDB rate budget."""
+
+import asyncio
+import time
+from email.utils import formatdate
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.exceptions import ExternalServiceError
+from app.services.tmdb_rate import (
+    BUCKET_KEY,
+    PAUSE_KEY,
+    TMDBRateBudget,
+    TokenBucket,
+    TrafficPriority,
+    background_tmdb_traffic,
+    current_priority,
+    parse_retry_after,
+)
+from app.services.tmdb_service import TMDBService
+
+
+def test_bucket_leaves_reserve_for_interactive_callers():
+    bucket = TokenBucket(rate=1, capacity=3)
+    # Background callers keep 2 tokens in reserve
+    assert bucket.try_take(reserve=2) == 0
+    assert bucket.try_take(reserve=2) > 0
+    # Interactive callers may use them
+    assert bucket.try_take() == 0
+    assert bucket.try_take() == 0
+    assert bucket.try_take() > 0
+
+
+def test_bucket_pause_blocks_until_retry_after():
+    bucket = TokenBucket(rate=100, capacity=10)
+    bucket.pause(0.5)
+    assert 0.4 < bucket.try_take() <= 0.5
+
+
+def test_bucket_refills_from_the_end_of_a_pause():
+    bucket = TokenBucket(rate=200, capacity=20)
+    bucket.pause(0.1)
+    time.sleep(0.11)
+    # Not a full burst straight after a 429: only what refilled since it ended
+    assert sum(bucket.try_take() == 0 for _ in range(20)) <= 10
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert 8 < parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+
+
+async def test_background_priority_applies_to_spawned_tasks():
+    async def _priority_of_task():
+        return current_priority()
+
+    @background_tmdb_traffic
+    async def _job():
+        return await asyncio.create_task(_priority_of_task())
+
+    assert await _job() == TrafficPriority.BACKGROUND
+    assert current_priority() == TrafficPriority.INTERACTIVE
+
+
+async def test_interactive_caller_gives_up_after_max_wait():
+    budget = TMDBRateBudget(rate=1, burst=1, max_wait_seconds=0.5, shared=False)
+    await budget.acquire()
+    with pytest.raises(ExternalServiceError, match="rate budget exhausted"):
+        await budget.acquire()
+
+
+async def test_background_caller_waits_for_reserve():
+    budget = TMDBRateBudget(rate=50, burst=2, background_reserve=1, shared=False)
+
+    @background_tmdb_traffic
+    async def _take():
+        started = time.monotonic()
+        await budget.acquire()
+        return time.monotonic() - started
+
+    assert await _take() == pytest.approx(0, abs=0.01)
+    # Only the reserved token is left; wait ~20ms for a refill
+    assert await _take() >= 0.015
+
+
+async def test_shared_budget_falls_back_to_local_bucket():
+    budget = TMDBRateBudget(rate=10, burst=1, shared=True)
+    with patch("app.services.tmdb_rate.get_redis", AsyncMock(side_effect=ConnectionError)):
+        await budget.acquire()
+        assert budget._local.try_take() > 0
+
+
+async def test_shared_pause_resets_the_redis_bucket():
+    script = AsyncMock()
+    redis = MagicMock(register_script=MagicMock(return_value=script))
+    budget = TMDBRateBudget(rate=40, burst=40, shared=True)
+    with patch("app.services.tmdb_rate.get_redis", AsyncMock(return_value=redis)):
+        await budget.pause(1.5)
+
+    assert script.await_args.kwargs == {
+        "keys": [BUCKET_KEY, PAUSE_KEY],
+        "args": [1500, 40, 40],
+    }
+
+
+async def test_request_honors_retry_after_on_429():
+    service = TMDBService()
+    request = httpx.Request("GET", "/trending/movie/week")
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=[
+        httpx.Response(429, headers={"Retry-After": "0.05"}, request=request),
+        httpx.Response(200, json={"results": []}, request=request),
+    ])
+    budget = TMDBRateBudget(rate=100, burst=10, shared=False)
+
+    with (
+        patch.object(service, "_get_client", AsyncMock(return_value=client)),
+        patch("app.services.tmdb_service.tmdb_breaker", CircuitBreaker("TMDB")),
+        patch("app.services.tmdb_service.tmdb_rate_budget", budget),
+    ):
+        started = time.monotonic()
+        assert await service._get("/trending/movie/week") == {"results": []}
+
+    assert time.monotonic() - started >= 0.05
+    assert client.get.await_count == 2
+
+
+async def test_long_retry_after_fails_without_tripping_breaker():
+    service = TMDBService()
+    request = httpx.Request("GET", "/movie/1")
+    client = MagicMock()
+    client.get = AsyncMock(
+        return_value=httpx.Response(429, headers={"Retry-After": "120"}, request=request)
+    )
+    breaker = CircuitBreaker("TMDB", failure_threshold=1)
+    budget = TMDBRateBudget(rate=100, burst=10, shared=False)
+
+    with (
+        patch.object(service, "_get_client", AsyncMock(return_value=client)),
+        patch("app.services.tmdb_service.tmdb_breaker", breaker),
+        patch("app.services.tmdb_service.tmdb_rate_budget", budget),
+    ):
+        with pytest.raises(ExternalServiceError, match="rate limited"):
+            await service._get("/movie/1")
+
+    assert client.get.await_count == 1
+    assert breaker.snapshot()["state"] == "closed"
+    # Everyone else backs off too
+    assert budget._local.try_take() > 100
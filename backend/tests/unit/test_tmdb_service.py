@@ -1,4 +1,44 @@
-from app.services.tmdb_service import GENRE_MAP, GENRE_NAME_TO_ID, MovieCandidate
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.config import settings
+from app.core.exceptions import ExternalServiceError, NotFoundError
+from app.core.metrics import TMDB_RESPONSE_BYTES
+from app.core.timing import StageTimer
+from app.services.movie_cache import movie_details_payload
+from app.services.tmdb_service import (
+    COMPACT_ROW_HEADER,
+    GENRE_MAP,
+    GENRE_NAME_TO_ID,
+    MovieCandidate,
+    TMDBService,
+    slim_movie_details,
+)
+
+
+def _candidate(tmdb_id: int) -> MovieCandidate:
+    return MovieCandidate(
+        tmdb_id=tmdb_id,
+        title=f"Movie {tmdb_id}",
+        overview="",
+        release_date="2020-01-01",
+        genres=["Drama"],
+        genre_ids=[18],
+        vote_average=7.0,
+        vote_count=100,
+        popularity=1.0,
+        runtime=100,
+        poster_path=None,
+        backdrop_path=None,
+        original_language="en",
+        director_names=[],
+        cast_names=[],
+    )
 
 
 def test_genre_map_has_common_genres():
@@ -65,3 +105,435 @@ def test_movie_candidate_unknown_runtime():
     prompt = candidate.to_prompt_string()
     assert "Runtime: Unknown" in prompt
     assert "Unknown)" in prompt  # year unknown
+
+
+def test_movie_candidate_compact_row():
+    candidate = _candidate(42)
+    candidate.title = "Face|Off"
+    candidate.overview = "x" * 300
+    row = candidate.to_compact_row(plot_chars=50).split("|")
+    assert len(row) == len(COMPACT_ROW_HEADER.split("|"))
+    assert row[1] == "Face/Off"
+    assert len(row[-1]) == 50
+
+
+def test_movie_candidate_compact_round_trip():
+    candidate = _candidate(42)
+    candidate.cast_names = [f"Actor {i}" for i in range(10)]
+    restored = MovieCandidate.from_compact(candidate.to_compact())
+    assert restored is not None
+    assert restored.tmdb_id == 42
+    assert restored.title == candidate.title
+    assert restored.cast_names == candidate.cast_names[:5]
+
+
+def test_movie_candidate_from_compact_rejects_stale_layout():
+    assert MovieCandidate.from_compact([42, "Too short"]) is None
+
+
+def test_movie_candidate_is_slotted_with_derived_urls():
+    candidate = _candidate(42)
+    candidate.poster_path = "/p.jpg"
+    assert not hasattr(candidate, "__dict__")
+    assert candidate.year == "2020"
+    assert candidate.poster_url == f"{settings.tmdb_image_base_url}/w500/p.jpg"
+    assert candidate.backdrop_url is None
+
+
+def test_restored_candidates_share_interned_labels():
+    a, b = _candidate(1), _candidate(2)
+    a.genres, b.genres = ["".join("Drama")], ["".join("Drama")]
+    restored = [MovieCandidate.from_compact(c.to_compact()) for c in (a, b)]
+    assert restored[0].genres[0] is restored[1].genres[0]
+    assert restored[0].original_language is restored[1].original_language
+
+
+async def test_fetch_candidates_runs_discover_calls_concurrently():
+    service = TMDBService()
+    in_flight = 0
+    peak = 0
+
+    async def _slow(results: list[dict]) -> list[dict]:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return results
+
+    async def _discover(**kwargs):
+        page = kwargs.get("page", 1)
+        return await _slow([{"id": page, "genre_ids": [18]}])
+
+    async def _trending(*args):
+        return await _slow([{"id": 99, "genre_ids": [35]}])
+
+    async def _enrich(movie: dict) -> MovieCandidate:
+        if movie["id"] == 99:
+            raise RuntimeError("gone upstream")
+        return _candidate(movie["id"])
+
+    timer = StageTimer()
+    with (
+        patch.object(service, "discover_movies", side_effect=_discover),
+        patch.object(service, "get_trending", side_effect=_trending),
+        patch.object(service, "enrich_movie", side_effect=_enrich),
+    ):
+        candidates = await service.fetch_candidates(
+            genre_names=["Drama"], mood=["emotional"], timer=timer
+        )
+
+    assert peak == 3
+    # Mood results first, failed enrichment skipped
+    assert [c.tmdb_id for c in candidates] == [2, 1]
+    assert {"tmdb_discover", "enrichment"} <= set(timer.stages)
+
+
+async def test_discover_queries_share_a_canonical_cache_key():
+    service = TMDBService()
+    with patch.object(service, "_get", AsyncMock(return_value={"results": []})) as get:
+        await service.discover_movies(genre_ids=[35, 18, 35], year_min=1996, year_max=1998)
+        await service.discover_movies(genre_ids=[18, 35], year_min=1995, year_max=1999)
+
+    first, second = (c.args[1] for c in get.await_args_list)
+    assert first == second
+    assert first["with_genres"] == "18,35"
+    assert first["primary_release_date.gte"] == "1995-01-01"
+    assert first["primary_release_date.lte"] == "1999-12-31"
+
+
+async def test_fetch_candidates_trims_discover_results_to_exact_years():
+    service = TMDBService()
+    discover = [
+        {"id": 1, "release_date": "1995-06-01", "genre_ids": [18]},
+        {"id": 2, "release_date": "1997-06-01", "genre_ids": [18]},
+        {"id": 3, "release_date": "", "genre_ids": [18]},
+    ]
+    trending = [{"id": 4, "release_date": "2024-01-01", "genre_ids": [18]}]
+
+    with (
+        patch.object(service, "discover_movies", AsyncMock(return_value=discover)),
+        patch.object(service, "get_trending", AsyncMock(return_value=trending)),
+        patch.object(service, "enrich_movie", side_effect=lambda m: _candidate(m["id"])),
+    ):
+        candidates = await service.fetch_candidates(year_min=1996, year_max=1998)
+
+    # Trending is a freshness signal and isn't year-filtered
+    assert [c.tmdb_id for c in candidates] == [2, 4]
+
+
+async def test_get_stops_retrying_and_fails_fast_once_breaker_opens():
+    service = TMDBService()
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=httpx.ConnectError("down"))
+    breaker = CircuitBreaker("TMDB", failure_threshold=1, recovery_timeout=60)
+
+    with (
+        patch.object(service, "_get_client", AsyncMock(return_value=client)),
+        patch("app.services.tmdb_service.tmdb_breaker", breaker),
+    ):
+        with pytest.raises(ExternalServiceError):
+            await service._get("/trending/movie/week")
+        assert client.get.await_count == 1
+
+        with pytest.raises(CircuitOpenError):
+            await service._get("/trending/movie/week")
+        assert client.get.await_count == 1
+
+
+async def test_client_uses_configured_pool_and_timeouts():
+    service = TMDBService()
+    with (
+        patch("app.services.tmdb_service._http2_available", return_value=False),
+        patch("app.services.tmdb_service.httpx.AsyncClient") as client_cls,
+    ):
+        await service._get_client()
+
+    kwargs = client_cls.call_args.kwargs
+    # HTTP/2 is requested by default but needs the h2 package
+    assert kwargs["http2"] is False
+    assert kwargs["limits"].max_connections == settings.tmdb_max_connections
+    assert kwargs["limits"].keepalive_expiry == settings.tmdb_keepalive_expiry_seconds
+    assert kwargs["timeout"].connect == settings.tmdb_connect_timeout_seconds
+    assert kwargs["timeout"].read == settings.tmdb_read_timeout_seconds
+
+
+async def test_get_caps_concurrent_requests_at_pool_size():
+    with patch.object(settings, "tmdb_max_connections", 2):
+        service = TMDBService()
+    in_flight = peak = 0
+
+    async def _respond(endpoint, params, headers=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        assert service._in_use == in_flight
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={}, request=httpx.Request("GET", endpoint))
+
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=_respond)
+    with (
+        patch.object(service, "_get_client", AsyncMock(return_value=client)),
+        patch("app.services.tmdb_service.tmdb_breaker", CircuitBreaker("TMDB")),
+    ):
+        await asyncio.gather(*(service._get(f"/movie/{i}") for i in range(5)))
+
+    assert peak == 2
+    assert service._in_use == 0
+
+
+async def test_pool_timeout_fails_without_tripping_breaker():
+    with patch.object(settings, "tmdb_max_connections", 1):
+        service = TMDBService()
+    await service._slots.acquire()  # pool fully in use
+    breaker = CircuitBreaker("TMDB", failure_threshold=1, recovery_timeout=60)
+
+    with (
+        patch.object(service, "_get_client", AsyncMock(return_value=MagicMock())),
+        patch.object(settings, "tmdb_pool_timeout_seconds", 0.01),
+        patch("app.services.tmdb_service.tmdb_breaker", breaker),
+    ):
+        with pytest.raises(ExternalServiceError, match="pool exhausted"):
+            await service._get("/movie/1")
+
+    assert breaker.snapshot()["consecutive_failures"] == 0
+
+
+class _DictCache:
+    def __init__(self):
+        self.entries: dict = {}
+
+    async def get_json(self, key):
+        return self.entries.get(key)
+
+    async def get_many_json(self, keys):
+        return [self.entries.get(key) for key in keys]
+
+    async def set_json(self, key, value, ttl_seconds=3600):
+        self.entries[key] = value
+
+    async def increment(self, key, ttl_seconds=60):
+        self.entries[key] = self.entries.get(key, 0) + 1
+        return self.entries[key]
+
+
+def _cached_service(responses: list[httpx.Response]) -> tuple[TMDBService, MagicMock, _DictCache]:
+    service = TMDBService()
+    service._cache = _DictCache()
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=responses)
+    return service, client, service._cache
+
+
+async def test_cached_get_revalidates_stale_body_with_etag():
+    request = httpx.Request("GET", "/movie/1")
+    service, client, cache = _cached_service([
+        httpx.Response(200, json={"id": 1}, headers={"ETag": '"v1"'}, request=request),
+        httpx.Response(304, request=request),
+    ])
+
+    with (
+        patch.object(service, "_get_client", AsyncMock(return_value=client)),
+        patch("app.services.tmdb_service.tmdb_breaker", CircuitBreaker("TMDB")),
+    ):
+        assert await service._get("/movie/1", cache_ttl=60) == {"id": 1}
+        # Fresh: served from cache without a request, same version
+        (entry,) = cache.entries.values()
+        assert await service._get_versioned("/movie/1", cache_ttl=60) == (
+            {"id": 1},
+            entry["fetched_at"],
+        )
+        assert client.get.await_count == 1
+
+        entry["fetched_at"] -= 120
+        assert await service._get("/movie/1", cache_ttl=60) == {"id": 1}
+
+    assert client.get.await_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert time.time() - entry["fetched_at"] < 5
+
+
+async def test_cached_get_replaces_body_when_modified():
+    request = httpx.Request("GET", "/discover/movie")
+    service, client, cache = _cached_service([
+        httpx.Response(
+            200,
+            json={"results": [1]},
+            headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+            request=request,
+        ),
+        httpx.Response(200, json={"results": [2]}, headers={"ETag": '"v2"'}, request=request),
+    ])
+
+    with (
+        patch.object(service, "_get_client", AsyncMock(return_value=client)),
+        patch("app.services.tmdb_service.tmdb_breaker", CircuitBreaker("TMDB")),
+    ):
+        await service._get("/discover/movie", {"page": "1"}, cache_ttl=0)
+        assert await service._get("/discover/movie", {"page": "1"}, cache_ttl=0) == {
+            "results": [2]
+        }
+
+    assert client.get.await_args.kwargs["headers"] == {
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"
+    }
+    assert cache.entries["tmdb:/discover/movie?page=1"]["etag"] == '"v2"'
+
+
+async def test_not_found_is_negative_cached():
+    request = httpx.Request("GET", "/movie/404")
+    service, client, cache = _cached_service([httpx.Response(404, request=request)])
+
+    with (
+        patch.object(service, "_get_client", AsyncMock(return_value=client)),
+        patch("app.services.tmdb_service.tmdb_breaker", CircuitBreaker("TMDB")),
+    ):
+        for _ in range(3):
+            with pytest.raises(NotFoundError, match="Movie not found: 404"):
+                await service.get_movie_details(404)
+
+    assert client.get.await_count == 1
+
+
+async def test_repeated_upstream_failures_are_negative_cached():
+    request = httpx.Request("GET", "/movie/7")
+    service, client, cache = _cached_service(
+        [httpx.Response(500, request=request)] * settings.tmdb_failure_threshold
+    )
+    breaker = CircuitBreaker("TMDB", failure_threshold=100)
+
+    with (
+        patch.object(service, "_get_client", AsyncMock(return_value=client)),
+        patch("app.services.tmdb_service.tmdb_breaker", breaker),
+    ):
+        for _ in range(settings.tmdb_failure_threshold + 2):
+            with pytest.raises(ExternalServiceError):
+                await service._get("/movie/7", retries=0, cache_ttl=60)
+
+    assert client.get.await_count == settings.tmdb_failure_threshold
+    assert cache.entries["tmdb:/movie/7:neg"] == {"error": "failing"}
+
+
+async def test_negative_cache_keeps_the_stored_body_for_revalidation():
+    request = httpx.Request("GET", "/movie/7")
+    service, client, cache = _cached_service(
+        [httpx.Response(500, request=request)] * settings.tmdb_failure_threshold
+        + [httpx.Response(304, request=request)]
+    )
+    stale = {"body": {"id": 7}, "etag": '"v1"', "last_modified": None, "fetched_at": 0}
+    cache.entries["tmdb:/movie/7"] = dict(stale)
+    breaker = CircuitBreaker("TMDB", failure_threshold=100)
+
+    with (
+        patch.object(service, "_get_client", AsyncMock(return_value=client)),
+        patch("app.services.tmdb_service.tmdb_breaker", breaker),
+    ):
+        for _ in range(settings.tmdb_failure_threshold):
+            with pytest.raises(ExternalServiceError):
+                await service._get("/movie/7", retries=0, cache_ttl=60)
+        assert cache.entries["tmdb:/movie/7"]["etag"] == '"v1"'
+
+        del cache.entries["tmdb:/movie/7:neg"]  # marker expired
+        assert await service._get("/movie/7", retries=0, cache_ttl=60) == {"id": 7}
+
+    assert client.get.await_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+
+async def test_connection_errors_are_not_negative_cached():
+    service, client, cache = _cached_service([httpx.ConnectError("down")] * 5)
+    breaker = CircuitBreaker("TMDB", failure_threshold=100)
+
+    with (
+        patch.object(service, "_get_client", AsyncMock(return_value=client)),
+        patch("app.services.tmdb_service.tmdb_breaker", breaker),
+    ):
+        for _ in range(5):
+            with pytest.raises(ExternalServiceError):
+                await service._get("/movie/7", retries=0, cache_ttl=60)
+
+    assert client.get.await_count == 5
+    assert cache.entries == {}
+
+
+def _full_details() -> dict:
+    return {
+        "id": 550,
+        "title": "Fight Club",
+        "overview": "An insomniac office worker...",
+        "genres": [{"id": 18, "name": "Drama"}],
+        "production_companies": [{"id": 1, "name": "Studio", "logo_path": "/x.png"}],
+        "credits": {
+            "cast": [
+                {"name": f"Actor {i}", "character": f"Role {i}", "profile_path": "/p.jpg"}
+                for i in range(60)
+            ],
+            "crew": [
+                {"name": "David Fincher", "job": "Director", "department": "Directing"},
+                *({"name": f"Crew {i}", "job": "Grip"} for i in range(200)),
+            ],
+        },
+        "keywords": {"keywords": [{"id": 825, "name": "support group"}]},
+    }
+
+
+def test_slim_movie_details_keeps_only_used_fields():
+    slim = slim_movie_details(_full_details())
+
+    assert "production_companies" not in slim
+    assert len(slim["credits"]["cast"]) == 10
+    assert slim["credits"]["crew"] == [{"name": "David Fincher", "job": "Director"}]
+    assert slim["keywords"] == {"keywords": [{"name": "support group"}]}
+    # Idempotent, so already-slim cached bodies pass through unchanged
+    assert slim_movie_details(slim) == slim
+
+
+async def test_enrichment_and_movie_page_read_slimmed_details():
+    service = TMDBService()
+    slim = slim_movie_details(_full_details())
+    with patch.object(
+        service, "_get_movie_details_versioned", AsyncMock(return_value=(slim, 1700000000.0))
+    ):
+        candidate = await service.enrich_movie({"id": 550})
+        again = await service.enrich_movie({"id": 550})
+
+    assert candidate.director_names == ["David Fincher"]
+    # Same details fetch: the prompt lines are built once and shared
+    assert again.fragments is candidate.fragments
+    assert candidate.fragments["full"] == candidate.to_prompt_string()
+    assert candidate.cast_names[:2] == ["Actor 0", "Actor 1"]
+    assert movie_details_payload(slim)["cast"][0] == {"name": "Actor 0", "character": "Role 0"}
+
+
+async def test_null_original_language_reads_as_english():
+    service = TMDBService()
+    details = {"id": 7, "title": "Untitled", "original_language": None}
+    with patch.object(
+        service, "_get_movie_details_versioned", AsyncMock(return_value=(details, None))
+    ):
+        candidate = await service.enrich_movie({"id": 7})
+    assert candidate.original_language == "en"
+
+    stored = candidate.to_compact()
+    stored[stored.index("en")] = None  # sessions written before the fix
+    assert MovieCandidate.from_compact(stored).original_language == "en"
+
+
+async def test_slimmed_details_are_cached_and_bytes_saved_counted():
+    request = httpx.Request("GET", "/movie/550")
+    service, client, cache = _cached_service(
+        [httpx.Response(200, json=_full_details(), request=request)]
+    )
+    raw = TMDB_RESPONSE_BYTES.labels(kind="movie_details", form="raw")
+    slimmed = TMDB_RESPONSE_BYTES.labels(kind="movie_details", form="slim")
+    raw_before, slim_before = raw._value.get(), slimmed._value.get()
+
+    with (
+        patch.object(service, "_get_client", AsyncMock(return_value=client)),
+        patch("app.services.tmdb_service.tmdb_breaker", CircuitBreaker("TMDB")),
+    ):
+        details = await service.get_movie_details(550)
+
+    (entry,) = cache.entries.values()
+    assert entry["body"] == details == slim_movie_details(_full_details())
+    assert slimmed._value.get() - slim_before < (raw._value.get() - raw_before) / 3
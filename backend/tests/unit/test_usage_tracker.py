@@ -0,0 +1,72 @@
+"""Tests for Claude token and cost accounting."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.metrics import CLAUDE_TOKENS_TOTAL
+from app.services.usage_tracker import (
+    TokenUsage,
+    UsageTracker,
+    estimate_cost,
+)
+
+HAIKU = "claude-haiku-4-5-20250514"
+OPUS = "claude-opus-4-6"
+
+
+class TestTokenUsage:
+    def test_from_response_reads_cache_fields(self):
+        raw = MagicMock(
+            input_tokens=200,
+            output_tokens=300,
+            cache_creation_input_tokens=0,
+            cache_read_input_tokens=800,
+        )
+        usage = TokenUsage.from_response(raw)
+        assert usage.total == 500
+        assert usage.cache_read_tokens == 800
+        assert usage.cache_read_ratio == 0.8
+
+    def test_missing_cache_fields_default_to_zero(self):
+        raw = MagicMock(spec=["input_tokens", "output_tokens"])
+        raw.input_tokens = 10
+        raw.output_tokens = 5
+        usage = TokenUsage.from_response(raw)
+        assert usage.cache_creation_tokens == 0
+        assert usage.cache_read_ratio == 0.0
+
+
+class TestCostEstimate:
+    def test_cache_reads_are_cheaper_than_input(self):
+        fresh = estimate_cost(HAIKU, TokenUsage(input_tokens=1_000_000))
+        cached = estimate_cost(HAIKU, TokenUsage(cache_read_tokens=1_000_000))
+        assert fresh == pytest.approx(1.0)
+        assert cached == pytest.approx(0.1)
+
+    def test_opus_costs_more_than_haiku(self):
+        usage = TokenUsage(input_tokens=2000, output_tokens=500)
+        assert estimate_cost(OPUS, usage) > estimate_cost(HAIKU, usage)
+
+
+class TestUsageTracker:
+    def test_snapshot_groups_by_model_and_tier(self):
+        tracker = UsageTracker()
+        tracker.record(HAIKU, "simple", TokenUsage(input_tokens=1000, output_tokens=200))
+        tracker.record(OPUS, "complex", TokenUsage(input_tokens=3000, output_tokens=600))
+        snap = tracker.snapshot()
+        assert snap["calls"] == 2
+        assert snap["by_model"][OPUS]["tokens"] == 3600
+        assert snap["by_tier"]["simple"]["calls"] == 1
+        assert snap["spend_usd"] == pytest.approx(tracker.spend(), abs=1e-4)
+
+    def test_old_events_fall_out_of_window(self):
+        tracker = UsageTracker(window_seconds=0)
+        tracker.record(HAIKU, "simple", TokenUsage(input_tokens=1000))
+        assert tracker.spend() == 0.0
+
+    def test_record_exports_token_counters(self):
+        labels = {"model": HAIKU, "tier": "test", "kind": "output"}
+        before = CLAUDE_TOKENS_TOTAL.labels(**labels)._value.get()
+        UsageTracker().record(HAIKU, "test", TokenUsage(output_tokens=42))
+        assert CLAUDE_TOKENS_TOTAL.labels(**labels)._value.get() == before + 42
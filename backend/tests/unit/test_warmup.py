@@ -0,0 +1,152 @@
+"""Tests for the background cache warmup."""
+
+import time
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, patch
+
+from app.core.config import settings
+from app.core.exceptions import ExternalServiceError
+from app.core.redis import ByteCache, RedisCache
+from app.services.movie_cache import movie_key, trending_key
+from app.services.tmdb_service import GENRE_MAP
+from app.services.warmup import WARMUP_STATUS_KEY, RequestPacer, run_warmup
+
+
+class _Pipeline:
+    def __init__(self, client: "_FakeRedis"):
+        self._client = client
+        self._ops = []
+
+    def exists(self, key):
+        self._ops.append(lambda: int(key in self._client.store))
+
+    def set(self, key, value, ex=None):
+        self._ops.append(lambda: self._client.store.__setitem__(key, value))
+
+    async def execute(self):
+        return [op() for op in self._ops]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store: dict[str, str] = {}
+
+    def pipeline(self):
+        return _Pipeline(self)
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+def _trending(ids):
+    return [{"id": i, "title": f"Movie {i}"} for i in ids]
+
+
+def _details(tmdb_id):
+    return {"id": tmdb_id, "title": f"Movie {tmdb_id}", "genres": [], "credits": {}}
+
+
+def _patched(stack: ExitStack, discover=None, details=None, top_patterns=0) -> None:
+    for p in (
+        patch(
+            "app.services.movie_cache.tmdb_service.get_trending",
+            new=AsyncMock(return_value=_trending([1, 2])),
+        ),
+        patch(
+            "app.services.warmup.tmdb_service.discover_movies",
+            new=discover or AsyncMock(return_value=_trending([2, 3])),
+        ),
+        patch(
+            "app.services.movie_cache.tmdb_service.get_movie_details",
+            new=details or AsyncMock(side_effect=_details),
+        ),
+        patch.object(settings, "warmup_top_patterns", top_patterns),
+        patch.object(settings, "warmup_tmdb_rate_per_second", 0),
+    ):
+        stack.enter_context(p)
+
+
+async def _run(cache, **overrides):
+    with ExitStack() as stack:
+        _patched(stack, **overrides)
+        return await run_warmup(cache, movies=ByteCache(cache.client))
+
+
+async def test_warms_trending_discover_and_details():
+    cache = RedisCache(_FakeRedis())
+    await cache.set_json(movie_key(1), {"tmdb_id": 1})
+    details = AsyncMock(side_effect=_details)
+
+    run = await _run(cache, details=details)
+
+    assert run.state == "complete"
+    assert (await cache.get_json(trending_key("week")))["results"][0]["tmdb_id"] == 1
+    assert await cache.get_json(trending_key("day")) is not None
+    assert run.stages["discover"].done == len(GENRE_MAP)
+    # 1 was already cached; 2 is shared by trending and discover
+    assert sorted(c.args[0] for c in details.await_args_list) == [2, 3]
+    assert run.stages["details"].skipped == 1
+    assert (await cache.get_json(movie_key(3)))["title"] == "Movie 3"
+    assert "patterns" not in run.stages
+
+    status = await cache.get_json(WARMUP_STATUS_KEY)
+    assert status["state"] == "complete"
+    assert status["finished_at"] is not None
+
+
+async def test_failures_are_reported_without_stopping_the_run():
+    cache = RedisCache(_FakeRedis())
+    discover = AsyncMock(side_effect=ExternalServiceError("TMDB", "HTTP 500"))
+
+    run = await _run(cache, discover=discover)
+
+    assert run.state == "partial"
+    assert run.stages["discover"].failed == len(GENRE_MAP)
+    assert run.errors_total == len(GENRE_MAP)
+    assert len(run.errors) <= 20
+    # Trending ids still get their details warmed
+    assert run.stages["details"].done == 2
+
+
+async def test_patterns_stage_does_not_decay_request_scores():
+    cache = RedisCache(_FakeRedis())
+    report = {"patterns_considered": 4, "generated": 3, "skipped_fresh": 1, "failed": 0}
+    pregen = AsyncMock(return_value=report)
+
+    with (
+        patch("app.services.warmup.pregenerate_popular_patterns", new=pregen),
+        patch.object(settings, "pregen_enabled", True),
+    ):
+        run = await _run(cache, top_patterns=5)
+
+    pregen.assert_awaited_once_with(cache, top_n=5, decay=False)
+    assert run.stages["patterns"].done == 3
+    assert run.stages["patterns"].skipped == 1
+
+
+async def test_patterns_stage_is_skipped_unless_pregeneration_is_enabled():
+    pregen = AsyncMock()
+
+    with (
+        patch("app.services.warmup.pregenerate_popular_patterns", new=pregen),
+        patch.object(settings, "pregen_enabled", False),
+    ):
+        run = await _run(RedisCache(_FakeRedis()), top_patterns=5)
+
+    pregen.assert_not_awaited()
+    assert "patterns" not in run.stages
+
+
+async def test_pacer_spaces_calls():
+    pacer = RequestPacer(rate_per_second=50)
+    started = time.monotonic()
+    for _ in range(4):
+        await pacer.wait()
+    # First call is immediate, the next three wait 20ms each
+    assert time.monotonic() - started >= 0.055